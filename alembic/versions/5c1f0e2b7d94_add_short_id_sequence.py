@@ -0,0 +1,29 @@
+"""add short id sequence
+
+Revision ID: 5c1f0e2b7d94
+Revises: a8a01a75dd3c
+Create Date: 2026-10-17 20:05:37.412906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f0e2b7d94'
+down_revision: Union[str, None] = 'a8a01a75dd3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Source of numbers for SHORT_ID_STRATEGY=sequence.
+    op.execute(sa.schema.CreateSequence(sa.Sequence('short_id_seq', start=1), if_not_exists=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.schema.DropSequence(sa.Sequence('short_id_seq'), if_exists=True))
@@ -0,0 +1,36 @@
+"""keyset index on links
+
+Revision ID: 7e3a9d1c4b26
+Revises: 5c1f0e2b7d94
+Create Date: 2026-10-17 20:31:08.519243
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3a9d1c4b26'
+down_revision: Union[str, None] = '5c1f0e2b7d94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # id becomes a key column so that the (created_at, id) cursor condition is an index range, not a filter.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_links_user_id_created_at_id', 'links', ['user_id', 'created_at', 'id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_links_user_id_created_at', table_name='links', postgresql_concurrently=True,
+                      if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_links_user_id_created_at', 'links', ['user_id', 'created_at'], unique=False,
+                        postgresql_include=['id'], postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_links_user_id_created_at_id', table_name='links', postgresql_concurrently=True,
+                      if_exists=True)
@@ -0,0 +1,91 @@
+"""partition clicks by clicked_at
+
+Revision ID: 9a4e6b2c7f15
+Revises: f3a7c1e9d204
+Create Date: 2026-10-17 23:30:52.841063
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e6b2c7f15'
+down_revision: Union[str, None] = 'f3a7c1e9d204'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(start: datetime) -> datetime:
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rewrites clicks into monthly partitions, the application keeps creating the next ones
+    # (CLICK_PARTITION_INTERVAL) from the upper bound of the last partition, which it reads from the name.
+    op.execute("ALTER TABLE clicks RENAME TO clicks_unpartitioned")
+    op.execute("ALTER TABLE clicks_unpartitioned RENAME CONSTRAINT clicks_pkey TO clicks_unpartitioned_pkey")
+    op.execute("ALTER TABLE clicks_unpartitioned RENAME CONSTRAINT clicks_link_id_fkey "
+               "TO clicks_unpartitioned_link_id_fkey")
+    op.execute("ALTER INDEX ix_clicks_link_id_clicked_at RENAME TO ix_clicks_unpartitioned_link_id_clicked_at")
+
+    op.execute(
+        "CREATE TABLE clicks ("
+        "id integer NOT NULL DEFAULT nextval('clicks_id_seq'), "
+        "link_id integer NOT NULL, "
+        "clicked_at timestamp with time zone NOT NULL, "
+        "CONSTRAINT clicks_pkey PRIMARY KEY (id, clicked_at), "
+        "CONSTRAINT clicks_link_id_fkey FOREIGN KEY (link_id) REFERENCES links (id) ON DELETE CASCADE"
+        ") PARTITION BY RANGE (clicked_at)"
+    )
+    op.execute("ALTER SEQUENCE clicks_id_seq OWNED BY clicks.id")
+    op.create_index('ix_clicks_link_id_clicked_at', 'clicks', ['link_id', 'clicked_at'], unique=False)
+    # Catches clicks outside every partition, it stays empty while the application is running.
+    op.execute("CREATE TABLE clicks_default PARTITION OF clicks DEFAULT")
+
+    now: datetime = datetime.now(timezone.utc)
+    oldest: datetime | None = op.get_bind().scalar(sa.text("SELECT min(clicked_at) FROM clicks_unpartitioned"))
+    lower: datetime = _month_start(oldest or now)
+    until: datetime = _next_month(_next_month(_month_start(now)))
+    while lower < until:
+        upper: datetime = _next_month(lower)
+        op.execute(
+            f"CREATE TABLE clicks_p{lower:%Y%m%d}_{upper:%Y%m%d} PARTITION OF clicks "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        lower = upper
+
+    op.execute("INSERT INTO clicks (id, link_id, clicked_at) SELECT id, link_id, clicked_at FROM clicks_unpartitioned")
+    op.execute("DROP TABLE clicks_unpartitioned")
+    op.execute("ANALYZE clicks")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE clicks RENAME TO clicks_partitioned")
+    op.execute("ALTER TABLE clicks_partitioned RENAME CONSTRAINT clicks_pkey TO clicks_partitioned_pkey")
+    op.execute("ALTER TABLE clicks_partitioned RENAME CONSTRAINT clicks_link_id_fkey TO clicks_partitioned_link_id_fkey")
+    op.execute("ALTER INDEX ix_clicks_link_id_clicked_at RENAME TO ix_clicks_partitioned_link_id_clicked_at")
+
+    op.execute(
+        "CREATE TABLE clicks ("
+        "id integer NOT NULL DEFAULT nextval('clicks_id_seq'), "
+        "link_id integer NOT NULL, "
+        "clicked_at timestamp with time zone NOT NULL, "
+        "CONSTRAINT clicks_pkey PRIMARY KEY (id), "
+        "CONSTRAINT clicks_link_id_fkey FOREIGN KEY (link_id) REFERENCES links (id) ON DELETE CASCADE"
+        ")"
+    )
+    op.execute("ALTER SEQUENCE clicks_id_seq OWNED BY clicks.id")
+    op.execute("INSERT INTO clicks (id, link_id, clicked_at) SELECT id, link_id, clicked_at FROM clicks_partitioned")
+    op.create_index('ix_clicks_link_id_clicked_at', 'clicks', ['link_id', 'clicked_at'], unique=False)
+    # Drops every partition with it.
+    op.execute("DROP TABLE clicks_partitioned")
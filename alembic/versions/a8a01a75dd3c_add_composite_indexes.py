@@ -0,0 +1,42 @@
+"""add composite indexes
+
+Revision ID: a8a01a75dd3c
+Revises: d104ece7b1a4
+Create Date: 2026-10-17 19:31:42.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8a01a75dd3c'
+down_revision: Union[str, None] = 'd104ece7b1a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps links and clicks writable while the indexes are built,
+    # it cannot run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_clicks_link_id_clicked_at', 'clicks', ['link_id', 'clicked_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_links_user_id_created_at', 'links', ['user_id', 'created_at'], unique=False,
+                        postgresql_include=['id'], postgresql_concurrently=True, if_not_exists=True)
+
+    # These duplicate the primary keys.
+    op.drop_index('ix_clicks_id', table_name='clicks')
+    op.drop_index('ix_links_id', table_name='links')
+    op.drop_index('ix_users_id', table_name='users')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+    op.create_index('ix_links_id', 'links', ['id'], unique=False)
+    op.create_index('ix_clicks_id', 'clicks', ['id'], unique=False)
+    op.drop_index('ix_links_user_id_created_at', table_name='links')
+    op.drop_index('ix_clicks_link_id_clicked_at', table_name='clicks')
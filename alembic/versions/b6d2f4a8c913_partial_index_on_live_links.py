@@ -0,0 +1,32 @@
+"""partial index on live links
+
+Revision ID: b6d2f4a8c913
+Revises: 7e3a9d1c4b26
+Create Date: 2026-10-17 22:12:40.184305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2f4a8c913'
+down_revision: Union[str, None] = '7e3a9d1c4b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # now() is not immutable and cannot be part of an index predicate, expiry is filtered by the query.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_links_live_short_id', 'links', ['short_id'], unique=True,
+                        postgresql_where=sa.text('is_active'), postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_links_live_short_id', table_name='links', postgresql_concurrently=True, if_exists=True)
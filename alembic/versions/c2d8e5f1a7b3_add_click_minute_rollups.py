@@ -0,0 +1,36 @@
+"""add click minute rollups
+
+Revision ID: c2d8e5f1a7b3
+Revises: 9a4e6b2c7f15
+Create Date: 2026-10-18 01:42:17.503921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d8e5f1a7b3'
+down_revision: Union[str, None] = '9a4e6b2c7f15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('click_minute_rollups',
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['link_id'], ['links.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('link_id', 'bucket_start')
+    )
+    op.create_index('ix_click_minute_rollups_bucket_start', 'click_minute_rollups', ['bucket_start'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_click_minute_rollups_bucket_start', table_name='click_minute_rollups')
+    op.drop_table('click_minute_rollups')
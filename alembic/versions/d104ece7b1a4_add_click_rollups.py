@@ -0,0 +1,52 @@
+"""add click rollups
+
+Revision ID: d104ece7b1a4
+Revises: 3e1be5b76e0a
+Create Date: 2026-10-17 19:20:11.304512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd104ece7b1a4'
+down_revision: Union[str, None] = '3e1be5b76e0a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('click_rollups',
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['link_id'], ['links.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('link_id', 'bucket_start')
+    )
+    op.create_table('click_totals',
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('clicks', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['link_id'], ['links.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('link_id')
+    )
+
+    # Backfill from the existing clicks. Buckets are truncated in UTC, like the application does.
+    op.execute(
+        "INSERT INTO click_rollups (link_id, bucket_start, clicks) "
+        "SELECT link_id, date_trunc('hour', clicked_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', count(*) "
+        "FROM clicks GROUP BY 1, 2"
+    )
+    op.execute(
+        "INSERT INTO click_totals (link_id, clicks) "
+        "SELECT link_id, count(*) FROM clicks GROUP BY link_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('click_totals')
+    op.drop_table('click_rollups')
@@ -0,0 +1,34 @@
+"""add redirect options to links
+
+Revision ID: d5e9a3b7c1f2
+Revises: c2d8e5f1a7b3
+Create Date: 2026-10-18 02:37:05.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e9a3b7c1f2'
+down_revision: Union[str, None] = 'c2d8e5f1a7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Constant server defaults: PostgreSQL adds the columns without rewriting the tables.
+    for table in ('links', 'links_archive'):
+        op.add_column(table, sa.Column('redirect_status', sa.SmallInteger(), server_default=sa.text('302'),
+                                       nullable=False))
+        op.add_column(table, sa.Column('cache_redirects', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('links_archive', 'links'):
+        op.drop_column(table, 'cache_redirects')
+        op.drop_column(table, 'redirect_status')
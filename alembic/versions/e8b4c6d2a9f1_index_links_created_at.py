@@ -0,0 +1,32 @@
+"""index links created_at
+
+Revision ID: e8b4c6d2a9f1
+Revises: d5e9a3b7c1f2
+Create Date: 2026-10-18 04:11:52.604718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4c6d2a9f1'
+down_revision: Union[str, None] = 'd5e9a3b7c1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Edge export deltas look up links created since the previous export.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_links_created_at', 'links', ['created_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_links_created_at', table_name='links', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,71 @@
+"""add link archive
+
+Revision ID: f3a7c1e9d204
+Revises: b6d2f4a8c913
+Create Date: 2026-10-17 22:48:03.617920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c1e9d204'
+down_revision: Union[str, None] = 'b6d2f4a8c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('links', sa.Column('deactivated_at', sa.DateTime(timezone=True), nullable=True))
+    # The real deactivation time of existing links is unknown, their grace period starts now.
+    op.execute("UPDATE links SET deactivated_at = now() WHERE NOT is_active")
+
+    op.create_table('links_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('short_id', sa.String(), nullable=False),
+    sa.Column('orig_url', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expire_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('deactivated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_links_archive_short_id'), 'links_archive', ['short_id'], unique=False)
+    op.create_index(op.f('ix_links_archive_user_id'), 'links_archive', ['user_id'], unique=False)
+    op.create_table('clicks_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('link_id', sa.Integer(), nullable=False),
+    sa.Column('clicked_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['link_id'], ['links_archive.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_clicks_archive_link_id_clicked_at', 'clicks_archive', ['link_id', 'clicked_at'],
+                    unique=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_links_expire_at', 'links', ['expire_at'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_links_deactivated_at', 'links', ['deactivated_at'], unique=False,
+                        postgresql_where=sa.text('deactivated_at IS NOT NULL'), postgresql_concurrently=True,
+                        if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_links_deactivated_at', table_name='links', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_links_expire_at', table_name='links', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_index('ix_clicks_archive_link_id_clicked_at', table_name='clicks_archive')
+    op.drop_table('clicks_archive')
+    op.drop_index(op.f('ix_links_archive_user_id'), table_name='links_archive')
+    op.drop_index(op.f('ix_links_archive_short_id'), table_name='links_archive')
+    op.drop_table('links_archive')
+    op.drop_column('links', 'deactivated_at')
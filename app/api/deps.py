@@ -1,33 +1,67 @@
-from typing import Generator
+from typing import AsyncGenerator, Any, Callable
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBasicCredentials, HTTPBasic
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette import status
 
-from app.crud.user import crud_authenticate_user
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.crud.user import crud_authenticate_user_async
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.models.user import User
 
 security = HTTPBasic()
 
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+class LazyAsyncSession:
+    # Creates the AsyncSession on first use, so requests answered from caches never build or close one.
+    def __init__(self, factory: Callable[[], AsyncSession]) -> None:
+        self._factory: Callable[[], AsyncSession] = factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+def get_session_factory() -> Callable[[], Session]:
+    return SessionLocal
+
+
+def get_async_session_factory() -> Callable[[], AsyncSession]:
+    return AsyncSessionLocal
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    db = LazyAsyncSession(AsyncSessionLocal)
     try:
         yield db
     except:
-        db.rollback()
+        await db.rollback()
         raise
     finally:
-        db.close()
+        await db.close()
 
 
-def get_current_user(
+async def get_current_user(
         credentials: HTTPBasicCredentials = Depends(security),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
 ) -> User:
-    user = crud_authenticate_user(db, credentials.username, credentials.password)
+    user = await crud_authenticate_user_async(db, credentials.username, credentials.password)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,3 +75,12 @@ def get_current_user(
             headers={"WWW-Authenticate": "Basic"},
         )
     return user
+
+
+async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.username not in settings.ADMIN_USERNAMES:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin rights required"
+        )
+    return current_user
@@ -1,10 +1,15 @@
 from fastapi import APIRouter
 
+from app.api.routes.admin import router as admin_router
 from app.api.routes.links import router as links_router
 from app.api.routes.stats import router as stats_router
 from app.api.routes.public import router as public_router
+from app.api.routes.metrics import router as metrics_router
 
 main_router = APIRouter()
 main_router.include_router(links_router, prefix="/api/links", tags=["Links 🔗"])
 main_router.include_router(stats_router, prefix="/api/stats", tags=["Stats 📊"])
+main_router.include_router(admin_router, prefix="/api/admin", tags=["Admin 🛠️"])
+# Before the public router, otherwise "/{short_id}" would take "/metrics".
+main_router.include_router(metrics_router)
 main_router.include_router(public_router, tags=["Public 🧭"])
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Callable
+
+from fastapi import APIRouter, status, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_admin_user, get_session_factory
+from app.exceptions import LinkExportError
+from app.models import User
+from app.services.edge_export import EdgeExport, ExportFormat
+
+router = APIRouter()
+
+
+@router.get(
+    "/edge-export",
+    description="Export live links for serving redirects from nginx or a CDN: an nginx `map`, a JSON or CSV "
+                "manifest, or a binary link map sorted by short ID. With `since`, only the links created, deactivated "
+                "or expired after it are exported (JSON or CSV). The `X-Export-Next-Since` header holds `since` "
+                "for the next delta.",
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Delta is not available for the format or since is too old"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized (invalid/missing Basic Auth)"},
+        status.HTTP_403_FORBIDDEN: {"description": "User is inactive or not an admin"},
+    }
+)
+async def export_edge_links(
+        format: ExportFormat = Query("nginx", description="Output format"),
+        since: datetime | None = Query(None, description="Export only changes after this time"),
+        session_factory: Callable[[], Session] = Depends(get_session_factory),
+        current_user: User = Depends(get_admin_user)
+) -> StreamingResponse:
+    try:
+        export: EdgeExport = EdgeExport(session_factory, format, since)
+    except LinkExportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    # The export reads through the sync engine, the response iterates it in the thread pool.
+    return StreamingResponse(
+        export,
+        media_type=export.media_type,
+        headers={
+            "X-Export-Next-Since": export.next_since.isoformat(),
+            "Content-Disposition": f'attachment; filename="{export.file_name}"',
+        }
+    )
@@ -1,15 +1,68 @@
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator
+
 from fastapi import APIRouter, status, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
-from app.crud.link import crud_create_link, crud_get_link_by_short_id, crud_deactivate_link, crud_get_user_links
-from app.exceptions import LinkCreateError, LinkNotFoundError, LinkUpdateError
+from app.api.deps import get_async_db, get_current_user
+from app.core.config import settings
+from app.crud.link import crud_create_generated_link_async, crud_get_link_by_short_id_async, \
+    crud_deactivate_link_async, crud_get_user_links_async, crud_bulk_create_generated_links_async
+from app.exceptions import LinkCreateError, LinkNotFoundError, LinkUpdateError, ShortIdGenerationError, \
+    InvalidCursorError
 from app.models import User, Link
-from app.schemas.link import LinkCreate, LinkResponse, LinkListResponse
-from app.utils.short_id import generate_short_id, ShortIdGenerationError
+from app.schemas.link import LinkCreate, LinkResponse, LinkListResponse, LinkBulkItemResult, LinkBulkResponse
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPES: set[str] = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+async def _iter_bulk_payloads(request: Request) -> AsyncIterator[bytes | Any]:
+    # NDJSON is parsed while it streams in, a JSON array has to be read whole.
+    media_type: str = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        pending: bytes = b""
+        async for chunk in request.stream():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if pending.strip():
+            yield pending
+        return
+
+    try:
+        payload: Any = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Request body must be a JSON array or NDJSON"
+        )
+    if not isinstance(payload, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Request body must be a JSON array or NDJSON"
+        )
+    for item in payload:
+        yield item
+
+
+def _validate_bulk_item(payload: bytes | Any) -> LinkCreate:
+    if isinstance(payload, bytes):
+        return LinkCreate.model_validate_json(payload)
+    return LinkCreate.model_validate(payload)
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}" for detail in error.errors()
+    )
+
 
 @router.post(
     "/",
@@ -23,22 +76,23 @@ router = APIRouter()
         status.HTTP_403_FORBIDDEN: {"description": "User is inactive"},
     }
 )
-def create_link(
+async def create_link(
         request: Request,
         link_in: LinkCreate,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ) -> LinkResponse | None:
     base_url: str = str(request.base_url).rstrip("/")
 
     try:
-        new_link: Link = crud_create_link(
+        new_link: Link = await crud_create_generated_link_async(
             db=db,
-            short_id=generate_short_id(db),
             orig_url=str(link_in.orig_url),
             user_id=current_user.id,
             expire_seconds=link_in.expire_seconds,
-            is_active=True
+            is_active=True,
+            redirect_status=link_in.redirect_status,
+            cache_redirects=link_in.cache_redirects
         )
     except ShortIdGenerationError as e:
         raise HTTPException(
@@ -55,6 +109,89 @@ def create_link(
     return LinkResponse.model_validate(new_link)
 
 
+@router.post(
+    "/bulk",
+    description="Create many links at once from a JSON array or an NDJSON stream of links. "
+                "Every item gets its own result, failed items do not stop the others.",
+    response_model=LinkBulkResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {"description": "Items processed, see per-item results"},
+        status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized (invalid/missing Basic Auth)"},
+        status.HTTP_403_FORBIDDEN: {"description": "User is inactive"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Body is neither a JSON array nor NDJSON"},
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": LinkCreate.model_json_schema()}
+                },
+                "application/x-ndjson": {
+                    "schema": LinkCreate.model_json_schema()
+                },
+            },
+        }
+    }
+)
+async def create_links_bulk(
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(get_current_user)
+) -> LinkBulkResponse:
+    base_url: str = str(request.base_url).rstrip("/")
+    results: list[LinkBulkItemResult] = []
+    chunk: list[tuple[int, LinkCreate]] = []
+
+    async def flush_chunk() -> None:
+        # Redirect options are set per insert, items are grouped by them. Usually the whole chunk is one group.
+        groups: dict[tuple[int, bool], list[tuple[int, LinkCreate]]] = {}
+        for index, link_in in chunk:
+            groups.setdefault((link_in.redirect_status, link_in.cache_redirects), []).append((index, link_in))
+        for (redirect_status, cache_redirects), group in groups.items():
+            try:
+                new_links: list[Link] = await crud_bulk_create_generated_links_async(
+                    db=db,
+                    user_id=current_user.id,
+                    links=[(str(link_in.orig_url), link_in.expire_seconds) for _, link_in in group],
+                    is_active=True,
+                    redirect_status=redirect_status,
+                    cache_redirects=cache_redirects
+                )
+            except (ShortIdGenerationError, LinkCreateError) as e:
+                results.extend(LinkBulkItemResult(index=index, error=str(e)) for index, _ in group)
+            else:
+                for (index, _), new_link in zip(group, new_links):
+                    new_link.short_url = f"{base_url}/{new_link.short_id}"
+                    results.append(LinkBulkItemResult(index=index, link=LinkResponse.model_validate(new_link)))
+        chunk.clear()
+
+    index: int = 0
+    async for payload in _iter_bulk_payloads(request):
+        if index >= settings.LINK_BULK_MAX_ITEMS:
+            # Items before the cap may already be created, so they are reported and the rest is not read.
+            results.append(LinkBulkItemResult(
+                index=index,
+                error=f"Too many items, at most {settings.LINK_BULK_MAX_ITEMS} are accepted per request, "
+                      f"this and the following items were not read"
+            ))
+            break
+        try:
+            chunk.append((index, _validate_bulk_item(payload)))
+        except ValidationError as e:
+            results.append(LinkBulkItemResult(index=index, error=_format_validation_error(e)))
+        if len(chunk) >= settings.LINK_BULK_CHUNK_SIZE:
+            await flush_chunk()
+        index += 1
+    if chunk:
+        await flush_chunk()
+
+    results.sort(key=lambda result: result.index)
+    created: int = sum(1 for result in results if result.link is not None)
+    return LinkBulkResponse(created=created, failed=len(results) - created, items=results)
+
+
 @router.patch(
     "/{short_id}/deactivate",
     description="Deactivate a link by its short ID.",
@@ -67,16 +204,16 @@ def create_link(
         status.HTTP_404_NOT_FOUND: {"description": "Link not found"},
     }
 )
-def deactivate_link(
+async def deactivate_link(
         request: Request,
         short_id: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ) -> LinkResponse | None:
     base_url: str = str(request.base_url).rstrip("/")
 
     try:
-        link: Link | None = crud_get_link_by_short_id(db, short_id)
+        link: Link | None = await crud_get_link_by_short_id_async(db, short_id)
 
         if link is None:
             raise HTTPException(
@@ -88,7 +225,7 @@ def deactivate_link(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to deactivate this link"
             )
-        link: Link | None = crud_deactivate_link(db, link)
+        link: Link | None = await crud_deactivate_link_async(db, link)
     except LinkUpdateError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -101,16 +238,18 @@ def deactivate_link(
 
 @router.get(
     "/",
-    description="Get all links for the current user with optional filters and pagination.",
+    description="Get all links for the current user with optional filters and pagination. "
+                "Pass next_cursor back as cursor to fetch the next page.",
     response_model=LinkListResponse,
     status_code=status.HTTP_200_OK,
     responses={
         status.HTTP_200_OK: {"description": "Links retrieved successfully"},
+        status.HTTP_400_BAD_REQUEST: {"description": "Invalid cursor"},
         status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized (invalid/missing Basic Auth)"},
         status.HTTP_403_FORBIDDEN: {"description": "User is inactive"},
     }
 )
-def read_links(
+async def read_links(
         request: Request,
         is_valid: bool | None = Query(None,
                                       description="Filter current and outdated links. If not provided, all links are returned"),
@@ -118,28 +257,58 @@ def read_links(
                                        description="Filter active and inactive links. If not provided, all links are returned"),
         page: int = Query(1, ge=1, description="Page number for pagination"),
         page_size: int = Query(10, ge=1, le=100, description="Page size for pagination"),
-        db: Session = Depends(get_db),
+        cursor: str | None = Query(None,
+                                   description="Opaque cursor from next_cursor of the previous response. "
+                                               "Replaces page and stays fast on deep pages"),
+        include_total: bool = Query(True,
+                                    description="Count all matching links. Disable to skip the count on large accounts"),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
 ) -> LinkListResponse:
     base_url: str = str(request.base_url).rstrip("/")
 
+    after: tuple[datetime, int] | None = None
+    if cursor is not None:
+        if page != 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Use either page or cursor, not both"
+            )
+        try:
+            after = decode_cursor(cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
     offset: int = (page - 1) * page_size
 
     links: list[Link]
-    total_items: int
-    links, total_items = crud_get_user_links(db, current_user.id, is_valid, is_active, page_size, offset)
+    total_items: int | None
+    has_more: bool
+    links, total_items, has_more = await crud_get_user_links_async(
+        db, current_user.id, is_valid, is_active, page_size, offset, after, include_total
+    )
 
-    total_pages: int = (total_items + page_size - 1) // page_size
+    total_pages: int | None = None
+    if total_items is not None:
+        total_pages = (total_items + page_size - 1) // page_size
     items = []
 
     for link in links:
         link.short_url = f"{base_url}/{link.short_id}"
         items.append(LinkResponse.model_validate(link))
 
+    next_cursor: str | None = None
+    if has_more and links:
+        next_cursor = encode_cursor(links[-1].created_at, links[-1].id)
+
     return LinkListResponse(
-        page=page,
+        page=page if cursor is None else None,
         page_size=page_size,
         total_items=total_items,
         total_pages=total_pages,
+        next_cursor=next_cursor,
         items=items
     )
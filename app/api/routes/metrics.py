@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.responses import Response
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    description="Prometheus metrics.",
+    include_in_schema=False
+)
+async def metrics() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,61 +1,123 @@
 import logging
-from datetime import datetime, timezone
+from time import time
 
-from fastapi import APIRouter, status, Depends, HTTPException
-from sqlalchemy.orm import Session
-from starlette.responses import RedirectResponse
+from fastapi import APIRouter, status, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import RedirectResponse, Response
 
-from app.api.deps import get_db
-from app.crud.link import crud_get_link_by_short_id
-from app.crud.stats import crud_log_click
+from app.api.deps import get_async_db
+from app.core.config import settings
+from app.core.metrics import REDIRECTS
+from app.crud.link import crud_resolve_link_async, crud_get_link_unavailable_reason_async, LinkResolution, \
+    LinkUnavailableReason
+from app.crud.stats import crud_log_click_async
 from app.exceptions import ClickLogError
-from app.models import Link
+from app.services.click_buffer import click_buffer
+from app.services.click_counters import click_counters
+from app.utils.http_cache import redirect_etag, redirect_max_age, etag_matches
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+UNAVAILABLE_DETAILS: dict[LinkUnavailableReason, str] = {
+    "not_found": "Link not found",
+    "inactive": "Link is inactive",
+    "expired": "Link has expired",
+}
+
+
+async def _log_click(db: AsyncSession, link_id: int) -> None:
+    try:
+        if not await click_counters.increment(link_id) and not click_buffer.put(link_id):
+            await crud_log_click_async(db, link_id)
+    except ClickLogError as e:
+        logger.error(f"Error logging click for link {link_id}: {str(e)}")
+
+
+def _cache_headers(link: LinkResolution) -> dict[str, str]:
+    if link.cache_redirects:
+        max_age: int = redirect_max_age(link.expire_ts, time(), settings.REDIRECT_CACHE_MAX_AGE_SECONDS)
+        if max_age > 0:
+            return {
+                "Cache-Control": f"public, max-age={max_age}",
+                "ETag": redirect_etag(link.id, link.orig_url, link.redirect_status),
+            }
+    # Every click has to reach the service to be counted.
+    return {"Cache-Control": "no-store"}
+
+
+async def _get_live_link(db: AsyncSession, short_id: str) -> LinkResolution:
+    link: LinkResolution | None = await crud_resolve_link_async(db, short_id)
+    if link is None:
+        reason: LinkUnavailableReason = await crud_get_link_unavailable_reason_async(db, short_id)
+        REDIRECTS.labels(status="404", reason=reason).inc()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=UNAVAILABLE_DETAILS[reason],
+        )
+    return link
+
 
 @router.get(
     "/{short_id}",
-    description="Get a link by short ID.",
+    description="Get a link by short ID. The redirect status is set per link. Links with cacheable redirects "
+                "get Cache-Control and ETag headers, the others are sent with no-store.",
     status_code=status.HTTP_302_FOUND,
     responses={
+        status.HTTP_301_MOVED_PERMANENTLY: {"description": "Redirects to the original URL"},
         status.HTTP_302_FOUND: {"description": "Redirects to the original URL"},
+        status.HTTP_304_NOT_MODIFIED: {"description": "The cached redirect is still valid"},
+        status.HTTP_307_TEMPORARY_REDIRECT: {"description": "Redirects to the original URL"},
+        status.HTTP_308_PERMANENT_REDIRECT: {"description": "Redirects to the original URL"},
         status.HTTP_404_NOT_FOUND: {"description": "Link not found or inactive/expired"},
     }
 )
-def redirect_to_original(
+async def redirect_to_original(
         short_id: str,
-        db: Session = Depends(get_db),
+        request: Request,
+        db: AsyncSession = Depends(get_async_db),
 ):
-    link: Link | None = crud_get_link_by_short_id(db, short_id)
+    link: LinkResolution = await _get_live_link(db, short_id)
 
-    if link is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Link not found",
-        )
+    if not (link.cache_redirects and settings.REDIRECT_BEACON_ENABLED):
+        await _log_click(db, link.id)
 
-    if not link.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Link is inactive",
-        )
+    headers: dict[str, str] = _cache_headers(link)
+    if "ETag" in headers and etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        REDIRECTS.labels(status="304", reason="not_modified").inc()
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    now: datetime = datetime.now(timezone.utc)
-    if link.expire_at.replace(tzinfo=timezone.utc) <= now:
+    REDIRECTS.labels(status=str(link.redirect_status), reason="found").inc()
+    return RedirectResponse(
+        url=link.orig_url,
+        status_code=link.redirect_status,
+        headers=headers
+    )
+
+
+@router.post(
+    "/{short_id}/beacon",
+    description="Count a click on a link with cacheable redirects, sent by the destination page "
+                "(e.g. with navigator.sendBeacon). Available when beacons are enabled.",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        status.HTTP_204_NO_CONTENT: {"description": "Click counted"},
+        status.HTTP_404_NOT_FOUND: {"description": "Link not found or inactive/expired, or beacons are disabled"},
+    }
+)
+async def count_beacon_click(
+        short_id: str,
+        db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    if not settings.REDIRECT_BEACON_ENABLED:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Link has expired",
+            detail="Not Found",
         )
 
-    try:
-        crud_log_click(db, link.id)
-    except ClickLogError as e:
-        logger.error(f"Error logging click for link {link.id}: {str(e)}")
-
-    return RedirectResponse(
-        url=link.orig_url,
-        status_code=status.HTTP_302_FOUND
-    )
+    link: LinkResolution = await _get_live_link(db, short_id)
+    # Redirects of other links are counted by the redirect itself.
+    if link.cache_redirects:
+        await _log_click(db, link.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
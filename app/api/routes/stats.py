@@ -1,36 +1,88 @@
+from typing import Callable
+
 from fastapi import APIRouter, status, Request, Query, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
-from app.crud.link import crud_get_link_by_short_id
-from app.crud.stats import crud_get_stats_for_user_links, crud_get_stats_for_single_link
-from app.models import User, Link
+from app.api.deps import get_async_db, get_current_user, get_async_session_factory
+from app.core.config import settings
+from app.crud.stats import crud_get_stats_for_user_links_async, crud_get_stats_for_short_ids_async, LinkStats
+from app.models import User
 from app.schemas.stats import StatsListResponse, StatsResponse
+from app.services.stats_cache import stats_cache
 
 router = APIRouter()
 
 
+def _parse_ids(ids: list[str]) -> list[str]:
+    # Accepts both ?ids=a,b and ?ids=a&ids=b, duplicates are dropped and the order is kept.
+    short_ids: dict[str, None] = {}
+    for value in ids:
+        for short_id in value.split(","):
+            short_id = short_id.strip()
+            if short_id:
+                short_ids[short_id] = None
+    return list(short_ids)
+
+
+def _to_response(stats: LinkStats, base_url: str) -> StatsResponse:
+    return StatsResponse(
+        orig_url=stats.orig_url,
+        short_url=f"{base_url}/{stats.short_id}",
+        last_hour_clicks=stats.last_hour_clicks,
+        last_day_clicks=stats.last_day_clicks,
+        all_clicks=stats.all_clicks
+    )
+
+
 @router.get(
     "/",
-    description="Get statistics for the user's links.",
+    description="Get statistics for the user's links. With `ids`, get statistics for the given links of the user: "
+                "links that do not exist or belong to someone else are left out.",
     response_model=StatsListResponse,
     status_code=status.HTTP_200_OK,
     responses={
+        status.HTTP_400_BAD_REQUEST: {"description": "Too many ids"},
         status.HTTP_401_UNAUTHORIZED: {"description": "Unauthorized (invalid/missing Basic Auth)"},
         status.HTTP_403_FORBIDDEN: {"description": "User is inactive"},
     }
 )
-def read_top_links_stats(
+async def read_top_links_stats(
         request: Request,
         top: int = Query(100, ge=1, description="Number of top links to retrieve"),
         sort_by: str = Query("all", enum=["hour", "day", "all"],
                              description="Sort by 'last_hour_clicks', 'last_day_clicks', or 'all_clicks'"),
-        db: Session = Depends(get_db),
+        ids: list[str] | None = Query(None, description="Short IDs, comma-separated or repeated"),
+        db: AsyncSession = Depends(get_async_db),
+        session_factory: Callable[[], AsyncSession] = Depends(get_async_session_factory),
         current_user: User = Depends(get_current_user)
 ) -> StatsListResponse:
-    raw_stats: list[tuple[str, str, int, int, int]] = crud_get_stats_for_user_links(db, current_user.id, top, sort_by)
+    user_id: int = current_user.id
     base_url: str = str(request.base_url).rstrip("/")
 
+    if ids is not None:
+        short_ids: list[str] = _parse_ids(ids)
+        if len(short_ids) > settings.STATS_BATCH_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many ids, at most {settings.STATS_BATCH_MAX_IDS} are accepted per request"
+            )
+        link_stats: dict[str, LinkStats] = await crud_get_stats_for_short_ids_async(db, short_ids, user_id)
+        return StatsListResponse(items=[
+            _to_response(link_stats[short_id], base_url)
+            for short_id in short_ids
+            if short_id in link_stats and link_stats[short_id].user_id == user_id
+        ])
+
+    # Runs in its own session: the result may be computed for, or after, requests other than this one.
+    async def compute() -> list[tuple[str, str, int, int, int]]:
+        session: AsyncSession = session_factory()
+        try:
+            return await crud_get_stats_for_user_links_async(session, user_id, top, sort_by)
+        finally:
+            await session.close()
+
+    raw_stats: list[tuple[str, str, int, int, int]] = await stats_cache.get((user_id, top, sort_by), compute)
+
     items: list[StatsResponse] = []
     for orig_url, short_id, last_hour_clicks, last_day_clicks, all_clicks in raw_stats:
         items.append(
@@ -57,38 +109,25 @@ def read_top_links_stats(
         status.HTTP_404_NOT_FOUND: {"description": "Link not found"},
     }
 )
-def read_link_stats(
+async def read_link_stats(
         request: Request,
         short_id: str,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_async_db),
         current_user: User = Depends(get_current_user)
-) -> StatsResponse | None:
-    link: Link | None = crud_get_link_by_short_id(db, short_id)
+) -> StatsResponse:
+    link_stats: LinkStats | None = (
+        await crud_get_stats_for_short_ids_async(db, [short_id], current_user.id)
+    ).get(short_id)
 
-    if link is None:
+    if link_stats is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Link not found"
         )
-    if link.user_id != current_user.id:
+    if link_stats.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="You do not have permission to deactivate this link"
+            detail="You do not have permission to view stats of this link"
         )
 
-    result = crud_get_stats_for_single_link(db, link)
-    if result is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Stats not found"
-        )
-
-    base_url: str = str(request.base_url).rstrip("/")
-    orig_url, short_id, last_hour_clicks, last_day_clicks, all_clicks = crud_get_stats_for_single_link(db, link)
-    return StatsResponse(
-        orig_url=orig_url,
-        short_url=f"{base_url}/{short_id}",
-        last_hour_clicks=last_hour_clicks,
-        last_day_clicks=last_day_clicks,
-        all_clicks=all_clicks
-    )
+    return _to_response(link_stats, str(request.base_url).rstrip("/"))
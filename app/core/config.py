@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,9 +9,99 @@ class Settings(BaseSettings):
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
+    POSTGRES_REPLICA_HOSTS: list[str] = []
 
     DEFAULT_USER_USERNAME: str
     DEFAULT_USER_PASSWORD: str
+    # Users allowed to call /api/admin endpoints.
+    ADMIN_USERNAMES: list[str] = []
+
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 30.0
+    DB_STATEMENT_TIMEOUT_MS: int | None = None
+    DB_PGBOUNCER: bool = False
+    REPLICA_STICKY_SECONDS: float = 5.0
+    REPLICA_STICKY_MAX_USERS: int = 100_000
+
+    LINK_CACHE_MAX_SIZE: int = 10_000
+    LINK_CACHE_TTL_SECONDS: float = 60.0
+    NEGATIVE_LINK_CACHE_MAX_SIZE: int = 10_000
+    NEGATIVE_LINK_CACHE_TTL_SECONDS: float = 5.0
+
+    # Optional cache shared by all workers, e.g. redis://127.0.0.1:6379/0. Unset keeps caches per process.
+    REDIS_URL: str | None = None
+    REDIS_KEY_PREFIX: str = "url-alias:"
+    REDIS_TIMEOUT_SECONDS: float = 0.1
+    REDIS_RETRY_SECONDS: float = 5.0
+
+    SHORT_ID_FILTER_ENABLED: bool = True
+    SHORT_ID_FILTER_ERROR_RATE: float = 0.01
+    SHORT_ID_FILTER_MIN_CAPACITY: int = 100_000
+    SHORT_ID_FILTER_REFRESH_INTERVAL_SECONDS: float = 1.0
+    SHORT_ID_FILTER_REFRESH_LOOKBACK_SECONDS: float = 5.0
+    # Filter misses are answered as 404 only when this worker sees every create: set it when running a single
+    # worker. With REDIS_URL, creates reach the other workers through pub/sub and misses are trusted anyway.
+    SHORT_ID_FILTER_SINGLE_WORKER: bool = False
+
+    # "random" draws ids with secrets, "sequence" encodes numbers reserved in blocks from a Postgres sequence.
+    SHORT_ID_STRATEGY: Literal["random", "sequence"] = "random"
+    SHORT_ID_LENGTH: int = 8
+    SHORT_ID_MAX_ATTEMPTS: int = 10
+    SHORT_ID_SEQUENCE_BLOCK_SIZE: int = 100
+
+    LINK_BULK_MAX_ITEMS: int = 50_000
+    LINK_BULK_CHUNK_SIZE: int = 1_000
+
+    # Upper bound of Cache-Control max-age for links with cacheable redirects.
+    REDIRECT_CACHE_MAX_AGE_SECONDS: int = 86400
+    # Clicks on cacheable links are then counted only from beacons sent by the destination page.
+    REDIRECT_BEACON_ENABLED: bool = False
+
+    EDGE_EXPORT_BATCH_SIZE: int = 5_000
+    # The next delta starts this long before an export began, links committed while it ran are not missed.
+    EDGE_EXPORT_DELTA_OVERLAP_SECONDS: float = 60.0
+
+    # Redirects look links up in a memory-mapped file shared by the workers, see app/services/link_snapshot.py.
+    LINK_SNAPSHOT_ENABLED: bool = False
+    LINK_SNAPSHOT_PATH: str = "/tmp/url-alias-links.bin"
+    LINK_SNAPSHOT_INTERVAL_SECONDS: float = 300.0
+    LINK_SNAPSHOT_DELTA_INTERVAL_SECONDS: float = 1.0
+
+    STATS_BATCH_MAX_IDS: int = 100
+    STATS_CACHE_MAX_SIZE: int = 10_000
+    STATS_CACHE_HOUR_TTL_SECONDS: float = 5.0
+    STATS_CACHE_DAY_TTL_SECONDS: float = 30.0
+    STATS_CACHE_ALL_TTL_SECONDS: float = 60.0
+    STATS_CACHE_STALE_SECONDS: float = 30.0
+
+    CREDENTIAL_CACHE_MAX_SIZE: int = 1_000
+    CREDENTIAL_CACHE_TTL_SECONDS: float = 300.0
+
+    CLICK_BUFFER_ENABLED: bool = True
+    CLICK_BUFFER_MAX_SIZE: int = 10_000
+    CLICK_BUFFER_BATCH_SIZE: int = 500
+    CLICK_BUFFER_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Counts clicks per link and minute and adds them to the rollups every flush interval, without rows in clicks.
+    # Takes precedence over the click buffer.
+    CLICK_COUNTERS_ENABLED: bool = False
+    CLICK_COUNTERS_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    CLICK_PARTITIONS_ENABLED: bool = True
+    CLICK_PARTITION_INTERVAL: Literal["day", "month"] = "month"
+    CLICK_PARTITIONS_AHEAD: int = 2
+    CLICK_PARTITION_CHECK_INTERVAL_SECONDS: float = 3600.0
+    CLICK_RETENTION_DAYS: int | None = None
+
+    LINK_SWEEPER_ENABLED: bool = True
+    LINK_SWEEPER_INTERVAL_SECONDS: float = 300.0
+    LINK_ARCHIVE_GRACE_SECONDS: int = 7 * 24 * 60 * 60
+    LINK_ARCHIVE_BATCH_SIZE: int = 500
+    LINK_ARCHIVE_CLICK_BATCH_SIZE: int = 10_000
 
     @property
     def DATABASE_URL_psycopg(self):
@@ -21,6 +113,30 @@ class Settings(BaseSettings):
             f"{self.POSTGRES_DB}"
         )
 
+    @property
+    def DATABASE_URL_asyncpg(self):
+        return (
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:"
+            f"{self.POSTGRES_PASSWORD}@"
+            f"{self.POSTGRES_HOST}:"
+            f"{self.POSTGRES_PORT}/"
+            f"{self.POSTGRES_DB}"
+        )
+
+    @property
+    def DATABASE_REPLICA_URLS_psycopg(self) -> list[str]:
+        return [
+            f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{host}/{self.POSTGRES_DB}"
+            for host in self.POSTGRES_REPLICA_HOSTS
+        ]
+
+    @property
+    def DATABASE_REPLICA_URLS_asyncpg(self) -> list[str]:
+        return [
+            f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{host}/{self.POSTGRES_DB}"
+            for host in self.POSTGRES_REPLICA_HOSTS
+        ]
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
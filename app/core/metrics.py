@@ -0,0 +1,137 @@
+import inspect
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, TypeVar, Iterator
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from sqlalchemy.pool import Pool, QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Buckets from 0.5 ms, the redirect path is expected to stay in the low milliseconds.
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+HTTP_REQUEST_DURATION: Histogram = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+REDIRECTS: Counter = Counter(
+    "redirects_total",
+    "Redirect requests by response status and reason",
+    ["status", "reason"]
+)
+CRUD_DURATION: Histogram = Histogram(
+    "crud_duration_seconds",
+    "Latency of app.crud functions",
+    ["function"],
+    buckets=LATENCY_BUCKETS
+)
+DB_POOL_CHECKOUT_DURATION: Histogram = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time spent waiting for a connection from the pool",
+    ["pool"],
+    buckets=LATENCY_BUCKETS
+)
+STATS_CACHE_REQUESTS: Counter = Counter(
+    "stats_cache_requests_total",
+    "Top links stats requests by cache result",
+    ["result"]
+)
+SHARED_CACHE_REQUESTS: Counter = Counter(
+    "shared_cache_requests_total",
+    "Shared cache lookups and errors",
+    ["cache", "result"]
+)
+LINK_SNAPSHOT_LOOKUPS: Counter = Counter(
+    "link_snapshot_lookups_total",
+    "Redirect lookups in the link snapshot by result",
+    ["result"]
+)
+CLICK_BUFFER_DROPPED: Counter = Counter(
+    "click_buffer_dropped_total",
+    "Clicks of failed writes dropped because the click buffer was full"
+)
+PASSWORD_VERIFY_DURATION: Histogram = Histogram(
+    "password_verify_duration_seconds",
+    "Time spent verifying password hashes",
+    buckets=LATENCY_BUCKETS
+)
+
+
+class PoolStatsCollector(Collector):
+    # Reads the pools at scrape time, so the gauges cost nothing on the request path.
+    def __init__(self, pools: Callable[[], dict[str, Pool]]) -> None:
+        self.pools: Callable[[], dict[str, Pool]] = pools
+
+    def collect(self) -> Iterator[Metric]:
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["pool"])
+        connections = GaugeMetricFamily("db_pool_connections", "Open pool connections by state",
+                                        labels=["pool", "state"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond the pool size", labels=["pool"])
+        for name, pool in self.pools().items():
+            if not isinstance(pool, QueuePool):
+                continue
+            size.add_metric([name], pool.size())
+            connections.add_metric([name, "checked_out"], pool.checkedout())
+            connections.add_metric([name, "idle"], pool.checkedin())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield size
+        yield connections
+        yield overflow
+
+
+def timed_crud(func: F) -> F:
+    histogram = CRUD_DURATION.labels(function=func.__name__)
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with histogram.time():
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with histogram.time():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code: int = 500
+        started: float = perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope. Unmatched paths share one label,
+            # so that scans of random URLs do not create new series.
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status_code)
+            ).observe(perf_counter() - started)
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import select, insert, delete, or_, literal, DateTime
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.metrics import timed_crud
+from app.exceptions import LinkArchiveError
+from app.models import Link, Click, ClickRollup, ClickMinuteRollup, ClickTotal, ArchivedLink, ArchivedClick
+
+
+@timed_crud
+def crud_archive_dead_links(db: Session, cutoff: datetime, batch_size: int, click_batch_size: int) -> int:
+    # Rows locked by another sweeper or by a request are skipped, they are picked up by a later batch.
+    link_ids: list[int] = list(db.scalars(
+        select(Link.id)
+        .where(or_(Link.expire_at < cutoff, Link.deactivated_at < cutoff))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ))
+    if not link_ids:
+        db.commit()
+        return 0
+
+    archived_at = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+    try:
+        db.execute(insert(ArchivedLink).from_select(
+            ["id", "short_id", "orig_url", "user_id", "created_at", "expire_at", "is_active", "deactivated_at",
+             "redirect_status", "cache_redirects", "archived_at"],
+            select(Link.id, Link.short_id, Link.orig_url, Link.user_id, Link.created_at, Link.expire_at,
+                   Link.is_active, Link.deactivated_at, Link.redirect_status, Link.cache_redirects,
+                   archived_at).where(Link.id.in_(link_ids))
+        ))
+        # Popular links have many clicks, so they are moved click_batch_size at a time to bound every statement.
+        while True:
+            click_ids: list[int] = list(db.scalars(
+                select(Click.id).where(Click.link_id.in_(link_ids)).order_by(Click.id).limit(click_batch_size)
+            ))
+            if not click_ids:
+                break
+            db.execute(insert(ArchivedClick).from_select(
+                ["id", "link_id", "clicked_at"],
+                select(Click.id, Click.link_id, Click.clicked_at).where(Click.id.in_(click_ids))
+            ))
+            db.execute(delete(Click).where(Click.id.in_(click_ids)))
+        db.execute(delete(ClickRollup).where(ClickRollup.link_id.in_(link_ids)))
+        db.execute(delete(ClickMinuteRollup).where(ClickMinuteRollup.link_id.in_(link_ids)))
+        db.execute(delete(ClickTotal).where(ClickTotal.link_id.in_(link_ids)))
+        db.execute(delete(Link).where(Link.id.in_(link_ids)))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise LinkArchiveError("Error while archiving links")
+
+    return len(link_ids)
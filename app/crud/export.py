@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from typing import NamedTuple, Iterator
+
+from sqlalchemy import select, and_, or_, Select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import timed_crud
+from app.models import Link
+
+_links = Link.__table__
+
+
+class ExportedLink(NamedTuple):
+    id: int
+    short_id: str
+    orig_url: str
+    expire_at: datetime
+    redirect_status: int
+    cache_redirects: bool
+    live: bool
+
+
+def _to_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def crud_iter_exported_links(
+        db: Session,
+        now: datetime,
+        since: datetime | None = None,
+        batch_size: int = settings.EDGE_EXPORT_BATCH_SIZE
+) -> Iterator[ExportedLink]:
+    # A single query read through a server-side cursor. Ordered by the bytes of short_id whatever the database
+    # collation is, so that the exported link map can be binary-searched. Without since only live links are read,
+    # with it every link created, deactivated or expired after since, live or not.
+    live = and_(_links.c.is_active, _links.c.expire_at > now)
+    order_key = _links.c.short_id
+    if db.get_bind().dialect.name == "postgresql":
+        order_key = order_key.collate("C")
+    stmt: Select = select(
+        _links.c.id, _links.c.short_id, _links.c.orig_url, _links.c.expire_at, _links.c.redirect_status,
+        _links.c.cache_redirects, live.label("live")
+    ).order_by(order_key)
+    if since is None:
+        stmt = stmt.where(live)
+    else:
+        stmt = stmt.where(or_(
+            _links.c.created_at > since,
+            _links.c.deactivated_at > since,
+            and_(_links.c.expire_at > since, _links.c.expire_at <= now)
+        ))
+
+    for row in db.execute(stmt.execution_options(yield_per=batch_size)):
+        yield ExportedLink(id=row.id, short_id=row.short_id, orig_url=row.orig_url, expire_at=_to_utc(row.expire_at),
+                           redirect_status=row.redirect_status, cache_redirects=row.cache_redirects,
+                           live=bool(row.live))
+
+
+@timed_crud
+def crud_get_deactivated_short_ids(db: Session, since: datetime) -> set[str]:
+    return set(db.scalars(select(_links.c.short_id).where(_links.c.deactivated_at > since)))
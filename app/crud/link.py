@@ -1,24 +1,194 @@
 from datetime import datetime, timedelta, timezone
+from time import time
+from typing import NamedTuple, Literal
 
+from sqlalchemy import insert, or_, and_, select, bindparam, func, Select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.exceptions import LinkCreateError, LinkUpdateError
+from app.core.config import settings
+from app.core.metrics import timed_crud
+from app.db.routing import replica_reads, note_write, share_write, load_shared_write
+from app.exceptions import LinkCreateError, LinkUpdateError, ShortIdGenerationError
 from app.models import Link
+from app.services.link_snapshot import link_snapshot
+from app.services.shared_cache import shared_cache
+from app.services.short_id_filter import short_id_filter
+from app.services.stats_cache import stats_cache
+from app.utils.link_map import LinkMapEntry
+from app.utils.lru_cache import TTLCache
+from app.utils.short_id import short_id_generator
 
 
+class LinkResolution(NamedTuple):
+    id: int
+    orig_url: str
+    expire_ts: float
+    redirect_status: int = 302
+    cache_redirects: bool = False
+
+
+LinkUnavailableReason = Literal["not_found", "inactive", "expired"]
+
+
+link_cache: TTLCache[str, LinkResolution] = TTLCache(
+    max_size=settings.LINK_CACHE_MAX_SIZE,
+    ttl_seconds=settings.LINK_CACHE_TTL_SECONDS
+)
+_links = Link.__table__
+# Core statement over the table columns, built once: no ORM entities are loaded into the session,
+# and SQLAlchemy reuses the compiled form on every call. Only live links match, the bare is_active condition
+# lets PostgreSQL use the partial ix_links_live_short_id index.
+_resolve_link_stmt: Select = (
+    select(_links.c.id, _links.c.orig_url, _links.c.expire_at, _links.c.redirect_status, _links.c.cache_redirects)
+    .where(_links.c.short_id == bindparam("short_id"), _links.c.is_active, _links.c.expire_at > func.now())
+)
+_link_state_stmt: Select = (
+    select(_links.c.is_active, _links.c.expire_at)
+    .where(_links.c.short_id == bindparam("short_id"))
+)
+
+# Why short ids could not be resolved. Kept briefly, links created by other processes show up after the TTL.
+negative_link_cache: TTLCache[str, LinkUnavailableReason] = TTLCache(
+    max_size=settings.NEGATIVE_LINK_CACHE_MAX_SIZE,
+    ttl_seconds=settings.NEGATIVE_LINK_CACHE_TTL_SECONDS
+)
+
+
+def _shared_key(short_id: str) -> str:
+    return f"link:{short_id}"
+
+
+def _forget_link(short_id: str) -> None:
+    link_cache.delete(short_id)
+    negative_link_cache.delete(short_id)
+    link_snapshot.forget(short_id)
+
+
+def _note_created(short_ids: str) -> None:
+    for short_id in short_ids.split(","):
+        negative_link_cache.delete(short_id)
+        short_id_filter.add(short_id)
+
+
+# Deactivations and creates in other workers arrive through the shared cache.
+shared_cache.on_invalidate("link", _forget_link, link_cache.clear)
+shared_cache.on_invalidate("created", _note_created, short_id_filter.mark_stale)
+
+
+def _filter_misses_trusted() -> bool:
+    # A link created by another worker is missing from this filter until the next refresh,
+    # unless the create was announced through the shared cache.
+    return settings.SHORT_ID_FILTER_SINGLE_WORKER or shared_cache.subscribed
+
+
+def _is_known_missing(short_id: str) -> bool:
+    if negative_link_cache.get(short_id) is not None:
+        return True
+    return (not short_id_filter.might_exist(short_id) and not short_id_filter.refresh_due()
+            and _filter_misses_trusted())
+
+
+async def _announce_created(links: list[Link]) -> None:
+    await shared_cache.publish("created", ",".join(link.short_id for link in links))
+
+
+def _to_timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _mark_created(short_ids: list[str]) -> None:
+    for short_id in short_ids:
+        link_cache.delete(short_id)
+        negative_link_cache.delete(short_id)
+        short_id_filter.add(short_id)
+
+
+@timed_crud
 def crud_get_link_by_short_id(db: Session, short_id: str) -> Link | None:
-    return db.query(Link).filter(Link.short_id == short_id).first()
+    with replica_reads(db) as on_replica:
+        link: Link | None = db.query(Link).filter(Link.short_id == short_id).first()
+    # A replica may not have replayed a link created a moment ago yet.
+    if link is None and on_replica:
+        link = db.query(Link).filter(Link.short_id == short_id).first()
+    return link
+
+
+@timed_crud
+def crud_get_link_resolution(db: Session, short_id: str) -> LinkResolution | None:
+    with replica_reads(db) as on_replica:
+        row = db.execute(_resolve_link_stmt, {"short_id": short_id}).first()
+    if row is None and on_replica:
+        row = db.execute(_resolve_link_stmt, {"short_id": short_id}).first()
+    if row is None:
+        return None
+    return LinkResolution(id=row.id, orig_url=row.orig_url, expire_ts=_to_timestamp(row.expire_at),
+                          redirect_status=row.redirect_status, cache_redirects=row.cache_redirects)
+
+
+def _get_cached_resolution(short_id: str) -> LinkResolution | None:
+    cached: LinkResolution | None = link_cache.get(short_id)
+    if cached is None or cached.expire_ts > time():
+        return cached
+    link_cache.delete(short_id)
+    negative_link_cache.set(short_id, "expired")
+    return None
+
+
+@timed_crud
+def crud_resolve_link(db: Session, short_id: str) -> LinkResolution | None:
+    cached: LinkResolution | None = _get_cached_resolution(short_id)
+    if cached is not None:
+        return cached
+    if _is_known_missing(short_id):
+        return None
+
+    resolution: LinkResolution | None = crud_get_link_resolution(db, short_id)
+    if resolution is None:
+        crud_get_link_unavailable_reason(db, short_id)
+        return None
+
+    link_cache.set(short_id, resolution)
+    return resolution
+
+
+@timed_crud
+def crud_get_link_unavailable_reason(db: Session, short_id: str) -> LinkUnavailableReason:
+    cached: LinkUnavailableReason | None = negative_link_cache.get(short_id)
+    if cached is not None:
+        return cached
+    if _is_known_missing(short_id):
+        return "not_found"
 
+    row = db.execute(_link_state_stmt, {"short_id": short_id}).first()
+    if row is None:
+        reason: LinkUnavailableReason = "not_found"
+    elif not row.is_active:
+        reason = "inactive"
+    elif _to_timestamp(row.expire_at) <= time():
+        reason = "expired"
+    else:
+        # Became live since the resolver looked, do not remember it as unavailable.
+        return "not_found"
 
+    negative_link_cache.set(short_id, reason)
+    return reason
+
+
+@timed_crud
 def crud_get_user_links(
         db: Session,
         user_id: int,
         is_valid: bool | None = True,
         is_active: bool | None = True,
         limit: int = 10,
-        offset: int = 0
-) -> tuple[list[Link] | None, int]:
+        offset: int = 0,
+        after: tuple[datetime, int] | None = None,
+        with_total: bool = True
+) -> tuple[list[Link] | None, int | None, bool]:
     query = db.query(Link).filter(Link.user_id == user_id)
 
     now: datetime = datetime.now(timezone.utc)
@@ -29,18 +199,41 @@ def crud_get_user_links(
     if is_active is not None:
         query = query.filter(Link.is_active == is_active)
 
-    total: int = query.count()
+    page_query = query
+    if after is not None:
+        # Keyset pagination: continue right below the last (created_at, id) of the previous page.
+        after_created_at, after_id = after
+        page_query = page_query.filter(or_(
+            Link.created_at < after_created_at,
+            and_(Link.created_at == after_created_at, Link.id < after_id)
+        ))
+
+    def fetch() -> tuple[list[Link], int | None]:
+        total: int | None = query.count() if with_total else None
+        # One extra row tells whether there is a next page without counting.
+        page: list[Link] = (
+            page_query.order_by(Link.created_at.desc(), Link.id.desc()).offset(offset).limit(limit + 1).all()
+        )
+        return page, total
 
-    return query.order_by(Link.created_at.desc()).offset(offset).limit(limit).all(), total
+    with replica_reads(db, user_id) as on_replica:
+        links, total = fetch()
+    # A replica may not have replayed the first links of a user yet.
+    if not links and on_replica:
+        links, total = fetch()
+    return links[:limit], total, len(links) > limit
 
 
+@timed_crud
 def crud_create_link(
         db: Session,
         short_id: str,
         orig_url: str,
         user_id: int,
         expire_seconds: int,
-        is_active: bool
+        is_active: bool,
+        redirect_status: int = 302,
+        cache_redirects: bool = False
 ) -> Link:
     expire_at: datetime = datetime.now(timezone.utc) + timedelta(seconds=expire_seconds)
 
@@ -50,7 +243,9 @@ def crud_create_link(
         user_id=user_id,
         created_at=datetime.now(timezone.utc),
         expire_at=expire_at,
-        is_active=is_active
+        is_active=is_active,
+        redirect_status=redirect_status,
+        cache_redirects=cache_redirects
     )
     db.add(new_link)
     try:
@@ -60,14 +255,105 @@ def crud_create_link(
         db.rollback()
         raise LinkCreateError("Error while creating a link")
 
+    _mark_created([new_link.short_id])
+    note_write(user_id)
+    stats_cache.invalidate_user(user_id)
     return new_link
 
 
+@timed_crud
+def crud_bulk_create_links(
+        db: Session,
+        user_id: int,
+        links: list[tuple[str, str, int]],
+        is_active: bool = True,
+        redirect_status: int = 302,
+        cache_redirects: bool = False
+) -> list[Link]:
+    if not links:
+        return []
+
+    now: datetime = datetime.now(timezone.utc)
+    rows: list[dict] = [
+        {
+            "short_id": short_id,
+            "orig_url": orig_url,
+            "user_id": user_id,
+            "created_at": now,
+            "expire_at": now + timedelta(seconds=expire_seconds),
+            "is_active": is_active,
+            "redirect_status": redirect_status,
+            "cache_redirects": cache_redirects
+        }
+        for short_id, orig_url, expire_seconds in links
+    ]
+    try:
+        new_links: list[Link] = list(db.scalars(insert(Link).returning(Link, sort_by_parameter_order=True), rows))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise LinkCreateError("Error while creating links")
+
+    for new_link in new_links:
+        _mark_created([new_link.short_id])
+    note_write(user_id)
+    stats_cache.invalidate_user(user_id)
+    return new_links
+
+
+@timed_crud
+def crud_create_generated_link(
+        db: Session,
+        orig_url: str,
+        user_id: int,
+        expire_seconds: int,
+        is_active: bool,
+        redirect_status: int = 302,
+        cache_redirects: bool = False
+) -> Link:
+    # Short ids are not checked up front, a collision fails on the unique index and is retried with a new id.
+    for _ in range(settings.SHORT_ID_MAX_ATTEMPTS):
+        short_id: str = short_id_generator.generate(db)[0]
+        try:
+            return crud_create_link(db, short_id, orig_url, user_id, expire_seconds, is_active, redirect_status,
+                                    cache_redirects)
+        except LinkCreateError:
+            continue
+    raise ShortIdGenerationError("Failed to create a link with a unique short ID after multiple attempts")
+
+
+@timed_crud
+def crud_bulk_create_generated_links(
+        db: Session,
+        user_id: int,
+        links: list[tuple[str, int]],
+        is_active: bool = True,
+        redirect_status: int = 302,
+        cache_redirects: bool = False
+) -> list[Link]:
+    for _ in range(settings.SHORT_ID_MAX_ATTEMPTS):
+        short_ids: list[str] = short_id_generator.generate(db, len(links))
+        try:
+            return crud_bulk_create_links(
+                db,
+                user_id,
+                [(short_id, orig_url, expire_seconds) for short_id, (orig_url, expire_seconds) in zip(short_ids, links)],
+                is_active,
+                redirect_status,
+                cache_redirects
+            )
+        except LinkCreateError:
+            continue
+    raise ShortIdGenerationError("Failed to create links with unique short IDs after multiple attempts")
+
+
+@timed_crud
 def crud_deactivate_link(
         db: Session,
         link: Link
 ) -> Link | None:
     link.is_active = False
+    link.deactivated_at = datetime.now(timezone.utc)
     db.add(link)
 
     try:
@@ -77,4 +363,124 @@ def crud_deactivate_link(
         db.rollback()
         raise LinkUpdateError("Error while deactivating a link")
 
+    _forget_link(link.short_id)
+    note_write(link.user_id)
+    stats_cache.invalidate_user(link.user_id)
     return link
+
+
+async def crud_get_link_by_short_id_async(db: AsyncSession, short_id: str) -> Link | None:
+    return await db.run_sync(crud_get_link_by_short_id, short_id)
+
+
+async def crud_resolve_link_async(db: AsyncSession, short_id: str) -> LinkResolution | None:
+    # Cache hits and ids known to be missing are answered without touching the session.
+    cached: LinkResolution | None = _get_cached_resolution(short_id)
+    if cached is not None:
+        return cached
+    if _is_known_missing(short_id):
+        return None
+
+    entry: LinkMapEntry | None = link_snapshot.get(short_id)
+    if entry is not None:
+        resolution: LinkResolution = LinkResolution(entry.id, entry.orig_url, entry.expire_ts, entry.redirect_status,
+                                                    entry.cache_redirects)
+        link_cache.set(short_id, resolution)
+        return resolution
+
+    shared: list | None = (await shared_cache.get_many("link", [_shared_key(short_id)]))[0]
+    if shared is not None:
+        shared_resolution: LinkResolution = LinkResolution(*shared)
+        if shared_resolution.expire_ts > time():
+            link_cache.set(short_id, shared_resolution)
+            return shared_resolution
+
+    resolution = await db.run_sync(crud_resolve_link, short_id)
+    if resolution is not None:
+        await shared_cache.set("link", _shared_key(short_id), list(resolution),
+                               min(settings.LINK_CACHE_TTL_SECONDS, resolution.expire_ts - time()))
+    return resolution
+
+
+async def crud_get_link_unavailable_reason_async(db: AsyncSession, short_id: str) -> LinkUnavailableReason:
+    cached: LinkUnavailableReason | None = negative_link_cache.get(short_id)
+    if cached is not None:
+        return cached
+    if _is_known_missing(short_id):
+        return "not_found"
+    return await db.run_sync(crud_get_link_unavailable_reason, short_id)
+
+
+async def crud_get_user_links_async(
+        db: AsyncSession,
+        user_id: int,
+        is_valid: bool | None = True,
+        is_active: bool | None = True,
+        limit: int = 10,
+        offset: int = 0,
+        after: tuple[datetime, int] | None = None,
+        with_total: bool = True
+) -> tuple[list[Link] | None, int | None, bool]:
+    await load_shared_write(user_id)
+    return await db.run_sync(crud_get_user_links, user_id, is_valid, is_active, limit, offset, after, with_total)
+
+
+async def crud_create_link_async(
+        db: AsyncSession,
+        short_id: str,
+        orig_url: str,
+        user_id: int,
+        expire_seconds: int,
+        is_active: bool,
+        redirect_status: int = 302,
+        cache_redirects: bool = False
+) -> Link:
+    new_link: Link = await db.run_sync(crud_create_link, short_id, orig_url, user_id, expire_seconds, is_active,
+                                       redirect_status, cache_redirects)
+    await _announce_created([new_link])
+    await share_write(user_id)
+    await stats_cache.publish_invalidation(user_id)
+    return new_link
+
+
+async def crud_create_generated_link_async(
+        db: AsyncSession,
+        orig_url: str,
+        user_id: int,
+        expire_seconds: int,
+        is_active: bool,
+        redirect_status: int = 302,
+        cache_redirects: bool = False
+) -> Link:
+    new_link: Link = await db.run_sync(crud_create_generated_link, orig_url, user_id, expire_seconds, is_active,
+                                       redirect_status, cache_redirects)
+    await _announce_created([new_link])
+    await share_write(user_id)
+    await stats_cache.publish_invalidation(user_id)
+    return new_link
+
+
+async def crud_bulk_create_generated_links_async(
+        db: AsyncSession,
+        user_id: int,
+        links: list[tuple[str, int]],
+        is_active: bool = True,
+        redirect_status: int = 302,
+        cache_redirects: bool = False
+) -> list[Link]:
+    new_links: list[Link] = await db.run_sync(crud_bulk_create_generated_links, user_id, links, is_active,
+                                              redirect_status, cache_redirects)
+    await _announce_created(new_links)
+    await share_write(user_id)
+    await stats_cache.publish_invalidation(user_id)
+    return new_links
+
+
+async def crud_deactivate_link_async(db: AsyncSession, link: Link) -> Link | None:
+    # Shared cache invalidations go through the async client here, never from the blocking CRUD code.
+    short_id, user_id = link.short_id, link.user_id
+    deactivated: Link | None = await db.run_sync(crud_deactivate_link, link)
+    await shared_cache.invalidate("link", short_id, [_shared_key(short_id)])
+    await share_write(user_id)
+    await stats_cache.publish_invalidation(user_id)
+    return deactivated
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.metrics import timed_crud
+from app.models import Click
+from app.utils.partitions import PartitionInterval, period_start, next_period, partition_name, partition_bounds
+
+CLICKS_TABLE: str = Click.__tablename__
+
+
+def _is_partitioned(db: Session, table: str) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(db.scalar(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table}
+    ))
+
+
+def _lock_partitions(db: Session, table: str) -> None:
+    # Serializes maintenance between workers. The lock timeout keeps DDL from queueing redirects behind it.
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"partitions:{table}"})
+    db.execute(text("SET LOCAL lock_timeout = '5s'"))
+
+
+@timed_crud
+def crud_get_click_partitions(db: Session) -> list[tuple[str, datetime, datetime]]:
+    if not _is_partitioned(db, CLICKS_TABLE):
+        return []
+    names: list[str] = list(db.scalars(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+             "WHERE i.inhparent = to_regclass(:table)"),
+        {"table": CLICKS_TABLE}
+    ))
+    partitions: list[tuple[str, datetime, datetime]] = []
+    for name in names:
+        bounds: tuple[datetime, datetime] | None = partition_bounds(CLICKS_TABLE, name)
+        if bounds is not None:
+            partitions.append((name, *bounds))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+@timed_crud
+def crud_create_click_partitions(db: Session, now: datetime, interval: PartitionInterval, ahead: int) -> list[str]:
+    if not _is_partitioned(db, CLICKS_TABLE):
+        return []
+    _lock_partitions(db, CLICKS_TABLE)
+
+    partitions: list[tuple[str, datetime, datetime]] = crud_get_click_partitions(db)
+    lower: datetime = partitions[-1][2] if partitions else period_start(now, interval)
+    until: datetime = period_start(now, interval)
+    for _ in range(ahead + 1):
+        until = next_period(until, interval)
+
+    created: list[str] = []
+    while lower < until:
+        # The first new partition may be shorter, it realigns the ranges after a granularity change.
+        upper: datetime = next_period(lower, interval)
+        name: str = partition_name(CLICKS_TABLE, lower, upper)
+        db.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {CLICKS_TABLE} '
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        created.append(name)
+        lower = upper
+    db.commit()
+    return created
+
+
+@timed_crud
+def crud_drop_click_partitions(db: Session, before: datetime) -> list[str]:
+    if not _is_partitioned(db, CLICKS_TABLE):
+        return []
+    _lock_partitions(db, CLICKS_TABLE)
+
+    dropped: list[str] = []
+    for name, _, upper in crud_get_click_partitions(db):
+        if upper > before:
+            break
+        db.execute(text(f'DROP TABLE "{name}"'))
+        dropped.append(name)
+    db.commit()
+    return dropped
@@ -1,34 +1,243 @@
+from collections import Counter
 from datetime import datetime, timezone, timedelta
+from typing import NamedTuple
 
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, insert, select, delete, cast, union_all, BigInteger, ColumnElement
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, Query
 
+from app.core.metrics import timed_crud
+from app.db.routing import replica_reads, load_shared_write
 from app.exceptions import ClickLogError
-from app.models import Click, Link
+from app.models import Click, Link, ClickRollup, ClickMinuteRollup, ClickTotal
 
+ROLLUP_BUCKET: timedelta = timedelta(hours=1)
+MINUTE_BUCKET: timedelta = timedelta(minutes=1)
+# Minute rollups only count the partial hour at the start of the last day window.
+MINUTE_ROLLUP_RETENTION: timedelta = timedelta(days=2)
 
+
+class LinkStats(NamedTuple):
+    user_id: int
+    orig_url: str
+    short_id: str
+    last_hour_clicks: int
+    last_day_clicks: int
+    all_clicks: int
+
+
+def hour_bucket(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def minute_bucket(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+def _first_full_bucket(since: datetime) -> datetime:
+    bucket: datetime = hour_bucket(since)
+    return bucket if bucket == since else bucket + ROLLUP_BUCKET
+
+
+def _first_full_minute(since: datetime) -> datetime:
+    bucket: datetime = minute_bucket(since)
+    return bucket if bucket == since else bucket + MINUTE_BUCKET
+
+
+def _upsert_increment(db: Session, model: type[ClickRollup] | type[ClickMinuteRollup] | type[ClickTotal], rows: list[dict],
+                      index_elements: list[str]) -> None:
+    dialect: str = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(model)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(model)
+    else:
+        raise NotImplementedError(f"Click rollups are not supported for the '{dialect}' dialect")
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={"clicks": model.clicks + stmt.excluded.clicks}
+    )
+    db.execute(stmt, rows)
+
+
+@timed_crud
+def crud_add_clicks_to_rollups(db: Session, clicks: list[tuple[int, datetime]]) -> None:
+    if not clicks:
+        return
+
+    buckets: Counter[tuple[int, datetime]] = Counter(
+        (link_id, hour_bucket(clicked_at)) for link_id, clicked_at in clicks
+    )
+    totals: Counter[int] = Counter(link_id for link_id, _ in clicks)
+
+    # Rows are sorted so that concurrent writers lock them in the same order.
+    _upsert_increment(
+        db,
+        ClickRollup,
+        [{"link_id": link_id, "bucket_start": bucket_start, "clicks": count}
+         for (link_id, bucket_start), count in sorted(buckets.items())],
+        ["link_id", "bucket_start"]
+    )
+    _upsert_increment(
+        db,
+        ClickTotal,
+        [{"link_id": link_id, "clicks": count} for link_id, count in sorted(totals.items())],
+        ["link_id"]
+    )
+
+
+@timed_crud
 def crud_log_click(db: Session, link_id: int) -> None:
-    click: Click = Click(link_id=link_id, clicked_at=datetime.now(timezone.utc))
+    clicked_at: datetime = datetime.now(timezone.utc)
+    click: Click = Click(link_id=link_id, clicked_at=clicked_at)
     db.add(click)
     try:
+        db.flush()
+        crud_add_clicks_to_rollups(db, [(link_id, clicked_at)])
         db.commit()
     except IntegrityError:
         db.rollback()
         raise ClickLogError("Error while logging click")
 
 
-def crud_get_stats_for_user_links(db: Session, user_id: int, top: int = 10, sort_by: str = "all") -> list[
-    tuple[str, str, int, int, int]]:
+@timed_crud
+def crud_bulk_log_clicks(db: Session, clicks: list[tuple[int, datetime]]) -> None:
+    if not clicks:
+        return
+
+    try:
+        try:
+            with db.begin_nested():
+                db.execute(insert(Click), [{"link_id": link_id, "clicked_at": clicked_at} for link_id, clicked_at in clicks])
+        except IntegrityError:
+            # Some links were removed while their clicks were buffered: keep the clicks of the remaining ones.
+            link_ids: set[int] = {link_id for link_id, _ in clicks}
+            existing: set[int] = set(db.scalars(select(Link.id).where(Link.id.in_(link_ids))))
+            clicks = [(link_id, clicked_at) for link_id, clicked_at in clicks if link_id in existing]
+            if clicks:
+                db.execute(insert(Click), [{"link_id": link_id, "clicked_at": clicked_at} for link_id, clicked_at in clicks])
+        crud_add_clicks_to_rollups(db, clicks)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise ClickLogError("Error while logging clicks")
+
+
+@timed_crud
+def crud_add_click_counts(db: Session, counts: dict[tuple[int, datetime], int]) -> int:
+    # Write-back of the click counters: per-minute counts go to the rollups without rows in clicks.
+    existing: set[int] = set(db.scalars(select(Link.id).where(Link.id.in_({link_id for link_id, _ in counts}))))
+    minutes: Counter[tuple[int, datetime]] = Counter()
+    for (link_id, bucket_start), count in counts.items():
+        if link_id in existing:
+            minutes[(link_id, minute_bucket(bucket_start))] += count
+    if not minutes:
+        db.commit()
+        return 0
+
+    hours: Counter[tuple[int, datetime]] = Counter()
+    totals: Counter[int] = Counter()
+    for (link_id, bucket_start), count in minutes.items():
+        hours[(link_id, hour_bucket(bucket_start))] += count
+        totals[link_id] += count
+
+    try:
+        _upsert_increment(
+            db,
+            ClickMinuteRollup,
+            [{"link_id": link_id, "bucket_start": bucket_start, "clicks": count}
+             for (link_id, bucket_start), count in sorted(minutes.items())],
+            ["link_id", "bucket_start"]
+        )
+        _upsert_increment(
+            db,
+            ClickRollup,
+            [{"link_id": link_id, "bucket_start": bucket_start, "clicks": count}
+             for (link_id, bucket_start), count in sorted(hours.items())],
+            ["link_id", "bucket_start"]
+        )
+        _upsert_increment(
+            db,
+            ClickTotal,
+            [{"link_id": link_id, "clicks": count} for link_id, count in sorted(totals.items())],
+            ["link_id"]
+        )
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise ClickLogError("Error while writing click counters")
+    return sum(minutes.values())
+
+
+@timed_crud
+def crud_prune_minute_rollups(db: Session, before: datetime) -> int:
+    deleted: int = db.execute(delete(ClickMinuteRollup).where(ClickMinuteRollup.bucket_start < before)).rowcount
+    db.commit()
+    return deleted
+
+
+def _stats_query(db: Session, *link_filters: ColumnElement[bool]) -> Query:
+    # Window counts are read from the hourly rollups. Only the partial hour at the start of each window is
+    # counted from raw clicks, so the result is exact without scanning the whole clicks history.
     now: datetime = datetime.now(timezone.utc)
     one_hour_ago: datetime = now - timedelta(hours=1)
     one_day_ago: datetime = now - timedelta(days=1)
+    hour_buckets_from: datetime = _first_full_bucket(one_hour_ago)
+    day_buckets_from: datetime = _first_full_bucket(one_day_ago)
 
-    last_hour_cnt = func.count(Click.id).filter(Click.clicked_at >= one_hour_ago).label("last_hour_clicks")
-    last_day_cnt = func.count(Click.id).filter(Click.clicked_at >= one_day_ago).label("last_day_clicks")
-    all_cnt = func.count(Click.id).label("all_clicks")
+    rollups = (
+        db.query(
+            ClickRollup.link_id,
+            func.sum(ClickRollup.clicks).filter(ClickRollup.bucket_start >= hour_buckets_from).label("hour_clicks"),
+            func.sum(ClickRollup.clicks).label("day_clicks")
+        )
+        .join(Link, Link.id == ClickRollup.link_id)
+        .filter(*link_filters, ClickRollup.bucket_start >= day_buckets_from)
+        .group_by(ClickRollup.link_id)
+        .subquery()
+    )
 
-    query = (
+    # One subquery per window keeps each edge a plain (link_id, clicked_at) range on the clicks index.
+    # Clicks written back by the click counters have no rows, their edges are counted from minute rollups.
+    def edge_counts(since: datetime, until: datetime):
+        raw = (
+            select(Click.link_id.label("link_id"), func.count().label("clicks"))
+            .join(Link, Link.id == Click.link_id)
+            .where(*link_filters, Click.clicked_at >= since, Click.clicked_at < until)
+            .group_by(Click.link_id)
+        )
+        minutes = (
+            select(ClickMinuteRollup.link_id.label("link_id"), func.sum(ClickMinuteRollup.clicks).label("clicks"))
+            .join(Link, Link.id == ClickMinuteRollup.link_id)
+            .where(*link_filters, ClickMinuteRollup.bucket_start >= _first_full_minute(since),
+                   ClickMinuteRollup.bucket_start < until)
+            .group_by(ClickMinuteRollup.link_id)
+        )
+        edges = union_all(raw, minutes).subquery()
+        return (
+            select(edges.c.link_id, func.sum(edges.c.clicks).label("clicks"))
+            .group_by(edges.c.link_id)
+            .subquery()
+        )
+
+    hour_edges = edge_counts(one_hour_ago, hour_buckets_from)
+    day_edges = edge_counts(one_day_ago, day_buckets_from)
+
+    # SUM over BIGINT is NUMERIC on Postgres, cast back so that callers get plain ints.
+    last_hour_cnt = cast(func.coalesce(rollups.c.hour_clicks, 0) + func.coalesce(hour_edges.c.clicks, 0),
+                         BigInteger).label("last_hour_clicks")
+    last_day_cnt = cast(func.coalesce(rollups.c.day_clicks, 0) + func.coalesce(day_edges.c.clicks, 0),
+                        BigInteger).label("last_day_clicks")
+    all_cnt = func.coalesce(ClickTotal.clicks, 0).label("all_clicks")
+
+    return (
         db.query(
             Link.orig_url,
             Link.short_id,
@@ -36,42 +245,73 @@ def crud_get_stats_for_user_links(db: Session, user_id: int, top: int = 10, sort
             last_day_cnt,
             all_cnt
         )
-        .filter(Link.user_id == user_id)
-        .outerjoin(Click, Click.link_id == Link.id)
-        .group_by(Link.id)
+        .filter(*link_filters)
+        .outerjoin(rollups, rollups.c.link_id == Link.id)
+        .outerjoin(hour_edges, hour_edges.c.link_id == Link.id)
+        .outerjoin(day_edges, day_edges.c.link_id == Link.id)
+        .outerjoin(ClickTotal, ClickTotal.link_id == Link.id)
     )
 
+
+@timed_crud
+def crud_get_stats_for_user_links(db: Session, user_id: int, top: int = 10, sort_by: str = "all") -> list[
+    tuple[str, str, int, int, int]]:
+    query = _stats_query(db, Link.user_id == user_id)
+
     if sort_by == "hour":
-        query = query.order_by(desc(last_hour_cnt))
+        query = query.order_by(desc("last_hour_clicks"))
     elif sort_by == "day":
-        query = query.order_by(desc(last_day_cnt))
+        query = query.order_by(desc("last_day_clicks"))
     else:
-        query = query.order_by(desc(all_cnt))
+        query = query.order_by(desc("all_clicks"))
 
     query = query.limit(top)
 
-    result = query.all()
+    with replica_reads(db, user_id):
+        result = query.all()
     stats: list[tuple[str, str, int, int, int]] = [
         (row.orig_url, row.short_id, row.last_hour_clicks, row.last_day_clicks, row.all_clicks) for row in result]
     return stats
 
 
-def crud_get_stats_for_single_link(db: Session, link: Link) -> tuple[str, str, int, int, int] | None:
-    now: datetime = datetime.now(timezone.utc)
-    one_hour_ago: datetime = now - timedelta(hours=1)
-    one_day_ago: datetime = now - timedelta(days=1)
+@timed_crud
+def crud_get_stats_for_short_ids(db: Session, short_ids: list[str], reader_id: int) -> dict[str, LinkStats]:
+    # Owner, link and window counts come from one query, so callers check ownership without loading the link first.
+    if not short_ids:
+        return {}
+
+    def fetch(ids: list[str]) -> dict[str, LinkStats]:
+        query = _stats_query(db, Link.short_id.in_(ids)).add_columns(Link.user_id)
+        return {
+            row.short_id: LinkStats(row.user_id, row.orig_url, row.short_id, row.last_hour_clicks,
+                                    row.last_day_clicks, row.all_clicks)
+            for row in query.all()
+        }
+
+    with replica_reads(db, reader_id) as on_replica:
+        stats: dict[str, LinkStats] = fetch(short_ids)
+    # A replica may not have replayed links created a moment ago yet.
+    missing: list[str] = [short_id for short_id in short_ids if short_id not in stats]
+    if missing and on_replica:
+        stats.update(fetch(missing))
+    return stats
+
+
+async def crud_log_click_async(db: AsyncSession, link_id: int) -> None:
+    await db.run_sync(crud_log_click, link_id)
+
+
+async def crud_bulk_log_clicks_async(db: AsyncSession, clicks: list[tuple[int, datetime]]) -> None:
+    await db.run_sync(crud_bulk_log_clicks, clicks)
+
+
+async def crud_get_stats_for_user_links_async(db: AsyncSession, user_id: int, top: int = 10, sort_by: str = "all") -> list[
+    tuple[str, str, int, int, int]]:
+    await load_shared_write(user_id)
+    return await db.run_sync(crud_get_stats_for_user_links, user_id, top, sort_by)
 
-    query = (
-        db.query(
-            Link.orig_url,
-            Link.short_id,
-            func.count(Click.id).filter(Click.clicked_at >= one_hour_ago).label("last_hour_clicks"),
-            func.count(Click.id).filter(Click.clicked_at >= one_day_ago).label("last_day_clicks"),
-            func.count(Click.id).label("all_clicks")
-        )
-        .filter(Link.user_id == link.user_id, Link.short_id == link.short_id)
-        .outerjoin(Click, Click.link_id == Link.id)
-        .group_by(Link.id)
-    )
 
-    return query.first()
+async def crud_get_stats_for_short_ids_async(db: AsyncSession, short_ids: list[str],
+                                             reader_id: int) -> dict[str, LinkStats]:
+    await load_shared_write(reader_id)
+    return await db.run_sync(crud_get_stats_for_short_ids, short_ids, reader_id)
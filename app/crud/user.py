@@ -1,15 +1,30 @@
+import hmac
+
+from anyio import to_thread
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.metrics import timed_crud
 from app.exceptions import UserAlreadyExistsError, UserCreateError
 from app.models.user import User
-from app.utils.hashing import hash_password, verify_password
+from app.utils.hashing import hash_password, verify_password, credential_digest
+from app.utils.lru_cache import TTLCache
+
+# Successful verifications: credential digest -> password hash they were checked against.
+credential_cache: TTLCache[str, str] = TTLCache(
+    max_size=settings.CREDENTIAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CREDENTIAL_CACHE_TTL_SECONDS
+)
 
 
+@timed_crud
 def crud_get_user_by_username(db: Session, username: str) -> User | None:
     return db.query(User).filter(User.username == username).first()
 
 
+@timed_crud
 def crud_create_user(db: Session, username: str, plain_password: str) -> User:
     if db.query(User).filter(User.username == username).first() is not None:
         raise UserAlreadyExistsError(f"User with username '{username}' already exists")
@@ -28,8 +43,52 @@ def crud_create_user(db: Session, username: str, plain_password: str) -> User:
     return new_user
 
 
+def _is_verification_cached(user: User, digest: str) -> bool:
+    # The user row is always loaded fresh, so a changed password hash or a deactivated user
+    # never matches an entry that was cached before the change.
+    cached_hash: str | None = credential_cache.get(digest)
+    if cached_hash is None:
+        return False
+    if not user.is_active or not hmac.compare_digest(cached_hash, user.password_hash):
+        credential_cache.delete(digest)
+        return False
+    return True
+
+
+def _cache_verification(user: User, digest: str) -> None:
+    if user.is_active:
+        credential_cache.set(digest, user.password_hash)
+
+
+@timed_crud
 def crud_authenticate_user(db: Session, username: str, plain_password: str) -> User | None:
     user: User | None = crud_get_user_by_username(db, username)
-    if user is not None and verify_password(plain_password, user.password_hash):
+    if user is None:
+        return None
+
+    digest: str = credential_digest(username, plain_password)
+    if _is_verification_cached(user, digest):
+        return user
+    if verify_password(plain_password, user.password_hash):
+        _cache_verification(user, digest)
+        return user
+    return None
+
+
+async def crud_get_user_by_username_async(db: AsyncSession, username: str) -> User | None:
+    return await db.run_sync(crud_get_user_by_username, username)
+
+
+async def crud_authenticate_user_async(db: AsyncSession, username: str, plain_password: str) -> User | None:
+    user: User | None = await db.run_sync(crud_get_user_by_username, username)
+    if user is None:
+        return None
+
+    digest: str = credential_digest(username, plain_password)
+    if _is_verification_cached(user, digest):
+        return user
+    # bcrypt is CPU-bound, keep it off the event loop.
+    if await to_thread.run_sync(verify_password, plain_password, user.password_hash):
+        _cache_verification(user, digest)
         return user
     return None
@@ -0,0 +1,64 @@
+import random
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from sqlalchemy import Engine, Select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.shared_cache import shared_cache
+from app.utils.lru_cache import TTLCache
+
+# Users who wrote recently read from the primary, so they see their own writes despite replication lag.
+# Tracked per process. With a shared cache the async CRUD wrappers also share the marker, so the next
+# request of the user reads from the primary whichever worker serves it. Without one, only the worker that
+# served the write knows about it.
+recent_writers: TTLCache[int, bool] = TTLCache(
+    max_size=settings.REPLICA_STICKY_MAX_USERS,
+    ttl_seconds=settings.REPLICA_STICKY_SECONDS
+)
+
+
+class RoutingSession(Session):
+    # Sends SELECTs issued inside replica_reads() to the replica chosen for this session, everything else
+    # (writes, flushes, locking reads) to the primary bind.
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Any:
+        replica: Engine | None = self.info.get("replica")
+        if replica is not None and not self._flushing and isinstance(clause, Select) and clause._for_update_arg is None:
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def note_write(user_id: int) -> None:
+    recent_writers.set(user_id, True)
+
+
+def _writer_key(user_id: int) -> str:
+    return f"writer:{user_id}"
+
+
+async def share_write(user_id: int) -> None:
+    if settings.POSTGRES_REPLICA_HOSTS:
+        await shared_cache.set("sticky", _writer_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+async def load_shared_write(user_id: int) -> None:
+    # Called before a user's reads, so replica_reads() sees writes served by other workers.
+    if not settings.POSTGRES_REPLICA_HOSTS or recent_writers.get(user_id) is not None:
+        return
+    if (await shared_cache.get_many("sticky", [_writer_key(user_id)]))[0] is not None:
+        note_write(user_id)
+
+
+@contextmanager
+def replica_reads(db: Session, user_id: int | None = None) -> Iterator[bool]:
+    replicas: list[Engine] = db.info.get("replicas") or []
+    if not replicas or "replica" in db.info or (user_id is not None and recent_writers.get(user_id) is not None):
+        yield False
+        return
+
+    db.info["replica"] = db.info.setdefault("replica_engine", random.choice(replicas))
+    try:
+        yield True
+    finally:
+        del db.info["replica"]
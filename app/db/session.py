@@ -1,16 +1,149 @@
-from sqlalchemy import create_engine, Engine
+from time import perf_counter, monotonic
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, ConnectionPoolEntry, Pool
+from prometheus_client import REGISTRY
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_DURATION, PoolStatsCollector
+from app.db.routing import RoutingSession
 
-engine: Engine = create_engine(
-    url=settings.DATABASE_URL_psycopg,
-    pool_pre_ping=True,
-)
+
+class TimedQueuePool(QueuePool):
+    # Keeps pool logs under the "sqlalchemy" logger, which SQLAlchemy quiets to WARNING by default.
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.QueuePool"
+
+    # _do_get is where a checkout waits for a free connection, or opens a new one.
+    def _do_get(self) -> ConnectionPoolEntry:
+        started: float = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.labels(pool="sync").observe(perf_counter() - started)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started: float = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_DURATION.labels(pool="async").observe(perf_counter() - started)
+
+
+def pool_options() -> dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+
+
+def sync_connect_args() -> dict[str, Any]:
+    if settings.DB_STATEMENT_TIMEOUT_MS is None:
+        return {}
+    return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def async_connect_args() -> dict[str, Any]:
+    connect_args: dict[str, Any] = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS is not None:
+        connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    if settings.DB_PGBOUNCER:
+        # In transaction pooling mode consecutive statements may run on different server connections,
+        # so prepared statements must be neither cached nor reused by name.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = _unique_statement_name
+    return connect_args
+
+
+def install_idle_pre_ping(engine: Engine, idle_seconds: float) -> None:
+    # Pings only connections that sat idle in the pool for a while, instead of a round trip on every checkout.
+    @event.listens_for(engine, "checkin")
+    def remember_checkin(dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+        connection_record.info["checked_in_at"] = monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def ping_idle_connection(dbapi_connection: Any, connection_record: ConnectionPoolEntry,
+                             connection_proxy: Any) -> None:
+        checked_in_at: float | None = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # The pool discards the connection and retries the checkout with a new one.
+            raise DisconnectionError(f"Idle connection failed a ping: {str(e)}") from e
+
+
+def build_engine(url: str) -> Engine:
+    return create_engine(
+        url=url,
+        poolclass=TimedQueuePool,
+        connect_args=sync_connect_args(),
+        **pool_options(),
+    )
+
+
+def build_async_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url=url,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        connect_args=async_connect_args(),
+        **pool_options(),
+    )
+
+
+engine: Engine = build_engine(settings.DATABASE_URL_psycopg)
+replica_engines: list[Engine] = [build_engine(url) for url in settings.DATABASE_REPLICA_URLS_psycopg]
 
 SessionLocal: sessionmaker[Session] = sessionmaker(
     bind=engine,
+    class_=RoutingSession,
+    info={"replicas": replica_engines},
     autocommit=False,
     autoflush=False,
     expire_on_commit=False,
-)
\ No newline at end of file
+)
+
+async_engine: AsyncEngine = build_async_engine(settings.DATABASE_URL_asyncpg)
+async_replica_engines: list[AsyncEngine] = [build_async_engine(url) for url in settings.DATABASE_REPLICA_URLS_asyncpg]
+
+AsyncSessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession,
+    info={"replicas": [replica.sync_engine for replica in async_replica_engines]},
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+if settings.DB_POOL_PRE_PING == "idle":
+    for sync_engine in [engine, *replica_engines, async_engine.sync_engine,
+                        *(replica.sync_engine for replica in async_replica_engines)]:
+        install_idle_pre_ping(sync_engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+
+
+def _pools() -> dict[str, Pool]:
+    pools: dict[str, Pool] = {"sync": engine.pool, "async": async_engine.sync_engine.pool}
+    for index, replica in enumerate(replica_engines):
+        pools[f"sync_replica_{index}"] = replica.pool
+    for index, replica in enumerate(async_replica_engines):
+        pools[f"async_replica_{index}"] = replica.sync_engine.pool
+    return pools
+
+
+REGISTRY.register(PoolStatsCollector(_pools))
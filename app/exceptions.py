@@ -22,5 +22,17 @@ class LinkUpdateError(Exception):
     pass
 
 
+class LinkArchiveError(Exception):
+    pass
+
+
+class LinkExportError(Exception):
+    pass
+
+
 class ClickLogError(Exception):
     pass
+
+
+class InvalidCursorError(Exception):
+    pass
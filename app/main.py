@@ -1,4 +1,8 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 import logging
 
@@ -11,11 +15,54 @@ logging.basicConfig(
 )
 
 from app.api.routes import main_router
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.db.session import async_engine, async_replica_engines
+from app.services.click_buffer import click_buffer
+from app.services.click_counters import click_counters
+from app.services.click_partitions import click_partition_maintainer
+from app.services.link_snapshot import link_snapshot, load_link_snapshot
+from app.services.link_sweeper import link_sweeper
+from app.services.shared_cache import shared_cache
+from app.services.short_id_filter import short_id_filter, load_short_id_filter
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    shared_cache.start()
+    if settings.CLICK_COUNTERS_ENABLED:
+        click_counters.start()
+    elif settings.CLICK_BUFFER_ENABLED:
+        click_buffer.start()
+    if settings.SHORT_ID_FILTER_ENABLED:
+        await run_in_threadpool(load_short_id_filter)
+        short_id_filter.start()
+    if settings.LINK_SNAPSHOT_ENABLED:
+        await run_in_threadpool(load_link_snapshot)
+        link_snapshot.start()
+    if settings.CLICK_PARTITIONS_ENABLED:
+        click_partition_maintainer.start()
+    if settings.LINK_SWEEPER_ENABLED:
+        link_sweeper.start()
+    yield
+    await run_in_threadpool(link_sweeper.stop)
+    await run_in_threadpool(link_snapshot.stop)
+    await run_in_threadpool(short_id_filter.stop)
+    await run_in_threadpool(click_partition_maintainer.stop)
+    await run_in_threadpool(click_counters.stop)
+    await run_in_threadpool(click_buffer.stop)
+    await run_in_threadpool(shared_cache.stop)
+    await shared_cache.close()
+    await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+
 
 app = FastAPI(
     title="URL Alias Service 🪄",
     description="A simple URL alias service that allows users to create short links for their original URLs.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 
@@ -27,6 +74,7 @@ async def integrity_error_handler(request: Request, exc: IntegrityError):
     )
 
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(main_router)
 
 
@@ -1,6 +1,8 @@
 from app.models.user import User
 from app.models.link import Link
 from app.models.click import Click
+from app.models.click_rollup import ClickRollup, ClickMinuteRollup, ClickTotal
+from app.models.archive import ArchivedLink, ArchivedClick
 
 User.links
 Link.owner
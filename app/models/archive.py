@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, DateTime, Index, SmallInteger, text, false
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ArchivedLink(Base):
+    __tablename__ = "links_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    short_id: Mapped[str] = mapped_column(nullable=False, index=True)
+    orig_url: Mapped[str] = mapped_column(nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expire_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    is_active: Mapped[bool] = mapped_column(nullable=False)
+    deactivated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    redirect_status: Mapped[int] = mapped_column(SmallInteger, server_default=text("302"), nullable=False)
+    cache_redirects: Mapped[bool] = mapped_column(server_default=false(), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ArchivedClick(Base):
+    __tablename__ = "clicks_archive"
+    __table_args__ = (
+        Index("ix_clicks_archive_link_id_clicked_at", "link_id", "clicked_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    link_id: Mapped[int] = mapped_column(ForeignKey("links_archive.id", ondelete="CASCADE"), nullable=False)
+    clicked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import ForeignKey, DateTime, BigInteger, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ClickRollup(Base):
+    __tablename__ = "click_rollups"
+
+    link_id: Mapped[int] = mapped_column(ForeignKey("links.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    clicks: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class ClickMinuteRollup(Base):
+    # Written only by the click counters (CLICK_COUNTERS_ENABLED), which keep no rows in clicks.
+    # Counts the partial hours at the edges of the stats windows and is pruned after MINUTE_ROLLUP_RETENTION.
+    __tablename__ = "click_minute_rollups"
+    __table_args__ = (
+        Index("ix_click_minute_rollups_bucket_start", "bucket_start"),
+    )
+
+    link_id: Mapped[int] = mapped_column(ForeignKey("links.id", ondelete="CASCADE"), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    clicks: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class ClickTotal(Base):
+    __tablename__ = "click_totals"
+
+    link_id: Mapped[int] = mapped_column(ForeignKey("links.id", ondelete="CASCADE"), primary_key=True)
+    clicks: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -1,15 +1,24 @@
 from datetime import datetime, timezone
-from sqlalchemy import ForeignKey, DateTime
+from sqlalchemy import ForeignKey, DateTime, Index, SmallInteger, text, false
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from typing_extensions import Annotated
 
 from app.db.base import Base
 
-intpk = Annotated[int, mapped_column(primary_key=True, index=True)]
+intpk = Annotated[int, mapped_column(primary_key=True)]
 
 
 class Link(Base):
     __tablename__ = "links"
+    __table_args__ = (
+        Index("ix_links_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_links_live_short_id", "short_id", unique=True, postgresql_where=text("is_active"),
+              sqlite_where=text("is_active")),
+        Index("ix_links_expire_at", "expire_at"),
+        Index("ix_links_created_at", "created_at"),
+        Index("ix_links_deactivated_at", "deactivated_at", postgresql_where=text("deactivated_at IS NOT NULL"),
+              sqlite_where=text("deactivated_at IS NOT NULL")),
+    )
 
     id: Mapped[intpk]
     short_id: Mapped[str] = mapped_column(unique=True, nullable=False, index=True)
@@ -20,6 +29,10 @@ class Link(Base):
     expire_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False,
                                                 default=lambda: datetime.now(timezone.utc))
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
+    deactivated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    redirect_status: Mapped[int] = mapped_column(SmallInteger, default=302, server_default=text("302"), nullable=False)
+    # Cacheable redirects are absorbed by browsers and CDNs, so repeat clicks are not counted.
+    cache_redirects: Mapped[bool] = mapped_column(default=False, server_default=false(), nullable=False)
 
     owner: Mapped["User"] = relationship(
         back_populates="links"
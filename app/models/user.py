@@ -3,7 +3,7 @@ from typing_extensions import Annotated
 
 from app.db.base import Base
 
-intpk = Annotated[int, mapped_column(primary_key=True, index=True)]
+intpk = Annotated[int, mapped_column(primary_key=True)]
 
 
 class User(Base):
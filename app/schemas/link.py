@@ -1,7 +1,10 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, HttpUrl
 
+RedirectStatus = Literal[301, 302, 307, 308]
+
 
 class LinkBase(BaseModel):
     orig_url: HttpUrl
@@ -9,6 +12,8 @@ class LinkBase(BaseModel):
 
 class LinkCreate(LinkBase):
     expire_seconds: int = 86400
+    redirect_status: RedirectStatus = 302
+    cache_redirects: bool = False
 
 
 class LinkResponse(LinkBase):
@@ -19,14 +24,29 @@ class LinkResponse(LinkBase):
     created_at: datetime
     expire_at: datetime
     is_active: bool
+    redirect_status: int
+    cache_redirects: bool
 
     class Config:
         from_attributes = True
 
 
 class LinkListResponse(BaseModel):
-    page: int
+    page: int | None
     page_size: int
-    total_items: int
-    total_pages: int
+    total_items: int | None
+    total_pages: int | None
+    next_cursor: str | None = None
     items: list[LinkResponse]
+
+
+class LinkBulkItemResult(BaseModel):
+    index: int
+    link: LinkResponse | None = None
+    error: str | None = None
+
+
+class LinkBulkResponse(BaseModel):
+    created: int
+    failed: int
+    items: list[LinkBulkItemResult]
@@ -0,0 +1,124 @@
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import CLICK_BUFFER_DROPPED
+from app.crud.stats import crud_bulk_log_clicks
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class ClickBuffer:
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            max_size: int,
+            batch_size: int,
+            flush_interval: float
+    ) -> None:
+        self.session_factory: Callable[[], Session] = session_factory
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self._queue: queue.Queue[tuple[int, datetime]] = queue.Queue(maxsize=max_size)
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def put(self, link_id: int) -> bool:
+        # A full or stopped buffer returns False and the caller writes the click itself,
+        # so overload slows redirects down instead of growing memory or dropping clicks.
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait((link_id, datetime.now(timezone.utc)))
+        except queue.Full:
+            return False
+        return True
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="click-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        written: int = 0
+        while True:
+            batch: list[tuple[int, datetime]] = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch or not self._write(batch):
+                return written
+            written += len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch: list[tuple[int, datetime]] = self._collect()
+            if batch and not self._write(batch):
+                self._stop.wait(self.flush_interval)
+
+    def _collect(self) -> list[tuple[int, datetime]]:
+        batch: list[tuple[int, datetime]] = []
+        deadline: float = monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining: float = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: list[tuple[int, datetime]]) -> bool:
+        db: Session = self.session_factory()
+        try:
+            crud_bulk_log_clicks(db, batch)
+            return True
+        except Exception as e:
+            logger.error(f"Error flushing {len(batch)} buffered clicks: {str(e)}")
+            self._requeue(batch)
+            return False
+        finally:
+            db.close()
+
+    def _requeue(self, batch: list[tuple[int, datetime]]) -> None:
+        # Clicks keep their time, so retried ones may go behind newer ones. What no longer fits is dropped.
+        dropped: int = 0
+        for click in batch:
+            try:
+                self._queue.put_nowait(click)
+            except queue.Full:
+                dropped += 1
+        if dropped:
+            CLICK_BUFFER_DROPPED.inc(dropped)
+            logger.warning(f"Dropped {dropped} buffered clicks, the buffer is full")
+
+
+click_buffer: ClickBuffer = ClickBuffer(
+    session_factory=SessionLocal,
+    max_size=settings.CLICK_BUFFER_MAX_SIZE,
+    batch_size=settings.CLICK_BUFFER_BATCH_SIZE,
+    flush_interval=settings.CLICK_BUFFER_FLUSH_INTERVAL_SECONDS
+)
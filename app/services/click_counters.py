@@ -0,0 +1,113 @@
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from time import time, monotonic
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.stats import crud_add_click_counts, crud_prune_minute_rollups, MINUTE_ROLLUP_RETENTION
+from app.db.session import SessionLocal
+from app.services.periodic import PeriodicWorker
+from app.services.shared_cache import SharedCache, shared_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_HASH: str = "click-counters"
+PRUNE_INTERVAL_SECONDS: float = 3600.0
+
+
+class ClickCounters(PeriodicWorker):
+    # Counts redirects per link and minute instead of writing a row per click, and periodically adds the
+    # counts to the rollups. With a shared cache the counters live there, so they survive a worker restart.
+    thread_name: str = "click-counters"
+    error_message: str = "Error flushing click counters"
+    wait_first: bool = True
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            flush_interval: float,
+            shared: SharedCache | None = None
+    ) -> None:
+        super().__init__()
+        self.session_factory: Callable[[], Session] = session_factory
+        self.flush_interval: float = flush_interval
+        self.shared: SharedCache | None = shared
+        self._counts: Counter[tuple[int, int]] = Counter()
+        self._lock: threading.Lock = threading.Lock()
+        self._pruned_at: float | None = None
+
+    @property
+    def period(self) -> float:
+        return self.flush_interval
+
+    async def increment(self, link_id: int) -> bool:
+        # A stopped counter returns False and the caller logs the click some other way.
+        if not self.running:
+            return False
+        minute: int = int(time() // 60) * 60
+        if self.shared is not None and await self.shared.increment_field("clicks", COUNTERS_HASH, f"{link_id}:{minute}"):
+            return True
+        with self._lock:
+            self._counts[(link_id, minute)] += 1
+        return True
+
+    def stop(self) -> None:
+        super().stop()
+        self.flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            counts: Counter[tuple[int, int]] = self._counts
+            self._counts = Counter()
+        if self.shared is not None:
+            for field, count in self.shared.take_fields("clicks", COUNTERS_HASH).items():
+                link_id, _, minute = field.partition(":")
+                counts[(int(link_id), int(minute))] += count
+        if not counts:
+            return 0
+
+        db: Session = self.session_factory()
+        try:
+            return crud_add_click_counts(db, {
+                (link_id, datetime.fromtimestamp(minute, timezone.utc)): count
+                for (link_id, minute), count in counts.items()
+            })
+        except Exception as e:
+            # Put back into the shared cache, where they survive a restart of this worker, or else kept in memory.
+            # Either way they are retried with the next flush.
+            logger.error(f"Error writing back {sum(counts.values())} counted clicks: {str(e)}")
+            if self.shared is None or not self.shared.add_fields("clicks", COUNTERS_HASH, {
+                f"{link_id}:{minute}": count for (link_id, minute), count in counts.items()
+            }):
+                with self._lock:
+                    self._counts.update(counts)
+            return 0
+        finally:
+            db.close()
+
+    def prune(self) -> int:
+        db: Session = self.session_factory()
+        try:
+            return crud_prune_minute_rollups(db, datetime.now(timezone.utc) - MINUTE_ROLLUP_RETENTION)
+        except Exception as e:
+            logger.error(f"Error pruning minute click rollups: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    def tick(self) -> None:
+        self.flush()
+        if self._pruned_at is None or monotonic() - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+            self.prune()
+            self._pruned_at = monotonic()
+
+
+click_counters: ClickCounters = ClickCounters(
+    session_factory=SessionLocal,
+    flush_interval=settings.CLICK_COUNTERS_FLUSH_INTERVAL_SECONDS,
+    shared=shared_cache if shared_cache.enabled else None
+)
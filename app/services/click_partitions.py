@@ -0,0 +1,71 @@
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.partitions import crud_create_click_partitions, crud_drop_click_partitions
+from app.db.session import SessionLocal
+from app.services.periodic import PeriodicWorker
+from app.utils.partitions import PartitionInterval
+
+logger = logging.getLogger(__name__)
+
+# Statistics read raw clicks for the partial hours at the edges of the last day, those must never be dropped.
+MIN_CLICK_RETENTION: timedelta = timedelta(days=2)
+
+
+class ClickPartitionMaintainer(PeriodicWorker):
+    # Keeps `ahead` partitions of clicks ready past the current one and drops the ones older than the retention.
+    # Does nothing until the clicks table is partitioned.
+    thread_name: str = "click-partitions"
+    error_message: str = "Error maintaining click partitions"
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            interval: PartitionInterval,
+            ahead: int,
+            retention_days: int | None,
+            check_interval: float
+    ) -> None:
+        super().__init__()
+        self.session_factory: Callable[[], Session] = session_factory
+        self.interval: PartitionInterval = interval
+        self.ahead: int = ahead
+        self.retention_days: int | None = retention_days
+        self.check_interval: float = check_interval
+
+    @property
+    def period(self) -> float:
+        return self.check_interval
+
+    def maintain(self) -> tuple[list[str], list[str]]:
+        now: datetime = datetime.now(timezone.utc)
+        db: Session = self.session_factory()
+        try:
+            created: list[str] = crud_create_click_partitions(db, now, self.interval, self.ahead)
+            dropped: list[str] = []
+            if self.retention_days is not None:
+                retention: timedelta = max(timedelta(days=self.retention_days), MIN_CLICK_RETENTION)
+                dropped = crud_drop_click_partitions(db, now - retention)
+        finally:
+            db.close()
+        if created:
+            logger.info(f"Created click partitions: {', '.join(created)}")
+        if dropped:
+            logger.info(f"Dropped click partitions: {', '.join(dropped)}")
+        return created, dropped
+
+    def tick(self) -> None:
+        self.maintain()
+
+
+click_partition_maintainer: ClickPartitionMaintainer = ClickPartitionMaintainer(
+    session_factory=SessionLocal,
+    interval=settings.CLICK_PARTITION_INTERVAL,
+    ahead=settings.CLICK_PARTITIONS_AHEAD,
+    retention_days=settings.CLICK_RETENTION_DAYS,
+    check_interval=settings.CLICK_PARTITION_CHECK_INTERVAL_SECONDS
+)
@@ -0,0 +1,167 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, Literal
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.export import ExportedLink, crud_iter_exported_links
+from app.exceptions import LinkExportError
+from app.utils.link_map import LinkMapEntry, iter_link_map
+
+ExportFormat = Literal["nginx", "json", "csv", "binary"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "nginx": "text/plain; charset=utf-8",
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "binary": "application/octet-stream",
+}
+FILE_NAMES: dict[str, str] = {
+    "nginx": "links.map",
+    "json": "links.json",
+    "csv": "links.csv",
+    "binary": "links.bin",
+}
+# Deltas list removals, which an nginx map or a link map cannot express.
+DELTA_FORMATS: tuple[str, ...] = ("json", "csv")
+CSV_COLUMNS: list[str] = ["op", "short_id", "orig_url", "redirect_status", "cache_redirects", "expire_at"]
+NGINX_TARGET_VARIABLE: str = "url_alias_target"
+NGINX_STATUS_VARIABLE: str = "url_alias_status"
+_CHUNK_SIZE: int = 64 * 1024
+
+
+def _buffered(parts: Iterable[bytes]) -> Iterator[bytes]:
+    chunk: list[bytes] = []
+    size: int = 0
+    for part in parts:
+        chunk.append(part)
+        size += len(part)
+        if size >= _CHUNK_SIZE:
+            yield b"".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+def _nginx_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class EdgeExport:
+    # Streams links for serving redirects without the service: an nginx map, a JSON or CSV manifest, or a link map.
+    # A full export holds the live links. A delta holds the links created, deactivated or expired after since,
+    # as "set" or "delete" operations. Links archived before since would be missing from it, so since may not be
+    # older than the archive grace period.
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            fmt: ExportFormat,
+            since: datetime | None = None,
+            now: datetime | None = None,
+            batch_size: int = settings.EDGE_EXPORT_BATCH_SIZE,
+            overlap_seconds: float = settings.EDGE_EXPORT_DELTA_OVERLAP_SECONDS,
+            max_delta_age_seconds: float = settings.LINK_ARCHIVE_GRACE_SECONDS
+    ) -> None:
+        self.now: datetime = now or datetime.now(timezone.utc)
+        if since is not None:
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            if fmt not in DELTA_FORMATS:
+                raise LinkExportError(f"Deltas can only be exported as {' or '.join(DELTA_FORMATS)}")
+            if since < self.now - timedelta(seconds=max_delta_age_seconds):
+                raise LinkExportError("since is older than the archive grace period, request a full export")
+        self.session_factory: Callable[[], Session] = session_factory
+        self.fmt: ExportFormat = fmt
+        self.since: datetime | None = since
+        self.batch_size: int = batch_size
+        self.next_since: datetime = self.now - timedelta(seconds=overlap_seconds)
+        self.exported: int = 0
+        self.skipped: int = 0
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.fmt]
+
+    @property
+    def file_name(self) -> str:
+        return FILE_NAMES[self.fmt]
+
+    def __iter__(self) -> Iterator[bytes]:
+        db: Session = self.session_factory()
+        try:
+            renderers: dict[str, Callable[[Session], Iterator[bytes]]] = {
+                "nginx": self._nginx,
+                "json": self._json,
+                "csv": self._csv,
+                "binary": self._binary,
+            }
+            yield from _buffered(renderers[self.fmt](db))
+        finally:
+            db.close()
+
+    def _links(self, db: Session) -> Iterator[ExportedLink]:
+        return crud_iter_exported_links(db, self.now, self.since, self.batch_size)
+
+    def _item(self, link: ExportedLink) -> dict[str, str | int | bool]:
+        return {
+            "op": "set" if link.live else "delete",
+            "short_id": link.short_id,
+            "orig_url": link.orig_url,
+            "redirect_status": link.redirect_status,
+            "cache_redirects": link.cache_redirects,
+            "expire_at": link.expire_at.isoformat(),
+        }
+
+    def _json(self, db: Session) -> Iterator[bytes]:
+        header: str = json.dumps({
+            "generated_at": self.now.isoformat(),
+            "since": self.since.isoformat() if self.since is not None else None,
+            "next_since": self.next_since.isoformat(),
+        })
+        yield (header[:-1] + ', "links": [').encode()
+        for link in self._links(db):
+            yield (("," if self.exported else "") + "\n" + json.dumps(self._item(link))).encode()
+            self.exported += 1
+        yield b"\n]}\n"
+
+    def _csv(self, db: Session) -> Iterator[bytes]:
+        buffer: io.StringIO = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        for link in self._links(db):
+            writer.writerow(self._item(link))
+            self.exported += 1
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    def _nginx(self, db: Session) -> Iterator[bytes]:
+        # nginx reads "$" in a map value as a variable and has no escape for it, such links stay with the service.
+        # return takes no variable status code, so the status goes to a second map read in another pass.
+        yield (f"# Live links at {self.now.isoformat()}\n"
+               f"map $uri ${NGINX_TARGET_VARIABLE} {{\n    default \"\";\n").encode()
+        for link in self._links(db):
+            if "$" in link.orig_url:
+                self.skipped += 1
+                continue
+            yield f"    {_nginx_string('/' + link.short_id)} {_nginx_string(link.orig_url)};\n".encode()
+            self.exported += 1
+        yield f"}}\n\nmap $uri ${NGINX_STATUS_VARIABLE} {{\n    default 302;\n".encode()
+        for link in self._links(db):
+            if link.redirect_status != 302 and "$" not in link.orig_url:
+                yield f"    {_nginx_string('/' + link.short_id)} {link.redirect_status};\n".encode()
+        yield b"}\n"
+
+    def _binary(self, db: Session) -> Iterator[bytes]:
+        yield from iter_link_map(self._map_entries(db), self.now.timestamp())
+
+    def _map_entries(self, db: Session) -> Iterator[LinkMapEntry]:
+        for link in self._links(db):
+            self.exported += 1
+            yield LinkMapEntry(id=link.id, short_id=link.short_id, orig_url=link.orig_url,
+                               expire_ts=link.expire_at.timestamp(), redirect_status=link.redirect_status,
+                               cache_redirects=link.cache_redirects)
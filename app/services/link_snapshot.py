@@ -0,0 +1,178 @@
+import fcntl
+import logging
+import mmap
+import os
+import threading
+from datetime import datetime, timezone, timedelta
+from time import monotonic, time
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import LINK_SNAPSHOT_LOOKUPS
+from app.crud.export import crud_get_deactivated_short_ids
+from app.db.session import SessionLocal
+from app.services.edge_export import EdgeExport
+from app.services.periodic import PeriodicWorker
+from app.utils.link_map import LinkMap, LinkMapEntry
+
+logger = logging.getLogger(__name__)
+
+
+class LinkSnapshot(PeriodicWorker):
+    # Serves redirect lookups from a link map file that every worker memory-maps: the pages are shared through
+    # the OS page cache, and a starting worker has all live links without loading them from the database.
+    # One worker at a time rewrites the file every interval, every worker reopens it when it is replaced.
+    # Links created after the snapshot are not in it and are looked up as usual. Links deactivated after it
+    # are polled from the database every delta_interval seconds, and arrive at once from this worker
+    # or through the shared cache.
+    thread_name: str = "link-snapshot"
+    error_message: str = "Error refreshing link snapshot"
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            path: str,
+            interval: float,
+            delta_interval: float,
+            overlap_seconds: float,
+            max_age_seconds: float
+    ) -> None:
+        super().__init__()
+        self.session_factory: Callable[[], Session] = session_factory
+        self.path: str = path
+        self.interval: float = interval
+        self.delta_interval: float = delta_interval
+        self.overlap_seconds: float = overlap_seconds
+        self.max_age_seconds: float = max_age_seconds
+        self._map: LinkMap | None = None
+        self._file_id: tuple[int, int] | None = None
+        self._deactivated: set[str] = set()
+        self._lock: threading.Lock = threading.Lock()
+        self._written_at: float | None = None
+
+    @property
+    def period(self) -> float:
+        return self.delta_interval
+
+    @property
+    def ready(self) -> bool:
+        return self._map is not None
+
+    def get(self, short_id: str) -> LinkMapEntry | None:
+        link_map: LinkMap | None = self._map
+        if link_map is None:
+            return None
+        entry: LinkMapEntry | None = link_map.get(short_id)
+        if entry is None:
+            LINK_SNAPSHOT_LOOKUPS.labels(result="miss").inc()
+            return None
+        if short_id in self._deactivated or entry.expire_ts <= time():
+            LINK_SNAPSHOT_LOOKUPS.labels(result="stale").inc()
+            return None
+        LINK_SNAPSHOT_LOOKUPS.labels(result="hit").inc()
+        return entry
+
+    def forget(self, short_id: str) -> None:
+        self._deactivated.add(short_id)
+
+    def write(self) -> bool:
+        # The lock file keeps workers from exporting at the same time, the loser reopens the winner's file.
+        with open(f"{self.path}.lock", "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            if not self._write_due():
+                return False
+            tmp_path: str = f"{self.path}.{os.getpid()}.tmp"
+            export: EdgeExport = EdgeExport(self.session_factory, "binary")
+            try:
+                with open(tmp_path, "wb") as f:
+                    for chunk in export:
+                        f.write(chunk)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        logger.info(f"Link snapshot written: {export.exported} links")
+        return True
+
+    def reload(self) -> bool:
+        try:
+            stat: os.stat_result = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        file_id: tuple[int, int] = (stat.st_ino, stat.st_mtime_ns)
+        if file_id == self._file_id:
+            return False
+
+        with open(self.path, "rb") as f:
+            # The mapping outlives the file object. A replaced map is unmapped when the last lookup drops it.
+            link_map: LinkMap = LinkMap(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        # Links deactivated and then archived after an old snapshot are gone from the table, the poll cannot see them.
+        if time() - link_map.generated_at > self.max_age_seconds:
+            logger.warning(f"Link snapshot {self.path} is older than {self.max_age_seconds}s, not loaded")
+            self._file_id = file_id
+            return False
+        deactivated: set[str] = self._fetch_deactivated(link_map)
+        with self._lock:
+            self._map, self._file_id, self._deactivated = link_map, file_id, deactivated
+        logger.info(f"Link snapshot loaded: {len(link_map)} links")
+        return True
+
+    def refresh_deactivated(self) -> None:
+        link_map: LinkMap | None = self._map
+        if link_map is None:
+            return
+        deactivated: set[str] = self._fetch_deactivated(link_map)
+        with self._lock:
+            if self._map is link_map:
+                self._deactivated |= deactivated
+
+    def clear(self) -> None:
+        with self._lock:
+            self._map, self._file_id, self._deactivated = None, None, set()
+
+    def _write_due(self) -> bool:
+        try:
+            return time() - os.stat(self.path).st_mtime >= self.interval
+        except FileNotFoundError:
+            return True
+
+    def _fetch_deactivated(self, link_map: LinkMap) -> set[str]:
+        # Deactivated_at is taken before the commit, the overlap covers transactions the export did not see.
+        since: datetime = (datetime.fromtimestamp(link_map.generated_at, timezone.utc)
+                           - timedelta(seconds=self.overlap_seconds))
+        db: Session = self.session_factory()
+        try:
+            return crud_get_deactivated_short_ids(db, since)
+        finally:
+            db.close()
+
+    def tick(self) -> None:
+        if self._written_at is None or monotonic() - self._written_at >= self.interval:
+            self._written_at = monotonic()
+            self.write()
+        if not self.reload():
+            self.refresh_deactivated()
+
+
+link_snapshot: LinkSnapshot = LinkSnapshot(
+    session_factory=SessionLocal,
+    path=settings.LINK_SNAPSHOT_PATH,
+    interval=settings.LINK_SNAPSHOT_INTERVAL_SECONDS,
+    delta_interval=settings.LINK_SNAPSHOT_DELTA_INTERVAL_SECONDS,
+    overlap_seconds=settings.EDGE_EXPORT_DELTA_OVERLAP_SECONDS,
+    max_age_seconds=settings.LINK_ARCHIVE_GRACE_SECONDS
+)
+
+
+def load_link_snapshot() -> None:
+    # A snapshot left by a running worker or a previous start is used right away, the thread writes a missing one.
+    try:
+        link_snapshot.reload()
+    except Exception as e:
+        logger.error(f"Error loading link snapshot: {str(e)}")
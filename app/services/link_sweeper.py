@@ -0,0 +1,66 @@
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.archive import crud_archive_dead_links
+from app.db.session import SessionLocal
+from app.services.periodic import PeriodicWorker
+
+logger = logging.getLogger(__name__)
+
+
+class LinkSweeper(PeriodicWorker):
+    # Moves links that expired or were deactivated more than grace_seconds ago, with their clicks, to the archive
+    # tables. Every batch is its own short transaction, so the hot tables are never locked for long.
+    thread_name: str = "link-sweeper"
+    error_message: str = "Error sweeping dead links"
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            grace_seconds: int,
+            batch_size: int,
+            click_batch_size: int,
+            interval: float
+    ) -> None:
+        super().__init__()
+        self.session_factory: Callable[[], Session] = session_factory
+        self.grace_seconds: int = grace_seconds
+        self.batch_size: int = batch_size
+        self.click_batch_size: int = click_batch_size
+        self.interval: float = interval
+
+    @property
+    def period(self) -> float:
+        return self.interval
+
+    def sweep(self) -> int:
+        cutoff: datetime = datetime.now(timezone.utc) - timedelta(seconds=self.grace_seconds)
+        archived: int = 0
+        db: Session = self.session_factory()
+        try:
+            while not self._stop.is_set():
+                batch: int = crud_archive_dead_links(db, cutoff, self.batch_size, self.click_batch_size)
+                archived += batch
+                if batch < self.batch_size:
+                    break
+        finally:
+            db.close()
+        if archived:
+            logger.info(f"Archived {archived} dead links")
+        return archived
+
+    def tick(self) -> None:
+        self.sweep()
+
+
+link_sweeper: LinkSweeper = LinkSweeper(
+    session_factory=SessionLocal,
+    grace_seconds=settings.LINK_ARCHIVE_GRACE_SECONDS,
+    batch_size=settings.LINK_ARCHIVE_BATCH_SIZE,
+    click_batch_size=settings.LINK_ARCHIVE_CLICK_BATCH_SIZE,
+    interval=settings.LINK_SWEEPER_INTERVAL_SECONDS
+)
@@ -0,0 +1,48 @@
+import logging
+import threading
+
+
+class PeriodicWorker:
+    # Calls tick() in a daemon thread every period seconds until stop(). An error is logged under the
+    # subclass's module, and the next tick runs as usual. With wait_first the first tick waits a period too.
+    thread_name: str = "periodic-worker"
+    error_message: str = "Error in periodic worker"
+    wait_first: bool = False
+
+    def __init__(self) -> None:
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def period(self) -> float:
+        raise NotImplementedError
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def tick(self) -> None:
+        raise NotImplementedError
+
+    def _run(self) -> None:
+        if self.wait_first and self._stop.wait(self.period):
+            return
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logging.getLogger(type(self).__module__).error(f"{self.error_message}: {str(e)}")
+            self._stop.wait(self.period)
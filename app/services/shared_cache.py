@@ -0,0 +1,236 @@
+import json
+import logging
+import threading
+from time import monotonic
+from typing import Any, Callable
+
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core.config import settings
+from app.core.metrics import SHARED_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+InvalidationHandler = Callable[[str], None]
+
+
+class SharedCache:
+    # Second cache tier shared by all workers through a Redis-compatible server. Values are JSON.
+    # Any error is a miss: the caller falls back to the database, and the server is not
+    # contacted again for retry_seconds, so an outage does not add a timeout to every request.
+    def __init__(
+            self,
+            client_factory: Callable[[], AsyncRedis] | None,
+            sync_client_factory: Callable[[], Redis] | None,
+            prefix: str,
+            retry_seconds: float
+    ) -> None:
+        self.client_factory: Callable[[], AsyncRedis] | None = client_factory
+        self.sync_client_factory: Callable[[], Redis] | None = sync_client_factory
+        self.prefix: str = prefix
+        self.channel: str = f"{prefix}invalidate"
+        self.retry_seconds: float = retry_seconds
+        self._client: AsyncRedis | None = None
+        self._sync_client: Redis | None = None
+        self._down_until: float = 0.0
+        self._subscribed: bool = False
+        self._handlers: dict[str, tuple[InvalidationHandler, Callable[[], None]]] = {}
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.client_factory is not None and self.sync_client_factory is not None
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and monotonic() >= self._down_until
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def subscribed(self) -> bool:
+        # True while this worker receives every message published on the channel.
+        return self._subscribed
+
+    def on_invalidate(self, kind: str, handler: InvalidationHandler, reset: Callable[[], None]) -> None:
+        # reset drops everything of the kind: invalidations sent while this worker was disconnected are lost.
+        self._handlers[kind] = (handler, reset)
+
+    async def get_many(self, cache: str, keys: list[str]) -> list[Any | None]:
+        if not keys or not self.available:
+            return [None] * len(keys)
+        try:
+            async with self._async_client().pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(self.prefix + key)
+                raw_values: list[bytes | None] = await pipe.execute()
+        except (RedisError, OSError) as e:
+            self._mark_down(cache, e)
+            return [None] * len(keys)
+        values: list[Any | None] = [json.loads(raw) if raw is not None else None for raw in raw_values]
+        for value in values:
+            SHARED_CACHE_REQUESTS.labels(cache=cache, result="miss" if value is None else "hit").inc()
+        return values
+
+    async def set(self, cache: str, key: str, value: Any, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0 or not self.available:
+            return
+        try:
+            await self._async_client().set(self.prefix + key, json.dumps(value), px=int(ttl_seconds * 1000))
+        except (RedisError, OSError) as e:
+            self._mark_down(cache, e)
+
+    async def get_field(self, cache: str, name: str, field: str) -> Any | None:
+        if not self.available:
+            return None
+        try:
+            raw: bytes | None = await self._async_client().hget(self.prefix + name, field)
+        except (RedisError, OSError) as e:
+            self._mark_down(cache, e)
+            return None
+        SHARED_CACHE_REQUESTS.labels(cache=cache, result="miss" if raw is None else "hit").inc()
+        return json.loads(raw) if raw is not None else None
+
+    async def set_field(self, cache: str, name: str, field: str, value: Any, ttl_seconds: float) -> None:
+        if not self.available:
+            return
+        try:
+            async with self._async_client().pipeline(transaction=False) as pipe:
+                pipe.hset(self.prefix + name, field, json.dumps(value))
+                pipe.pexpire(self.prefix + name, int(ttl_seconds * 1000))
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            self._mark_down(cache, e)
+
+    async def increment_field(self, cache: str, name: str, field: str) -> bool:
+        if not self.available:
+            return False
+        try:
+            await self._async_client().hincrby(self.prefix + name, field, 1)
+        except (RedisError, OSError) as e:
+            self._mark_down(cache, e)
+            return False
+        return True
+
+    def take_fields(self, cache: str, name: str) -> dict[str, int]:
+        # Reads and deletes the hash in one transaction, increments made meanwhile land in a new hash.
+        if not self.available:
+            return {}
+        try:
+            with self._sync().pipeline(transaction=True) as pipe:
+                pipe.hgetall(self.prefix + name)
+                pipe.delete(self.prefix + name)
+                raw: dict[bytes, bytes] = pipe.execute()[0]
+        except (RedisError, OSError) as e:
+            self._mark_down(cache, e)
+            return {}
+        return {field.decode(): int(value) for field, value in raw.items()}
+
+    def add_fields(self, cache: str, name: str, counts: dict[str, int]) -> bool:
+        # Puts taken counts back, added to whatever was counted since they were taken.
+        if not self.available:
+            return False
+        try:
+            with self._sync().pipeline(transaction=True) as pipe:
+                for field, count in counts.items():
+                    pipe.hincrby(self.prefix + name, field, count)
+                pipe.execute()
+        except (RedisError, OSError) as e:
+            self._mark_down(cache, e)
+            return False
+        return True
+
+    async def publish(self, kind: str, value: str) -> None:
+        await self.invalidate(kind, value, [])
+
+    async def invalidate(self, kind: str, value: str, keys: list[str]) -> None:
+        if not self.available:
+            return
+        try:
+            async with self._async_client().pipeline(transaction=False) as pipe:
+                if keys:
+                    pipe.delete(*(self.prefix + key for key in keys))
+                pipe.publish(self.channel, f"{kind}:{value}")
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            self._mark_down(kind, e)
+
+    def start(self) -> None:
+        if self.running or not self.enabled:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shared-cache-invalidations", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
+
+    def dispatch(self, message: str) -> None:
+        kind, _, value = message.partition(":")
+        handlers: tuple[InvalidationHandler, Callable[[], None]] | None = self._handlers.get(kind)
+        if handlers is not None:
+            handlers[0](value)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self._sync().pubsub(ignore_subscribe_messages=True) as pubsub:
+                    pubsub.subscribe(self.channel)
+                    for _, reset in self._handlers.values():
+                        reset()
+                    self._subscribed = True
+                    while not self._stop.is_set():
+                        message: dict[str, Any] | None = pubsub.get_message(timeout=1.0)
+                        if message is not None:
+                            self.dispatch(message["data"].decode())
+            except (RedisError, OSError) as e:
+                self._subscribed = False
+                logger.warning(f"Shared cache invalidation listener disconnected: {str(e)}")
+                self._stop.wait(self.retry_seconds)
+        self._subscribed = False
+
+    def _async_client(self) -> AsyncRedis:
+        if self._client is None:
+            self._client = self.client_factory()
+        return self._client
+
+    def _sync(self) -> Redis:
+        if self._sync_client is None:
+            self._sync_client = self.sync_client_factory()
+        return self._sync_client
+
+    def _mark_down(self, cache: str, error: Exception) -> None:
+        SHARED_CACHE_REQUESTS.labels(cache=cache, result="error").inc()
+        if self.available:
+            logger.warning(f"Shared cache unavailable for {self.retry_seconds}s: {str(error)}")
+        self._down_until = monotonic() + self.retry_seconds
+
+
+def _redis_options() -> dict[str, Any]:
+    return {
+        "socket_timeout": settings.REDIS_TIMEOUT_SECONDS,
+        "socket_connect_timeout": settings.REDIS_TIMEOUT_SECONDS,
+    }
+
+
+shared_cache: SharedCache = SharedCache(
+    client_factory=(lambda: AsyncRedis.from_url(settings.REDIS_URL, **_redis_options())) if settings.REDIS_URL else None,
+    sync_client_factory=(lambda: Redis.from_url(settings.REDIS_URL, **_redis_options())) if settings.REDIS_URL else None,
+    prefix=settings.REDIS_KEY_PREFIX,
+    retry_seconds=settings.REDIS_RETRY_SECONDS
+)
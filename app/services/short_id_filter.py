@@ -0,0 +1,161 @@
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from time import monotonic
+from typing import Callable
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import Link
+from app.services.periodic import PeriodicWorker
+from app.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+class ShortIdFilter(PeriodicWorker):
+    # Answers "does this short_id certainly not exist" from memory. Links created by this process are added
+    # right away, links created elsewhere are picked up by a thread that refreshes the filter every interval
+    # and rebuilds it once it outgrows its capacity. The resolver trusts a miss only while a refresh is not due.
+    thread_name: str = "short-id-filter"
+    error_message: str = "Error refreshing short id filter"
+    wait_first: bool = True
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            error_rate: float,
+            min_capacity: int,
+            refresh_interval: float,
+            refresh_lookback_seconds: float
+    ) -> None:
+        super().__init__()
+        self.session_factory: Callable[[], Session] = session_factory
+        self.error_rate: float = error_rate
+        self.min_capacity: int = min_capacity
+        self.refresh_interval: float = refresh_interval
+        self.refresh_lookback_seconds: float = refresh_lookback_seconds
+        self._bloom: BloomFilter | None = None
+        self._known: int = 0
+        self._max_id: int = 0
+        self._scanned_at: datetime | None = None
+        self._refreshed_at: float = 0.0
+        self._added_while_loading: list[str] | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def period(self) -> float:
+        return self.refresh_interval
+
+    @property
+    def ready(self) -> bool:
+        return self._bloom is not None
+
+    def might_exist(self, short_id: str) -> bool:
+        bloom: BloomFilter | None = self._bloom
+        return bloom is None or short_id in bloom
+
+    def add(self, short_id: str) -> None:
+        # Not counted in _known: the next refresh counts the row once its id is above _max_id.
+        with self._lock:
+            bloom: BloomFilter | None = self._bloom
+            if bloom is not None:
+                bloom.add(short_id)
+            if self._added_while_loading is not None:
+                self._added_while_loading.append(short_id)
+
+    def mark_stale(self) -> None:
+        # Creates announced while the worker was not subscribed are lost: misses are not trusted until a refresh.
+        self._refreshed_at = 0.0
+
+    def refresh_due(self) -> bool:
+        return self.ready and monotonic() - self._refreshed_at >= self.refresh_interval
+
+    def load(self, db: Session) -> None:
+        # Sized for twice the current table, so it is rebuilt only after the number of links doubles.
+        # Ids added while the table is scanned may be committed after the scan saw it, they are carried over.
+        with self._lock:
+            self._added_while_loading = []
+        try:
+            scanned_at: datetime = datetime.now(timezone.utc)
+            count: int = db.scalar(select(func.count()).select_from(Link))
+            bloom: BloomFilter = BloomFilter(max(self.min_capacity, count * 2), self.error_rate)
+            known, max_id = self._add_rows(db, bloom, select(Link.id, Link.short_id), 0)
+            with self._lock:
+                for short_id in self._added_while_loading:
+                    bloom.add(short_id)
+                self._bloom, self._known, self._max_id, self._refreshed_at = bloom, known, max_id, monotonic()
+                self._scanned_at = scanned_at
+        finally:
+            with self._lock:
+                self._added_while_loading = None
+        logger.info(f"Short id filter loaded: {known} ids, {bloom.size // 8 // 1024} KiB")
+
+    def refresh(self, db: Session) -> None:
+        bloom: BloomFilter | None = self._bloom
+        if bloom is None:
+            return
+        refreshed_at: float = monotonic()
+        scanned_at: datetime = datetime.now(timezone.utc)
+        # Only links created since the previous scan are read, through ix_links_created_at. created_at is set
+        # before commit, so a slow transaction can commit a link dated before that scan. Looking back a few
+        # seconds catches those, re-adding a known id is harmless.
+        since: datetime = self._scanned_at - timedelta(seconds=self.refresh_lookback_seconds)
+        added, max_id = self._add_rows(
+            db, bloom, select(Link.id, Link.short_id).where(Link.created_at > since), self._max_id
+        )
+        self._known += added
+        self._max_id = max_id
+        self._refreshed_at, self._scanned_at = refreshed_at, scanned_at
+        if self._known > bloom.capacity:
+            self.load(db)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bloom, self._known, self._max_id, self._refreshed_at = None, 0, 0, 0.0
+            self._scanned_at = None
+
+    def tick(self) -> None:
+        db: Session = self.session_factory()
+        try:
+            if self.ready:
+                self.refresh(db)
+            else:
+                self.load(db)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _add_rows(db: Session, bloom: BloomFilter, stmt, max_id: int) -> tuple[int, int]:
+        # Returns how many ids above max_id were added, and the new max_id.
+        added: int = 0
+        new_max_id: int = max_id
+        for link_id, short_id in db.execute(stmt.execution_options(yield_per=10_000)):
+            bloom.add(short_id)
+            if link_id > max_id:
+                added += 1
+                new_max_id = max(new_max_id, link_id)
+        return added, new_max_id
+
+
+short_id_filter: ShortIdFilter = ShortIdFilter(
+    session_factory=SessionLocal,
+    error_rate=settings.SHORT_ID_FILTER_ERROR_RATE,
+    min_capacity=settings.SHORT_ID_FILTER_MIN_CAPACITY,
+    refresh_interval=settings.SHORT_ID_FILTER_REFRESH_INTERVAL_SECONDS,
+    refresh_lookback_seconds=settings.SHORT_ID_FILTER_REFRESH_LOOKBACK_SECONDS
+)
+
+
+def load_short_id_filter() -> None:
+    db: Session = short_id_filter.session_factory()
+    try:
+        short_id_filter.load(db)
+    except Exception as e:
+        # Without the filter every lookup goes to the database, which is slower but correct.
+        logger.error(f"Error loading short id filter: {str(e)}")
+    finally:
+        db.close()
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from time import monotonic, time
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import STATS_CACHE_REQUESTS
+from app.services.shared_cache import SharedCache, shared_cache
+from app.utils.lru_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+StatsKey = tuple[int, int, str]
+
+
+class StatsCache(Generic[V]):
+    # Caches computed stats per (user_id, top, sort_by) with a freshness TTL per window. A stale entry is still
+    # served while one background task recomputes it, and concurrent misses for a key share one computation.
+    # With a shared cache, a computation first looks for a fresh result of another worker there.
+    def __init__(self, max_size: int, ttls: dict[str, float], stale_seconds: float,
+                 shared: SharedCache | None = None) -> None:
+        self.ttls: dict[str, float] = ttls
+        self.stale_seconds: float = stale_seconds
+        self.retention: float = max(ttls.values()) + stale_seconds
+        self.shared: SharedCache | None = shared
+        self._entries: TTLCache[StatsKey, tuple[float, V]] = TTLCache(max_size=max_size, ttl_seconds=self.retention)
+        self._invalidated: TTLCache[int, float] = TTLCache(max_size=max_size, ttl_seconds=self.retention)
+        self._inflight: dict[StatsKey, asyncio.Task[V]] = {}
+        if shared is not None:
+            shared.on_invalidate("stats", lambda user_id: self._invalidate_local(int(user_id)), self.clear)
+
+    async def get(self, key: StatsKey, compute: Callable[[], Awaitable[V]]) -> V:
+        entry: tuple[float, V] | None = self._entries.get(key)
+        if entry is not None and self._is_valid(key, entry[0]):
+            computed_at, value = entry
+            age: float = monotonic() - computed_at
+            ttl: float = self.ttls[key[2]]
+            if age < ttl:
+                STATS_CACHE_REQUESTS.labels(result="hit").inc()
+                return value
+            if age < ttl + self.stale_seconds:
+                STATS_CACHE_REQUESTS.labels(result="stale").inc()
+                self._refresh(key, compute)
+                return value
+
+        STATS_CACHE_REQUESTS.labels(result="miss").inc()
+        # Shielded: a cancelled request must not cancel the computation other requests are waiting for.
+        return await asyncio.shield(self._refresh(key, compute))
+
+    def invalidate_user(self, user_id: int) -> None:
+        # Local only, so it can run in synchronous CRUD code. Other workers learn of it from publish_invalidation.
+        self._invalidate_local(user_id)
+
+    async def publish_invalidation(self, user_id: int) -> None:
+        if self.shared is not None:
+            await self.shared.invalidate("stats", str(user_id), [self._shared_name(user_id)])
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._invalidated.clear()
+
+    def _invalidate_local(self, user_id: int) -> None:
+        self._invalidated.set(user_id, monotonic())
+
+    @staticmethod
+    def _shared_name(user_id: int) -> str:
+        return f"stats:{user_id}"
+
+    def _is_valid(self, key: StatsKey, computed_at: float) -> bool:
+        invalidated_at: float | None = self._invalidated.get(key[0])
+        return invalidated_at is None or computed_at > invalidated_at
+
+    def _refresh(self, key: StatsKey, compute: Callable[[], Awaitable[V]]) -> asyncio.Task[V]:
+        task: asyncio.Task[V] | None = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return task
+
+    async def _compute(self, key: StatsKey, compute: Callable[[], Awaitable[V]]) -> V:
+        # The start time is stored, so an invalidation that lands while computing still wins.
+        started: float = monotonic()
+        if self.shared is not None:
+            shared: tuple[float, V] | None = await self._get_shared(key, started)
+            if shared is not None:
+                self._entries.set(key, shared)
+                return shared[1]
+
+        value: V = await compute()
+        self._entries.set(key, (started, value))
+        if self.shared is not None and self._is_valid(key, started):
+            await self.shared.set_field(
+                "stats", self._shared_name(key[0]), f"{key[1]}:{key[2]}",
+                {"computed_at": time() - (monotonic() - started), "value": value}, self.retention
+            )
+        return value
+
+    async def _get_shared(self, key: StatsKey, started: float) -> tuple[float, V] | None:
+        cached: dict[str, Any] | None = await self.shared.get_field("stats", self._shared_name(key[0]),
+                                                                   f"{key[1]}:{key[2]}")
+        if cached is None:
+            return None
+        # Wall clock ages are comparable between processes, monotonic timestamps are not.
+        computed_at: float = started - (time() - cached["computed_at"])
+        if started - computed_at >= self.ttls[key[2]] or not self._is_valid(key, computed_at):
+            return None
+        return computed_at, cached["value"]
+
+    def _finish(self, key: StatsKey, task: asyncio.Task[V]) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error computing stats for {key}: {str(task.exception())}")
+
+
+stats_cache: StatsCache[list[tuple[str, str, int, int, int]]] = StatsCache(
+    max_size=settings.STATS_CACHE_MAX_SIZE,
+    ttls={
+        "hour": settings.STATS_CACHE_HOUR_TTL_SECONDS,
+        "day": settings.STATS_CACHE_DAY_TTL_SECONDS,
+        "all": settings.STATS_CACHE_ALL_TTL_SECONDS,
+    },
+    stale_seconds=settings.STATS_CACHE_STALE_SECONDS,
+    shared=shared_cache if shared_cache.enabled else None
+)
@@ -1,5 +1,14 @@
+import hashlib
+import hmac
+import secrets
+
 from passlib.context import CryptContext
 
+from app.core.metrics import PASSWORD_VERIFY_DURATION
+
+# Generated per process, so digests of credentials are useless outside of it.
+_credential_key: bytes = secrets.token_bytes(32)
+
 pwd_context: CryptContext = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto"
@@ -11,4 +20,10 @@ def hash_password(plain_password: str) -> str:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with PASSWORD_VERIFY_DURATION.time():
+        return pwd_context.verify(plain_password, hashed_password)
+
+
+def credential_digest(username: str, plain_password: str) -> str:
+    message: bytes = username.encode() + b"\x00" + plain_password.encode()
+    return hmac.new(_credential_key, message, hashlib.sha256).hexdigest()
@@ -0,0 +1,21 @@
+from hashlib import blake2b
+
+
+def redirect_etag(link_id: int, orig_url: str, redirect_status: int) -> str:
+    digest: str = blake2b(f"{link_id}:{redirect_status}:{orig_url}".encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+def redirect_max_age(expire_ts: float, now: float, cap: int) -> int:
+    # A cached redirect must not outlive its link, the cap bounds how long a deactivation takes to apply.
+    return max(0, min(cap, int(expire_ts - now)))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,113 @@
+import struct
+import sys
+from mmap import mmap
+from array import array
+from typing import Iterable, Iterator, NamedTuple
+
+# Layout, little-endian: MAGIC, the records sorted by the bytes of short_id, the table of record offsets
+# in the same order, then the footer. Records come first so the file can be streamed while the links are read,
+# only the offsets are held in memory.
+MAGIC: bytes = b"URLALIAS"
+VERSION: int = 1
+# Link id, expire timestamp, URL length, short ID length, redirect status, cacheable flag.
+_RECORD: struct.Struct = struct.Struct("<QdIHHB")
+# Offsets table position, number of links, generation timestamp, version, magic.
+_FOOTER: struct.Struct = struct.Struct("<QQdH8s")
+_RECORD_SIZE: int = _RECORD.size
+_OFFSET: struct.Struct = struct.Struct("<Q")
+_OFFSET_SIZE: int = _OFFSET.size
+# Short ID length alone, after the link id, expire timestamp and URL length of a record.
+_KEY_LENGTH: struct.Struct = struct.Struct("<H")
+_KEY_LENGTH_AT: int = 20
+
+
+class LinkMapEntry(NamedTuple):
+    id: int
+    short_id: str
+    orig_url: str
+    expire_ts: float
+    redirect_status: int
+    cache_redirects: bool
+
+
+def iter_link_map(entries: Iterable[LinkMapEntry], generated_at: float) -> Iterator[bytes]:
+    offsets: array = array("Q")
+    position: int = len(MAGIC)
+    previous: bytes | None = None
+    yield MAGIC
+    for entry in entries:
+        key: bytes = entry.short_id.encode()
+        if previous is not None and key <= previous:
+            raise ValueError("Link map entries must be sorted by short ID without duplicates")
+        url: bytes = entry.orig_url.encode()
+        record: bytes = _RECORD.pack(entry.id, entry.expire_ts, len(url), len(key), entry.redirect_status,
+                                     entry.cache_redirects) + key + url
+        offsets.append(position)
+        position += len(record)
+        previous = key
+        yield record
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    yield offsets.tobytes()
+    yield _FOOTER.pack(position, len(offsets), generated_at, VERSION, MAGIC)
+
+
+class LinkMap:
+    # Reads a link map from bytes or an mmap without copying it, lookups binary-search the offsets table.
+    def __init__(self, buffer: bytes | mmap) -> None:
+        if len(buffer) < len(MAGIC) + _FOOTER.size or buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a link map")
+        table_offset, count, generated_at, version, magic = _FOOTER.unpack_from(buffer, len(buffer) - _FOOTER.size)
+        if magic != MAGIC or version != VERSION or table_offset + count * _OFFSET_SIZE != len(buffer) - _FOOTER.size:
+            raise ValueError("Unsupported or truncated link map")
+        self._buffer: bytes | mmap = buffer
+        self._table_offset: int = table_offset
+        self.generated_at: float = generated_at
+        self.count: int = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[LinkMapEntry]:
+        for index in range(self.count):
+            yield self._entry(self._record_offset(index))
+
+    def get(self, short_id: str) -> LinkMapEntry | None:
+        # Runs on every redirect: attribute and global lookups are hoisted out of the loop.
+        key: bytes = short_id.encode()
+        buffer: bytes | mmap = self._buffer
+        table_offset: int = self._table_offset
+        unpack_offset = _OFFSET.unpack_from
+        unpack_key_length = _KEY_LENGTH.unpack_from
+        low: int = 0
+        high: int = self.count
+        while low < high:
+            middle: int = (low + high) // 2
+            offset: int = unpack_offset(buffer, table_offset + middle * _OFFSET_SIZE)[0]
+            key_start: int = offset + _RECORD_SIZE
+            found: bytes = buffer[key_start:key_start + unpack_key_length(buffer, offset + _KEY_LENGTH_AT)[0]]
+            if found == key:
+                return self._entry(offset)
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _record_offset(self, index: int) -> int:
+        return _OFFSET.unpack_from(self._buffer, self._table_offset + index * _OFFSET_SIZE)[0]
+
+    def _entry(self, offset: int) -> LinkMapEntry:
+        link_id, expire_ts, url_length, key_length, redirect_status, cache_redirects = (
+            _RECORD.unpack_from(self._buffer, offset)
+        )
+        key_start: int = offset + _RECORD.size
+        url_start: int = key_start + key_length
+        return LinkMapEntry(
+            id=link_id,
+            short_id=self._buffer[key_start:url_start].decode(),
+            orig_url=self._buffer[url_start:url_start + url_length].decode(),
+            expire_ts=expire_ts,
+            redirect_status=redirect_status,
+            cache_redirects=bool(cache_redirects)
+        )
@@ -0,0 +1,25 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+
+from app.exceptions import InvalidCursorError
+
+
+def encode_cursor(created_at: datetime, link_id: int) -> str:
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    payload: bytes = json.dumps([created_at.isoformat(), link_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        payload: bytes = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at_raw, link_id = json.loads(payload)
+        created_at: datetime = datetime.fromisoformat(created_at_raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursorError("Invalid pagination cursor")
+    if not isinstance(link_id, int) or created_at.tzinfo is None:
+        raise InvalidCursorError("Invalid pagination cursor")
+    return created_at, link_id
@@ -0,0 +1,42 @@
+import re
+from datetime import datetime, timezone
+from typing import Literal
+
+PartitionInterval = Literal["day", "month"]
+
+# Partitions are named after their bounds, so the range of an existing partition can be read back without
+# parsing pg_get_expr() output, whatever the granularity it was created with.
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<lower>\d{8})_(?P<upper>\d{8})$")
+
+
+def period_start(moment: datetime, interval: PartitionInterval) -> datetime:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    day: datetime = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return day if interval == "day" else day.replace(day=1)
+
+
+def next_period(moment: datetime, interval: PartitionInterval) -> datetime:
+    start: datetime = period_start(moment, interval)
+    if interval == "day":
+        return datetime.fromordinal(start.toordinal() + 1).replace(tzinfo=timezone.utc)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def partition_name(table: str, lower: datetime, upper: datetime) -> str:
+    return f"{table}_p{lower:%Y%m%d}_{upper:%Y%m%d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def partition_bounds(table: str, name: str) -> tuple[datetime, datetime] | None:
+    match: re.Match | None = _PARTITION_NAME.match(name)
+    if match is None or match["table"] != table:
+        return None
+    lower: datetime = datetime.strptime(match["lower"], "%Y%m%d").replace(tzinfo=timezone.utc)
+    upper: datetime = datetime.strptime(match["upper"], "%Y%m%d").replace(tzinfo=timezone.utc)
+    return lower, upper
@@ -1,16 +1,97 @@
-from random import choices
+import secrets
+import threading
 from string import ascii_letters, digits
+from typing import Protocol
 
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.crud.link import crud_get_link_by_short_id
-from app.exceptions import ShortIdGenerationError
+from app.core.config import settings
 
+ALPHABET: str = ascii_letters + digits
+SHORT_ID_SEQUENCE: str = "short_id_seq"
+_GOLDEN_RATIO_FRACTION: float = 0.6180339887498949
 
-def generate_short_id(db: Session, length: int = 8) -> str:
-    alphabet: str = ascii_letters + digits
-    for _ in range(10):
-        short_id: str = "".join(choices(alphabet, k=length))
-        if crud_get_link_by_short_id(db, short_id) is None:
-            return short_id
-    raise ShortIdGenerationError("Failed to generate a unique short ID after multiple attempts")
+
+class ShortIdGenerator(Protocol):
+    def generate(self, db: Session, count: int = 1) -> list[str]:
+        ...
+
+
+def encode_base62(number: int, length: int = 0) -> str:
+    chars: list[str] = []
+    while number:
+        number, remainder = divmod(number, len(ALPHABET))
+        chars.append(ALPHABET[remainder])
+    return "".join(reversed(chars)).rjust(length, ALPHABET[0])
+
+
+def _scramble_multiplier(space: int) -> int:
+    # Coprime with 62 (odd, not a multiple of 31), so multiplying by it permutes [0, space).
+    # Near the golden ratio of the space, consecutive numbers land far apart.
+    multiplier: int = int(space * _GOLDEN_RATIO_FRACTION) | 1
+    while multiplier % 31 == 0:
+        multiplier += 2
+    return multiplier
+
+
+class RandomShortIdGenerator:
+    # No lookups: uniqueness is left to the unique index, callers retry on IntegrityError.
+    def __init__(self, length: int) -> None:
+        self.length: int = length
+
+    def generate(self, db: Session, count: int = 1) -> list[str]:
+        return ["".join(secrets.choice(ALPHABET) for _ in range(self.length)) for _ in range(count)]
+
+
+class SequenceShortIdGenerator:
+    def __init__(self, length: int, block_size: int, sequence: str = SHORT_ID_SEQUENCE) -> None:
+        self.length: int = length
+        self.block_size: int = block_size
+        self.sequence: str = sequence
+        self._space: int = len(ALPHABET) ** length
+        self._multiplier: int = _scramble_multiplier(self._space)
+        self._reserved: list[int] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def generate(self, db: Session, count: int = 1) -> list[str]:
+        numbers: list[int] = []
+        while len(numbers) < count:
+            with self._lock:
+                taken: int = min(count - len(numbers), len(self._reserved))
+                numbers += self._reserved[:taken]
+                del self._reserved[:taken]
+            if len(numbers) < count:
+                # The lock is not held during the query: under AsyncSession.run_sync the query yields to the event
+                # loop, and another request on the same thread may refill concurrently. Both blocks are unique anyway.
+                block: list[int] = self._reserve(db, max(self.block_size, count - len(numbers)))
+                with self._lock:
+                    self._reserved += block
+        return [self._encode(number) for number in numbers]
+
+    def _reserve(self, db: Session, size: int) -> list[int]:
+        dialect: str = db.get_bind().dialect.name
+        if dialect != "postgresql":
+            raise NotImplementedError(f"Sequence short IDs are not supported for the '{dialect}' dialect")
+        return list(db.scalars(
+            text(f"SELECT nextval('{self.sequence}') FROM generate_series(1, :size)"),
+            {"size": size}
+        ))
+
+    def _encode(self, number: int) -> str:
+        # Consecutive numbers are scrambled so that ids do not look sequential. Once the fixed-length space is
+        # used up, numbers are encoded as they are, which gives longer ids that cannot clash with shorter ones.
+        if number < self._space:
+            return encode_base62(number * self._multiplier % self._space, self.length)
+        return encode_base62(number)
+
+
+def build_short_id_generator(strategy: str) -> ShortIdGenerator:
+    if strategy == "random":
+        return RandomShortIdGenerator(settings.SHORT_ID_LENGTH)
+    if strategy == "sequence":
+        return SequenceShortIdGenerator(settings.SHORT_ID_LENGTH, settings.SHORT_ID_SEQUENCE_BLOCK_SIZE)
+    raise ValueError(f"Unknown short ID strategy '{strategy}'")
+
+
+short_id_generator: ShortIdGenerator = build_short_id_generator(settings.SHORT_ID_STRATEGY)
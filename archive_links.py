@@ -0,0 +1,55 @@
+import argparse
+import sys
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.exceptions import LinkArchiveError
+from app.services.link_sweeper import LinkSweeper
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Move expired and deactivated links with their clicks to the archive")
+    parser.add_argument(
+        "-g", "--grace-seconds",
+        type=int,
+        default=settings.LINK_ARCHIVE_GRACE_SECONDS,
+        help="Archive links that expired or were deactivated at least this many seconds ago"
+    )
+    parser.add_argument(
+        "-b", "--batch-size",
+        type=int,
+        default=settings.LINK_ARCHIVE_BATCH_SIZE,
+        help="Links moved per transaction"
+    )
+    parser.add_argument(
+        "-c", "--click-batch-size",
+        type=int,
+        default=settings.LINK_ARCHIVE_CLICK_BATCH_SIZE,
+        help="Clicks moved per statement"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+    if args.grace_seconds < 0 or args.batch_size < 1 or args.click_batch_size < 1:
+        print("Error: grace seconds must not be negative and batch sizes must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    sweeper: LinkSweeper = LinkSweeper(
+        session_factory=SessionLocal,
+        grace_seconds=args.grace_seconds,
+        batch_size=args.batch_size,
+        click_batch_size=args.click_batch_size,
+        interval=0
+    )
+    try:
+        archived: int = sweeper.sweep()
+    except LinkArchiveError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"Links archived: {archived}")
+
+
+if __name__ == "__main__":
+    main()
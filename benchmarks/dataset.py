@@ -0,0 +1,70 @@
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import Link, User
+from app.utils.hashing import hash_password
+
+BENCH_PREFIX: str = "bench"
+BENCH_PASSWORD: str = "bench"
+
+
+def seed(db: Session, users: int, links_per_user: int, clicks_per_link: int) -> None:
+    # Everything is generated server-side, so large datasets load in seconds. Every bench user shares one hash.
+    params: dict[str, Any] = {"prefix": BENCH_PREFIX, "users": users, "links": links_per_user,
+                              "clicks": clicks_per_link, "password_hash": hash_password(BENCH_PASSWORD)}
+    first_user_id: int = db.execute(text("SELECT coalesce(max(id), 0) + 1 FROM users")).scalar_one()
+    params["run"] = first_user_id
+    db.execute(text(
+        "INSERT INTO users (username, password_hash, is_active) "
+        "SELECT :prefix || '_user_' || :run || '_' || g, :password_hash, true FROM generate_series(1, :users) g"
+    ), params)
+    db.execute(text(
+        "INSERT INTO links (short_id, orig_url, user_id, created_at, expire_at, is_active) "
+        "SELECT :prefix || u.id || '_' || g, 'https://example.com/' || g, u.id, "
+        "now() - g * interval '1 minute', now() + interval '30 days', g % 10 <> 0 "
+        "FROM users u, generate_series(1, :links) g WHERE u.username LIKE :prefix || '\\_user\\_' || :run || '\\_%'"
+    ), params)
+    db.execute(text(
+        "INSERT INTO clicks (link_id, clicked_at) "
+        "SELECT l.id, now() - random() * interval '30 days' "
+        "FROM links l JOIN users u ON u.id = l.user_id, generate_series(1, :clicks) g "
+        "WHERE u.username LIKE :prefix || '\\_user\\_' || :run || '\\_%'"
+    ), params)
+    db.execute(text(
+        "INSERT INTO click_rollups (link_id, bucket_start, clicks) "
+        "SELECT c.link_id, date_trunc('hour', c.clicked_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', count(*) "
+        "FROM clicks c JOIN links l ON l.id = c.link_id JOIN users u ON u.id = l.user_id "
+        "WHERE u.username LIKE :prefix || '\\_user\\_' || :run || '\\_%' GROUP BY 1, 2 "
+        "ON CONFLICT (link_id, bucket_start) DO UPDATE SET clicks = EXCLUDED.clicks"
+    ), params)
+    db.execute(text(
+        "INSERT INTO click_totals (link_id, clicks) "
+        "SELECT c.link_id, count(*) FROM clicks c JOIN links l ON l.id = c.link_id JOIN users u ON u.id = l.user_id "
+        "WHERE u.username LIKE :prefix || '\\_user\\_' || :run || '\\_%' GROUP BY 1 "
+        "ON CONFLICT (link_id) DO UPDATE SET clicks = EXCLUDED.clicks"
+    ), params)
+    db.commit()
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+
+def find_bench_user(db: Session) -> User | None:
+    # The most recently seeded user, so that re-seeding with other sizes is picked up.
+    return (
+        db.query(User)
+        .filter(User.username.like(f"{BENCH_PREFIX}_user_%"))
+        .order_by(User.id.desc())
+        .first()
+    )
+
+
+def sample_short_ids(db: Session, user: User, limit: int) -> list[str]:
+    return list(db.scalars(
+        db.query(Link.short_id)
+        .filter(Link.user_id == user.id, Link.is_active.is_(True))
+        .order_by(Link.id)
+        .limit(limit)
+        .statement
+    ))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import Session
+
+sys.path.append(".")
+
+from app.crud.link import crud_get_user_links
+from app.crud.stats import crud_get_stats_for_user_links, crud_get_stats_for_short_ids
+from app.db.session import engine, SessionLocal
+from app.models import Link, User
+from benchmarks.dataset import seed, find_bench_user
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Print EXPLAIN ANALYZE plans of the hot stats and links queries against the configured database"
+    )
+    parser.add_argument("--seed", action="store_true", help="Insert a synthetic dataset before explaining")
+    parser.add_argument("--users", type=int, default=20, help="Users to seed")
+    parser.add_argument("--links-per-user", type=int, default=500, help="Links to seed per user")
+    parser.add_argument("--clicks-per-link", type=int, default=50, help="Clicks to seed per link, over 30 days")
+    parser.add_argument("--json", action="store_true", help="Print plans as JSON instead of text")
+    return parser.parse_args()
+
+
+@contextmanager
+def capture_statements(target: Engine) -> Iterator[list[tuple[str, Any]]]:
+    captured: list[tuple[str, Any]] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        captured.append((statement, parameters))
+
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(target, "before_cursor_execute", _before_cursor_execute)
+
+
+def explain(target: Engine, name: str, call: Callable[[Session], Any]) -> list[dict[str, Any]]:
+    db: Session = SessionLocal()
+    try:
+        with capture_statements(target) as statements:
+            call(db)
+    finally:
+        db.close()
+
+    plans: list[dict[str, Any]] = []
+    with target.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters).all()
+            plan: dict[str, Any] = rows[0][0][0]
+            text_rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+            plans.append({
+                "query": name,
+                "statement": statement,
+                "execution_ms": plan["Execution Time"],
+                "plan": "\n".join(row[0] for row in text_rows),
+            })
+    return plans
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+
+    db: Session = SessionLocal()
+    try:
+        if args.seed:
+            seed(db, args.users, args.links_per_user, args.clicks_per_link)
+        user: User | None = find_bench_user(db)
+        if user is None:
+            print("No benchmark data found, run with --seed first", file=sys.stderr)
+            sys.exit(1)
+        link: Link = db.query(Link).filter(Link.user_id == user.id).order_by(Link.id).first()
+    finally:
+        db.close()
+
+    plans: list[dict[str, Any]] = []
+    plans += explain(engine, "list_links", lambda s: crud_get_user_links(s, user.id, None, None, 10, 0))
+    plans += explain(engine, "stats_top_links", lambda s: crud_get_stats_for_user_links(s, user.id, 100, "hour"))
+    plans += explain(engine, "stats_single_link", lambda s: crud_get_stats_for_short_ids(s, [link.short_id], user.id))
+
+    if args.json:
+        print(json.dumps(plans, indent=2))
+        return
+
+    for plan in plans:
+        print(f"=== {plan['query']} ({plan['execution_ms']:.3f} ms)")
+        print(plan["statement"])
+        print(plan["plan"])
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+from contextlib import AsyncExitStack
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+sys.path.append(".")
+
+from app.db.session import SessionLocal
+from app.main import app
+from app.models import User
+from benchmarks.dataset import BENCH_PASSWORD, seed, find_bench_user, sample_short_ids
+
+Scenario = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+SCENARIO_NAMES: tuple[str, ...] = ("redirect", "create_link", "list_links", "stats_top", "stats_link",
+                                   "stats_batch")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the hot HTTP paths against the configured database and print latency percentiles "
+                    "and throughput as JSON"
+    )
+    parser.add_argument("--seed", action="store_true", help="Insert a synthetic dataset before benchmarking")
+    parser.add_argument("--users", type=int, default=20, help="Users to seed")
+    parser.add_argument("--links-per-user", type=int, default=500, help="Links to seed per user")
+    parser.add_argument("--clicks-per-link", type=int, default=50, help="Clicks to seed per link, over 30 days")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIO_NAMES, default=list(SCENARIO_NAMES),
+                        help="Scenarios to run")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--base-url", default=None,
+                        help="Benchmark a running server, e.g. http://127.0.0.1:8080. In-process ASGI by default")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered: list[float] = sorted(samples)
+    index: float = (len(ordered) - 1) * fraction
+    low: int = int(index)
+    high: int = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (index - low)
+
+
+def build_scenarios(short_ids: list[str]) -> dict[str, Scenario]:
+    async def redirect(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get(f"/{rng.choice(short_ids)}")
+
+    async def create_link(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.post("/api/links/", json={"orig_url": f"https://example.com/bench/{rng.random()}"})
+
+    async def list_links(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get("/api/links/", params={"page_size": 50})
+
+    async def stats_top(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get("/api/stats/", params={"top": 10, "sort_by": rng.choice(["hour", "day", "all"])})
+
+    async def stats_link(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get(f"/api/stats/{rng.choice(short_ids)}")
+
+    async def stats_batch(client: httpx.AsyncClient, rng: random.Random) -> httpx.Response:
+        return await client.get("/api/stats/", params={"ids": ",".join(rng.sample(short_ids, min(20, len(short_ids))))})
+
+    return {
+        "redirect": redirect,
+        "create_link": create_link,
+        "list_links": list_links,
+        "stats_top": stats_top,
+        "stats_link": stats_link,
+        "stats_batch": stats_batch,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, warmup: int,
+                       concurrency: int) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors: int = 0
+    remaining: int = warmup + requests
+    measure_started: float | None = None
+    rng: random.Random = random.Random(0)
+
+    async def worker() -> None:
+        nonlocal remaining, errors, measure_started
+        while remaining > 0:
+            remaining -= 1
+            measured: bool = remaining < requests
+            started: float = perf_counter()
+            if measured and measure_started is None:
+                measure_started = started
+            try:
+                response: httpx.Response = await scenario(client, rng)
+                failed: bool = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if measured:
+                latencies.append((perf_counter() - started) * 1000)
+                errors += failed
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed: float = perf_counter() - measure_started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(max(latencies), 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    db = SessionLocal()
+    try:
+        if args.seed:
+            seed(db, args.users, args.links_per_user, args.clicks_per_link)
+        user: User | None = find_bench_user(db)
+        if user is None:
+            print("No benchmark data found, run with --seed first", file=sys.stderr)
+            sys.exit(1)
+        username: str = user.username
+        short_ids: list[str] = sample_short_ids(db, user, 1000)
+    finally:
+        db.close()
+
+    scenarios: dict[str, Scenario] = build_scenarios(short_ids)
+    results: dict[str, Any] = {}
+
+    async with AsyncExitStack() as stack:
+        if args.base_url is None:
+            # ASGITransport does not run the lifespan, enter it here so the app starts as it does under uvicorn.
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport: httpx.AsyncBaseTransport = httpx.ASGITransport(app=app)
+            base_url: str = "http://bench"
+        else:
+            transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+            base_url = args.base_url
+        client: httpx.AsyncClient = await stack.enter_async_context(httpx.AsyncClient(
+            transport=transport,
+            base_url=base_url,
+            auth=(username, BENCH_PASSWORD),
+            follow_redirects=False,
+            timeout=30.0
+        ))
+        for name in args.scenarios:
+            results[name] = await run_scenario(client, scenarios[name], args.requests, args.warmup, args.concurrency)
+
+    return {
+        "config": {
+            "target": args.base_url or "asgi",
+            "user": username,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    report: dict[str, Any] = asyncio.run(run(args))
+
+    output: str = json.dumps(report, indent=2)
+    if args.output is None:
+        print(output)
+        return
+    with open(args.output, "w") as file:
+        file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
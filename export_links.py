@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+from typing import Iterable
+
+from app.db.session import SessionLocal
+from app.exceptions import LinkExportError
+from app.services.edge_export import EdgeExport, MEDIA_TYPES, DELTA_FORMATS
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export live links for serving redirects from nginx or a CDN")
+    parser.add_argument(
+        "-f", "--format",
+        choices=list(MEDIA_TYPES),
+        default="nginx",
+        help="nginx map, JSON or CSV manifest, or binary link map sorted by short ID"
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        default=None,
+        help="File to write, replaced atomically. Standard output if omitted"
+    )
+    parser.add_argument(
+        "-s", "--since",
+        type=datetime.fromisoformat,
+        default=None,
+        help=f"Export only links changed after this ISO time ({' or '.join(DELTA_FORMATS)} only)"
+    )
+    parser.add_argument(
+        "--state-file",
+        type=str,
+        default=None,
+        help="Keeps the time for the next delta: read as --since when given, rewritten after every export"
+    )
+    return parser.parse_args()
+
+
+def read_state(path: str) -> datetime | None:
+    try:
+        with open(path) as f:
+            return datetime.fromisoformat(f.read().strip())
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        print(f"Error: {path} does not hold an ISO time", file=sys.stderr)
+        sys.exit(1)
+
+
+def write_atomically(path: str, chunks: Iterable[bytes]) -> None:
+    # Readers such as an nginx reload or an mmap never see a half-written file.
+    tmp_path: str = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_export(export: EdgeExport, output: str | None) -> None:
+    if output is not None:
+        write_atomically(output, export)
+        return
+    for chunk in export:
+        sys.stdout.buffer.write(chunk)
+    sys.stdout.buffer.flush()
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_args()
+    since: datetime | None = args.since
+    if since is None and args.state_file is not None and args.format in DELTA_FORMATS:
+        since = read_state(args.state_file)
+
+    try:
+        export: EdgeExport = EdgeExport(SessionLocal, args.format, since)
+        write_export(export, args.output)
+    except LinkExportError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    if args.state_file is not None:
+        write_atomically(args.state_file, [export.next_since.isoformat().encode()])
+    print(f"Links exported: {export.exported}, skipped: {export.skipped}, "
+          f"next since: {export.next_since.isoformat()}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.models import Link, User
+from app.utils.link_map import LinkMap
+from tests.fixtures.links import test_links
+from tests.fixtures.user import override_get_current_user
+
+
+@pytest.fixture
+def admin(monkeypatch: pytest.MonkeyPatch, test_user: User) -> User:
+    monkeypatch.setattr("app.api.deps.settings.ADMIN_USERNAMES", [test_user.username])
+    return test_user
+
+
+def test_edge_export_requires_admin(client: TestClient, test_user: User):
+    response = client.get("/api/admin/edge-export")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert response.json()["detail"] == "Admin rights required"
+
+
+def test_edge_export_streams_nginx_map_by_default(client: TestClient, admin: User, test_links: list[Link]):
+    response = client.get("/api/admin/edge-export")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.headers["content-disposition"] == 'attachment; filename="links.map"'
+    assert datetime.fromisoformat(response.headers["x-export-next-since"]) < datetime.now(timezone.utc)
+    assert '"/active0" "https://example.com/0";' in response.text
+    assert "expired0" not in response.text
+
+
+def test_edge_export_json_delta(client: TestClient, admin: User, test_links: list[Link]):
+    since: datetime = datetime.now(timezone.utc) - timedelta(minutes=10)
+    response = client.get("/api/admin/edge-export", params={"format": "json", "since": since.isoformat()})
+    assert response.status_code == status.HTTP_200_OK
+
+    manifest: dict[str, any] = response.json()
+    assert datetime.fromisoformat(manifest["since"]) == since
+    assert manifest["next_since"] == response.headers["x-export-next-since"]
+    assert {item["short_id"] for item in manifest["links"] if item["op"] == "delete"} == {
+        "expired0", "expired1", "inactive0", "inactive1"
+    }
+
+
+def test_edge_export_binary(client: TestClient, admin: User, test_links: list[Link]):
+    response = client.get("/api/admin/edge-export", params={"format": "binary"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert LinkMap(response.content).get("active2").orig_url == "https://example.com/2"
+
+
+def test_edge_export_rejects_nginx_delta(client: TestClient, admin: User):
+    response = client.get("/api/admin/edge-export", params={"since": datetime.now(timezone.utc).isoformat()})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "json or csv" in response.json()["detail"]
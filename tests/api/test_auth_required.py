@@ -12,6 +12,7 @@ PRIVATE_ENDPOINTS: list[tuple[str, str, dict[str, str]]] = [
     ("/api/links/{short_id}/deactivate", "patch", {"short_id": "test_short_id"}),
     ("/api/stats/", "get", {}),
     ("/api/stats/{short_id}", "get", {"short_id": "test_short_id"}),
+    ("/api/admin/edge-export", "get", {}),
 ]
 
 
@@ -44,10 +44,10 @@ def test_create_link_success(client: TestClient, db: Session, test_user: User):
 
 
 def test_create_link_shortid_error(monkeypatch: pytest.MonkeyPatch, client: TestClient, test_user: User):
-    monkeypatch.setattr(
-        "app.api.routes.links.generate_short_id",
-        lambda db: (_ for _ in ()).throw(ShortIdGenerationError("cannot generate"))
-    )
+    async def fake_crud_create(**kwargs):
+        raise ShortIdGenerationError("cannot generate")
+
+    monkeypatch.setattr("app.api.routes.links.crud_create_generated_link_async", fake_crud_create)
 
     payload: dict[str, any] = {
         "orig_url": "https://example.com/bad",
@@ -59,20 +59,17 @@ def test_create_link_shortid_error(monkeypatch: pytest.MonkeyPatch, client: Test
 
 
 def test_create_link_crud_create_error(monkeypatch: pytest.MonkeyPatch, client: TestClient, test_user: User):
-    def fake_generate(db: Session):
-        return "fixedshortid"
-
-    def fake_crud_create(
+    async def fake_crud_create(
             db: Session,
-            short_id: str,
             orig_url: str,
             user_id: int,
             expire_seconds: int,
-            is_active: bool):
+            is_active: bool,
+            redirect_status: int,
+            cache_redirects: bool):
         raise LinkCreateError("crud failed")
 
-    monkeypatch.setattr("app.api.routes.links.generate_short_id", fake_generate)
-    monkeypatch.setattr("app.api.routes.links.crud_create_link", fake_crud_create)
+    monkeypatch.setattr("app.api.routes.links.crud_create_generated_link_async", fake_crud_create)
 
     payload: dict[str, any] = {
         "orig_url": "https://example.com/error",
@@ -144,15 +141,15 @@ def test_deactivate_link_crud_update_error(
         test_links: list[Link]
 ):
     link: Link = test_links[0]
-    monkeypatch.setattr(
-        "app.api.routes.links.crud_get_link_by_short_id",
-        lambda db_s, s_id: link if s_id == link.short_id else None
-    )
+    async def fake_get_link(db_s: Session, s_id: str):
+        return link if s_id == link.short_id else None
+
+    monkeypatch.setattr("app.api.routes.links.crud_get_link_by_short_id_async", fake_get_link)
 
-    def fake_deactivate(_db: Session, _link: Link):
+    async def fake_deactivate(_db: Session, _link: Link):
         raise LinkUpdateError("cannot update")
 
-    monkeypatch.setattr("app.api.routes.links.crud_deactivate_link", fake_deactivate)
+    monkeypatch.setattr("app.api.routes.links.crud_deactivate_link_async", fake_deactivate)
 
     response = client.patch(f"/api/links/{link.short_id}/deactivate")
     data: dict[str, any] = response.json()
@@ -187,6 +184,39 @@ def test_read_links_with_page_size_and_page(client: TestClient, test_links: list
     assert len(data["items"]) == 3
 
 
+def test_read_links_follows_next_cursor(client: TestClient, test_links: list[Link]):
+    response = client.get("/api/links/?page_size=3&include_total=false")
+    data: dict[str, any] = response.json()
+    assert data["total_items"] is None
+    assert data["total_pages"] is None
+    assert data["next_cursor"] is not None
+
+    short_ids: list[str] = [item["short_id"] for item in data["items"]]
+    while data["next_cursor"] is not None:
+        response = client.get(f"/api/links/?page_size=3&cursor={data['next_cursor']}")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["page"] is None
+        short_ids += [item["short_id"] for item in data["items"]]
+
+    expected: list[str] = [link.short_id for link in sorted(test_links, key=lambda link: link.created_at, reverse=True)]
+    assert short_ids == expected
+
+
+def test_read_links_last_page_has_no_next_cursor(client: TestClient, test_links: list[Link]):
+    response = client.get("/api/links/?page=3&page_size=3")
+    data: dict[str, any] = response.json()
+    assert len(data["items"]) == 1
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.parametrize("query", ["cursor=garbage", "cursor=WzEsMl0", "page=2&cursor=WzEsMl0"],
+                         ids=["not_base64_json", "wrong_shape", "page_and_cursor"])
+def test_read_links_rejects_bad_cursor(client: TestClient, test_links: list[Link], query: str):
+    response = client.get(f"/api/links/?{query}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_read_links_filter_is_active_true(client: TestClient, test_links: list[Link]):
     response = client.get("/api/links/?is_active=true")
     assert response.status_code == status.HTTP_200_OK
@@ -239,3 +269,104 @@ def test_read_links_filter_is_valid_false(client: TestClient, test_links: list[L
         expire_at: datetime = datetime.fromisoformat(item["expire_at"].replace("Z", "+00:00")).replace(
             tzinfo=timezone.utc)
         assert expire_at < now
+
+
+def test_create_links_bulk_json_array(client: TestClient, db: Session, test_user: User):
+    payload: list[dict[str, any]] = [
+        {"orig_url": "https://example.com/a", "expire_seconds": 60},
+        {"orig_url": "not a url"},
+        {"orig_url": "https://example.com/c"},
+    ]
+    response = client.post("/api/links/bulk", json=payload)
+    assert response.status_code == status.HTTP_200_OK
+
+    data: dict[str, any] = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert [item["index"] for item in data["items"]] == [0, 1, 2]
+    assert data["items"][0]["link"]["orig_url"] == "https://example.com/a"
+    assert data["items"][1]["link"] is None
+    assert "orig_url" in data["items"][1]["error"]
+    assert data["items"][2]["link"]["short_url"] == f"http://testserver/{data['items'][2]['link']['short_id']}"
+
+    short_ids: list[str] = [data["items"][0]["link"]["short_id"], data["items"][2]["link"]["short_id"]]
+    created: list[Link] = db.query(Link).filter(Link.short_id.in_(short_ids)).all()
+    assert len(created) == 2
+    assert all(link.user_id == test_user.id for link in created)
+
+
+def test_create_links_bulk_ndjson_in_chunks(monkeypatch: pytest.MonkeyPatch, client: TestClient, db: Session,
+                                            test_user: User):
+    monkeypatch.setattr("app.api.routes.links.settings.LINK_BULK_CHUNK_SIZE", 2)
+    lines: list[str] = [f'{{"orig_url": "https://example.com/{i}"}}' for i in range(5)]
+    lines.insert(3, "{broken")
+    body: str = "\n".join(lines) + "\n"
+
+    response = client.post("/api/links/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == status.HTTP_200_OK
+
+    data: dict[str, any] = response.json()
+    assert data["created"] == 5
+    assert data["failed"] == 1
+    assert data["items"][3]["error"] is not None
+    assert len({item["link"]["short_id"] for item in data["items"] if item["link"]}) == 5
+    assert db.query(Link).filter(Link.user_id == test_user.id).count() == 5
+
+
+def test_create_links_bulk_keeps_redirect_options(client: TestClient, test_user: User):
+    payload: list[dict[str, any]] = [
+        {"orig_url": "https://example.com/a", "redirect_status": 301, "cache_redirects": True},
+        {"orig_url": "https://example.com/b"},
+        {"orig_url": "https://example.com/c", "redirect_status": 303},
+    ]
+
+    response = client.post("/api/links/bulk", json=payload)
+    data: dict[str, any] = response.json()
+    assert data["created"] == 2
+    assert data["items"][0]["link"]["redirect_status"] == 301
+    assert data["items"][0]["link"]["cache_redirects"] is True
+    assert data["items"][1]["link"]["redirect_status"] == 302
+    assert data["items"][1]["link"]["cache_redirects"] is False
+    assert "redirect_status" in data["items"][2]["error"]
+
+
+def test_create_links_bulk_rejects_items_over_limit(monkeypatch: pytest.MonkeyPatch, client: TestClient,
+                                                    test_user: User):
+    monkeypatch.setattr("app.api.routes.links.settings.LINK_BULK_MAX_ITEMS", 2)
+    payload: list[dict[str, any]] = [{"orig_url": f"https://example.com/{i}"} for i in range(3)]
+
+    response = client.post("/api/links/bulk", json=payload)
+    data: dict[str, any] = response.json()
+    assert data["created"] == 2
+    assert "Too many items" in data["items"][2]["error"]
+
+
+def test_create_links_bulk_stops_reading_ndjson_at_the_limit(monkeypatch: pytest.MonkeyPatch, client: TestClient,
+                                                             test_user: User):
+    monkeypatch.setattr("app.api.routes.links.settings.LINK_BULK_MAX_ITEMS", 2)
+    body: str = "".join(f'{{"orig_url": "https://example.com/{i}"}}\n' for i in range(50))
+
+    response = client.post("/api/links/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    data: dict[str, any] = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert [item["index"] for item in data["items"]] == [0, 1, 2]
+    assert "Too many items" in data["items"][2]["error"]
+
+
+def test_create_links_bulk_reports_chunk_errors(monkeypatch: pytest.MonkeyPatch, client: TestClient, test_user: User):
+    async def fake_bulk_create(**kwargs):
+        raise LinkCreateError("Error while creating links")
+
+    monkeypatch.setattr("app.api.routes.links.crud_bulk_create_generated_links_async", fake_bulk_create)
+
+    response = client.post("/api/links/bulk", json=[{"orig_url": "https://example.com/a"}])
+    data: dict[str, any] = response.json()
+    assert data["created"] == 0
+    assert data["items"][0]["error"] == "Error while creating links"
+
+
+@pytest.mark.parametrize("body", ['{"orig_url": "https://example.com"}', "not json"], ids=["object", "invalid"])
+def test_create_links_bulk_rejects_non_array_body(client: TestClient, test_user: User, body: str):
+    response = client.post("/api/links/bulk", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,77 @@
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics import timed_crud
+from app.models import Link
+from tests.fixtures.links import test_links
+
+
+def sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.parametrize(
+    "short_id, status_code, reason",
+    [
+        ("active0", "302", "found"),
+        ("doesnotexist", "404", "not_found"),
+        ("inactive0", "404", "inactive"),
+        ("expired0", "404", "expired"),
+    ]
+)
+def test_redirect_outcomes_are_counted(client: TestClient, test_links: list[Link], short_id: str, status_code: str,
+                                       reason: str):
+    before: float = sample("redirects_total", status=status_code, reason=reason)
+    client.get(f"/{short_id}", follow_redirects=False)
+    assert sample("redirects_total", status=status_code, reason=reason) == before + 1
+
+
+def test_request_latency_is_labelled_by_route_template(client: TestClient, test_links: list[Link]):
+    labels: dict[str, str] = {"method": "GET", "route": "/{short_id}", "status": "302"}
+    before: float = sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/active1", follow_redirects=False)
+    client.get("/active2", follow_redirects=False)
+
+    assert sample("http_request_duration_seconds_count", **labels) == before + 2
+
+
+def test_unmatched_paths_share_one_label(client: TestClient):
+    labels: dict[str, str] = {"method": "GET", "route": "unmatched", "status": "404"}
+    before: float = sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/some/random/path")
+
+    assert sample("http_request_duration_seconds_count", **labels) == before + 1
+
+
+def test_metrics_endpoint_exposes_metrics(client: TestClient, test_links: list[Link]):
+    client.get("/active0", follow_redirects=False)
+
+    response = client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'redirects_total{reason="found",status="302"}' in response.text
+    assert 'crud_duration_seconds_count{function="crud_resolve_link"}' in response.text
+
+
+@pytest.mark.anyio
+async def test_timed_crud_observes_sync_and_async_functions():
+    @timed_crud
+    def crud_sync_probe() -> int:
+        return 1
+
+    @timed_crud
+    async def crud_async_probe() -> int:
+        return 2
+
+    before_sync: float = sample("crud_duration_seconds_count", function="crud_sync_probe")
+    before_async: float = sample("crud_duration_seconds_count", function="crud_async_probe")
+
+    assert crud_sync_probe() == 1
+    assert await crud_async_probe() == 2
+
+    assert sample("crud_duration_seconds_count", function="crud_sync_probe") == before_sync + 1
+    assert sample("crud_duration_seconds_count", function="crud_async_probe") == before_async + 1
@@ -1,12 +1,15 @@
+from datetime import datetime, timezone, timedelta
+
 import pytest
 from fastapi import status
 from sqlalchemy.orm import Session
 from fastapi.testclient import TestClient
 
 from app.exceptions import ClickLogError
-from app.models import Link
+from app.models import Link, User
 import app.api.routes.public as public_module
 from tests.fixtures.links import test_links
+from tests.fixtures.user import override_get_current_user
 
 
 @pytest.mark.parametrize(
@@ -58,21 +61,58 @@ def test_redirect_expired_link(client: TestClient, test_links: list[Link], short
 def test_click_logging_success(monkeypatch: pytest.MonkeyPatch, client: TestClient, test_links: list[Link]):
     calls = {"count": 0}
 
-    def fake_log_click(db: Session, link_id: int):
+    async def fake_log_click(db: Session, link_id: int):
         calls["count"] += 1
 
-    monkeypatch.setattr(public_module, "crud_log_click", fake_log_click)
+    monkeypatch.setattr(public_module, "crud_log_click_async", fake_log_click)
 
     response = client.get("/active0", follow_redirects=False)
     assert response.status_code == status.HTTP_302_FOUND
     assert calls["count"] == 1
 
 
+def test_click_is_buffered_when_buffer_is_running(
+        monkeypatch: pytest.MonkeyPatch,
+        client: TestClient,
+        test_links: list[Link]
+):
+    buffered: list[int] = []
+
+    async def fake_log_click(db: Session, link_id: int):
+        raise AssertionError("buffered clicks must not be written on the request path")
+
+    monkeypatch.setattr(public_module.click_buffer, "put", lambda link_id: buffered.append(link_id) or True)
+    monkeypatch.setattr(public_module, "crud_log_click_async", fake_log_click)
+
+    response = client.get("/active0", follow_redirects=False)
+    assert response.status_code == status.HTTP_302_FOUND
+    assert buffered == [test_links[0].id]
+
+
+def test_click_is_counted_when_counters_are_running(
+        monkeypatch: pytest.MonkeyPatch,
+        client: TestClient,
+        test_links: list[Link]
+):
+    counted: list[int] = []
+
+    async def fake_increment(link_id: int) -> bool:
+        counted.append(link_id)
+        return True
+
+    monkeypatch.setattr(public_module.click_counters, "increment", fake_increment)
+    monkeypatch.setattr(public_module.click_buffer, "put", lambda link_id: pytest.fail("counted clicks are not buffered"))
+
+    response = client.get("/active0", follow_redirects=False)
+    assert response.status_code == status.HTTP_302_FOUND
+    assert counted == [test_links[0].id]
+
+
 def test_click_logging_failure(monkeypatch, client: TestClient, caplog, test_links: list[Link]):
-    def fake_log_click_error(db: Session, link_id: int):
+    async def fake_log_click_error(db: Session, link_id: int):
         raise ClickLogError("fail to log click")
 
-    monkeypatch.setattr(public_module, "crud_log_click", fake_log_click_error)
+    monkeypatch.setattr(public_module, "crud_log_click_async", fake_log_click_error)
 
     caplog.set_level("ERROR", logger=public_module.logger.name)
 
@@ -81,3 +121,99 @@ def test_click_logging_failure(monkeypatch, client: TestClient, caplog, test_lin
     matching = [rec for rec in caplog.records if "Error logging click for link" in rec.getMessage()]
     assert len(matching) == 1
     assert "fail to log click" in matching[0].getMessage()
+
+
+def test_redirect_after_deactivation_is_not_served_from_cache(client: TestClient, test_links: list[Link]):
+    response = client.get("/active2", follow_redirects=False)
+    assert response.status_code == status.HTTP_302_FOUND
+
+    response = client.patch("/api/links/active2/deactivate")
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.get("/active2", follow_redirects=False)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["detail"] == "Link is inactive"
+
+
+@pytest.fixture
+def cached_link(db: Session, test_user: User) -> Link:
+    now: datetime = datetime.now(timezone.utc)
+    link: Link = Link(
+        short_id="campaign",
+        orig_url="https://example.com/campaign",
+        user_id=test_user.id,
+        created_at=now,
+        expire_at=now + timedelta(days=30),
+        is_active=True,
+        redirect_status=301,
+        cache_redirects=True
+    )
+    db.add(link)
+    db.commit()
+    return link
+
+
+def count_logged_clicks(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    logged: list[int] = []
+
+    async def fake_log_click(db: Session, link_id: int):
+        logged.append(link_id)
+
+    monkeypatch.setattr(public_module, "crud_log_click_async", fake_log_click)
+    return logged
+
+
+def test_redirect_is_not_cacheable_by_default(client: TestClient, test_links: list[Link]):
+    response = client.get("/active0", follow_redirects=False)
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
+
+
+def test_cacheable_redirect(monkeypatch: pytest.MonkeyPatch, client: TestClient, cached_link: Link):
+    monkeypatch.setattr(public_module.settings, "REDIRECT_CACHE_MAX_AGE_SECONDS", 3600)
+    logged: list[int] = count_logged_clicks(monkeypatch)
+
+    response = client.get("/campaign", follow_redirects=False)
+    assert response.status_code == status.HTTP_301_MOVED_PERMANENTLY
+    assert response.headers["location"] == "https://example.com/campaign"
+    assert response.headers["cache-control"] == "public, max-age=3600"
+    etag: str = response.headers["etag"]
+
+    response = client.get("/campaign", headers={"If-None-Match": etag}, follow_redirects=False)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["etag"] == etag
+    assert logged == [cached_link.id, cached_link.id]
+
+
+def test_cacheable_redirect_max_age_ends_with_the_link(db: Session, client: TestClient, cached_link: Link):
+    cached_link.expire_at = datetime.now(timezone.utc) + timedelta(seconds=100)
+    db.commit()
+
+    max_age: int = int(client.get("/campaign", follow_redirects=False).headers["cache-control"].split("=")[1])
+    assert 0 < max_age <= 100
+
+
+def test_beacon_is_disabled_by_default(client: TestClient, cached_link: Link):
+    response = client.post("/campaign/beacon")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_beacon_counts_clicks_of_cacheable_links(
+        monkeypatch: pytest.MonkeyPatch,
+        client: TestClient,
+        test_links: list[Link],
+        cached_link: Link
+):
+    monkeypatch.setattr(public_module.settings, "REDIRECT_BEACON_ENABLED", True)
+    logged: list[int] = count_logged_clicks(monkeypatch)
+
+    assert client.get("/campaign", follow_redirects=False).status_code == status.HTTP_301_MOVED_PERMANENTLY
+    assert logged == []
+
+    assert client.post("/campaign/beacon").status_code == status.HTTP_204_NO_CONTENT
+    assert logged == [cached_link.id]
+
+    # Clicks on other links are counted by the redirect, the beacon must not count them twice.
+    assert client.post("/active0/beacon").status_code == status.HTTP_204_NO_CONTENT
+    assert logged == [cached_link.id]
+    assert client.post("/missing/beacon").status_code == status.HTTP_404_NOT_FOUND
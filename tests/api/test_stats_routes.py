@@ -3,13 +3,22 @@ from datetime import datetime, timezone
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 
+from app.crud.stats import LinkStats
 from app.models import User, Link
 from app.schemas.stats import StatsListResponse, StatsResponse
 from tests.fixtures.links import test_links
 from tests.fixtures.user import override_get_current_user
 
 
+def async_return(value):
+    async def _fake(*args, **kwargs):
+        return value
+
+    return _fake
+
+
 def test_read_top_links_stats_default_params(client: TestClient, monkeypatch: pytest.MonkeyPatch):
     fake_stats_list: list[tuple[str, str, int, int, int]] = [
         ("https://site.example/1", "AAA111", 3, 7, 20),
@@ -17,8 +26,8 @@ def test_read_top_links_stats_default_params(client: TestClient, monkeypatch: py
     ]
 
     monkeypatch.setattr(
-        "app.api.routes.stats.crud_get_stats_for_user_links",
-        lambda db, user_id, top, sort_by: fake_stats_list
+        "app.api.routes.stats.crud_get_stats_for_user_links_async",
+        async_return(fake_stats_list)
     )
 
     response = client.get("/api/stats")
@@ -46,8 +55,8 @@ def test_read_top_links_stats_with_query_params(client: TestClient, monkeypatch:
     ]
 
     monkeypatch.setattr(
-        "app.api.routes.stats.crud_get_stats_for_user_links",
-        lambda db, user_id, top, sort_by: fake_stats_list
+        "app.api.routes.stats.crud_get_stats_for_user_links_async",
+        async_return(fake_stats_list)
     )
 
     response = client.get("/api/stats/?top=5&sort_by=day")
@@ -62,10 +71,29 @@ def test_read_top_links_stats_with_query_params(client: TestClient, monkeypatch:
     assert parsed.items[0].all_clicks == 2
 
 
+def test_read_top_links_stats_cached_until_user_writes(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    calls: list[int] = []
+
+    async def fake_stats(*args, **kwargs) -> list[tuple[str, str, int, int, int]]:
+        calls.append(len(calls))
+        return [("https://site.example/1", "AAA111", len(calls), len(calls), len(calls))]
+
+    monkeypatch.setattr("app.api.routes.stats.crud_get_stats_for_user_links_async", fake_stats)
+
+    assert client.get("/api/stats/?sort_by=all").json()["items"][0]["all_clicks"] == 1
+    assert client.get("/api/stats/?sort_by=all").json()["items"][0]["all_clicks"] == 1
+    assert client.get("/api/stats/?sort_by=day").json()["items"][0]["all_clicks"] == 2
+
+    response = client.post("/api/links/", json={"orig_url": "https://site.example/new", "expire_seconds": 60})
+    assert response.status_code == status.HTTP_201_CREATED
+
+    assert client.get("/api/stats/?sort_by=all").json()["items"][0]["all_clicks"] == 3
+
+
 def test_read_link_stats_not_found(client: TestClient, monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setattr(
-        "app.api.routes.stats.crud_get_link_by_short_id",
-        lambda db, short_id: None
+        "app.api.routes.stats.crud_get_stats_for_short_ids_async",
+        async_return({})
     )
 
     response = client.get("/api/stats/nonexistent")
@@ -80,19 +108,11 @@ def test_read_link_stats_forbidden_if_not_owner(
         monkeypatch: pytest.MonkeyPatch,
         test_user: User
 ):
-    now: datetime = datetime.now(timezone.utc)
-    other_link: Link = Link(
-        short_id="XYZ123",
-        orig_url="https://site.example/xyz",
-        user_id=test_user.id + 1,
-        created_at=now,
-        expire_at=now,
-        is_active=True
-    )
+    other_stats: LinkStats = LinkStats(test_user.id + 1, "https://site.example/xyz", "XYZ123", 0, 0, 0)
 
     monkeypatch.setattr(
-        "app.api.routes.stats.crud_get_link_by_short_id",
-        lambda db, short_id: other_link
+        "app.api.routes.stats.crud_get_stats_for_short_ids_async",
+        async_return({"XYZ123": other_stats})
     )
 
     response = client.get("/api/stats/XYZ123")
@@ -102,74 +122,70 @@ def test_read_link_stats_forbidden_if_not_owner(
     assert "You do not have permission" in data["detail"]
 
 
-def test_read_link_stats_stats_not_found(
+def test_read_link_stats_success(
         client: TestClient,
         monkeypatch: pytest.MonkeyPatch,
         test_user: User
 ):
-    now: datetime = datetime.now(timezone.utc)
-    own_link = Link(
-        short_id="OWN001",
-        orig_url="https://site.example/own",
-        user_id=test_user.id,
-        created_at=now,
-        expire_at=now,
-        is_active=True
-    )
+    fake_single_stats: LinkStats = LinkStats(test_user.id, "https://site.example/XYZ", "XYZ999", 1, 4, 10)
+    calls: list[list[str]] = []
 
-    monkeypatch.setattr(
-        "app.api.routes.stats.crud_get_link_by_short_id",
-        lambda db, short_id: own_link
-    )
-    monkeypatch.setattr(
-        "app.api.routes.stats.crud_get_stats_for_single_link",
-        lambda db, link: None
-    )
+    async def fake_stats(_db, short_ids: list[str], reader_id: int) -> dict[str, LinkStats]:
+        calls.append(short_ids)
+        return {fake_single_stats.short_id: fake_single_stats}
 
-    response = client.get("/api/stats/OWN001")
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+    monkeypatch.setattr("app.api.routes.stats.crud_get_stats_for_short_ids_async", fake_stats)
+
+    response = client.get(f"/api/stats/{fake_single_stats.short_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert calls == [["XYZ999"]]
 
     data: dict[str, any] = response.json()
-    assert data["detail"] == "Stats not found"
+    parsed: StatsResponse = StatsResponse(**data)
 
+    assert parsed.orig_url == fake_single_stats.orig_url
+    assert parsed.short_url == f"http://testserver/{fake_single_stats.short_id}"
+    assert parsed.last_hour_clicks == fake_single_stats.last_hour_clicks
+    assert parsed.last_day_clicks == fake_single_stats.last_day_clicks
+    assert parsed.all_clicks == fake_single_stats.all_clicks
 
-def test_read_link_stats_success(
-        client: TestClient,
-        monkeypatch: pytest.MonkeyPatch,
-        test_user: User
-):
-    fake_single_stats: tuple[str, str, int, int, int] = (
-        "https://site.example/XYZ", "XYZ999", 1, 4, 10
-    )
+
+def test_read_link_stats_from_database(client: TestClient, test_links: list[Link]):
+    response = client.get(f"/api/stats/{test_links[0].short_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["short_url"] == f"http://testserver/{test_links[0].short_id}"
+
+
+def test_read_stats_for_ids(client: TestClient, db: Session, test_user: User, test_links: list[Link]):
+    other_user: User = User(username="other_user", password_hash="password")
+    db.add(other_user)
+    db.commit()
+    db.refresh(other_user)
 
     now: datetime = datetime.now(timezone.utc)
-    link: Link = Link(
-        short_id=fake_single_stats[1],
-        orig_url=fake_single_stats[0],
-        user_id=test_user.id,
+    foreign: Link = Link(
+        short_id="FOREIGN1",
+        orig_url="https://site.example/foreign",
+        user_id=other_user.id,
         created_at=now,
         expire_at=now,
         is_active=True
     )
+    db.add(foreign)
+    db.commit()
 
-    monkeypatch.setattr(
-        "app.api.routes.stats.crud_get_link_by_short_id",
-        lambda db, _short_id: link
-    )
-    monkeypatch.setattr(
-        "app.api.routes.stats.crud_get_stats_for_single_link",
-        lambda db, _link: fake_single_stats
+    response = client.get(
+        "/api/stats/",
+        params=[("ids", f"{test_links[1].short_id},missing,{foreign.short_id}"), ("ids", test_links[0].short_id)]
     )
-
-    response = client.get(f"/api/stats/{link.short_id}")
     assert response.status_code == status.HTTP_200_OK
 
-    data: dict[str, any] = response.json()
-    parsed: StatsResponse = StatsResponse(**data)
+    short_urls: list[str] = [item["short_url"] for item in response.json()["items"]]
+    assert short_urls == [f"http://testserver/{test_links[1].short_id}", f"http://testserver/{test_links[0].short_id}"]
+
+
+def test_read_stats_for_too_many_ids(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("app.api.routes.stats.settings.STATS_BATCH_MAX_IDS", 2)
 
-    orig_url, short_id, last_hour, last_day, all_clicks = fake_single_stats
-    assert parsed.orig_url == orig_url
-    assert parsed.short_url == f"http://testserver/{short_id}"
-    assert parsed.last_hour_clicks == last_hour
-    assert parsed.last_day_clicks == last_day
-    assert parsed.all_clicks == all_clicks
+    response = client.get("/api/stats/", params={"ids": "a,b,c"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,17 +1,29 @@
+from typing import Any, Callable
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, event
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 
-from app.api.deps import get_db
-from app.crud.user import crud_create_user
+from app.api.deps import get_async_db, get_async_session_factory, get_session_factory
+from app.crud.link import link_cache, negative_link_cache
+from app.core.config import settings
+from app.crud.user import crud_create_user, credential_cache
+from app.db.routing import recent_writers
 from app.exceptions import UserAlreadyExistsError
 from app.main import app
 from app.db.base import Base
 from app.models import User
+from app.services.short_id_filter import short_id_filter
+from app.services.stats_cache import stats_cache
 
 DATABASE_URL = "sqlite+pysqlite:///:memory:"
 
+settings.CLICK_BUFFER_ENABLED = False
+settings.SHORT_ID_FILTER_ENABLED = False
+settings.LINK_SWEEPER_ENABLED = False
+settings.CLICK_PARTITIONS_ENABLED = False
+
 engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False},
@@ -23,6 +35,11 @@ TestingSessionLocal = sessionmaker(
 )
 
 
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
 @pytest.fixture(scope="session", autouse=True)
 def init_db():
     Base.metadata.create_all(bind=engine)
@@ -30,6 +47,38 @@ def init_db():
     Base.metadata.drop_all(bind=engine)
 
 
+class SyncBackedAsyncSession:
+    # Stands in for AsyncSession in route tests so that requests share the test's transactional sync Session.
+    def __init__(self, session: Session) -> None:
+        self.sync_session: Session = session
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return fn(self.sync_session, *args, **kwargs)
+
+    async def rollback(self) -> None:
+        self.sync_session.rollback()
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    link_cache.clear()
+    negative_link_cache.clear()
+    credential_cache.clear()
+    short_id_filter.clear()
+    recent_writers.clear()
+    stats_cache.clear()
+    yield
+    link_cache.clear()
+    negative_link_cache.clear()
+    credential_cache.clear()
+    short_id_filter.clear()
+    recent_writers.clear()
+    stats_cache.clear()
+
+
 @pytest.fixture()
 def db():
     connection = engine.connect()
@@ -48,18 +97,22 @@ def db():
 
 @pytest.fixture()
 def client(db):
-    def override_get_db():
-        yield db
+    async def override_get_async_db():
+        yield SyncBackedAsyncSession(db)
 
-    original = app.dependency_overrides.get(get_db)
-    app.dependency_overrides[get_db] = override_get_db
+    original = app.dependency_overrides.get(get_async_db)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: (lambda: SyncBackedAsyncSession(db))
+    app.dependency_overrides[get_session_factory] = lambda: (lambda: db)
     with TestClient(app) as c:
         yield c
 
+    app.dependency_overrides.pop(get_async_session_factory, None)
+    app.dependency_overrides.pop(get_session_factory, None)
     if original is None:
-        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_async_db, None)
     else:
-        app.dependency_overrides[get_db] = original
+        app.dependency_overrides[get_async_db] = original
 
 
 @pytest.fixture()
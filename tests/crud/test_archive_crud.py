@@ -0,0 +1,71 @@
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session
+
+from app.crud.archive import crud_archive_dead_links
+from app.crud.link import crud_deactivate_link
+from app.crud.stats import crud_log_click
+from app.models import Link, Click, ClickTotal, ArchivedLink, ArchivedClick
+from tests.fixtures.links import test_links
+
+
+def short_ids(db: Session, model: type[Link] | type[ArchivedLink]) -> set[str]:
+    return set(db.scalars(select(model.short_id)))
+
+
+def test_archive_moves_expired_links_with_their_clicks(db: Session, test_links: list[Link]):
+    expired: Link = test_links[3]
+    expired_id: int = expired.id
+    for _ in range(2):
+        crud_log_click(db, expired.id)
+    crud_log_click(db, test_links[0].id)
+
+    archived: int = crud_archive_dead_links(db, datetime.now(timezone.utc), 10, 100)
+
+    assert archived == 2
+    assert short_ids(db, ArchivedLink) == {"expired0", "expired1"}
+    assert short_ids(db, Link) == {"active0", "active1", "active2", "inactive0", "inactive1"}
+    assert db.scalar(select(ArchivedLink.archived_at)) is not None
+    assert list(db.scalars(select(ArchivedClick.link_id))) == [expired_id, expired_id]
+    assert list(db.scalars(select(Click.link_id))) == [test_links[0].id]
+    assert db.get(ClickTotal, expired_id) is None
+
+
+def test_archive_respects_grace_period(db: Session, test_links: list[Link]):
+    crud_deactivate_link(db, test_links[0])
+    cutoff: datetime = datetime.now(timezone.utc) - timedelta(minutes=1)
+
+    assert crud_archive_dead_links(db, cutoff, 10, 100) == 0
+
+    later: datetime = datetime.now(timezone.utc) + timedelta(seconds=1)
+    assert crud_archive_dead_links(db, later, 10, 100) == 3
+    assert short_ids(db, ArchivedLink) == {"active0", "expired0", "expired1"}
+
+
+def test_archive_is_bounded_by_batch_size(db: Session, test_links: list[Link]):
+    now: datetime = datetime.now(timezone.utc)
+
+    assert crud_archive_dead_links(db, now, 1, 100) == 1
+    assert crud_archive_dead_links(db, now, 1, 100) == 1
+    assert crud_archive_dead_links(db, now, 1, 100) == 0
+
+
+def test_archive_moves_clicks_in_batches(db: Session, test_links: list[Link]):
+    expired_id: int = test_links[3].id
+    for _ in range(5):
+        crud_log_click(db, expired_id)
+    statements: list[str] = []
+
+    @event.listens_for(db.get_bind(), "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    try:
+        assert crud_archive_dead_links(db, datetime.now(timezone.utc), 10, 2) == 2
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", record)
+
+    assert len([statement for statement in statements if statement.startswith("DELETE FROM clicks")]) == 3
+    assert list(db.scalars(select(ArchivedClick.link_id))) == [expired_id] * 5
+    assert db.scalar(select(Click.id).where(Click.link_id == expired_id)) is None
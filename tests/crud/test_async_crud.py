@@ -0,0 +1,195 @@
+import asyncio
+import threading
+from time import time
+from typing import AsyncGenerator
+
+import fakeredis
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.crud.link import link_cache, _note_created, crud_create_link_async, crud_get_link_by_short_id_async, crud_resolve_link_async, \
+    crud_deactivate_link_async, crud_get_user_links_async, crud_get_link_unavailable_reason_async, LinkResolution
+from app.crud.stats import crud_log_click_async, crud_get_stats_for_user_links_async, \
+    crud_get_stats_for_short_ids_async
+from app.crud.user import crud_create_user, crud_authenticate_user_async, crud_get_user_by_username_async
+from app.db.base import Base
+from app.models import Link, User
+from app.services.link_snapshot import LinkSnapshot
+from app.services.shared_cache import SharedCache
+from app.services.short_id_filter import ShortIdFilter
+from app.utils.link_map import LinkMapEntry, iter_link_map
+from tests.fixtures.shared_cache import fake_shared_cache, make_shared_cache, redis_server
+
+
+@pytest.fixture
+async def async_db() -> AsyncGenerator[AsyncSession, None]:
+    engine: AsyncEngine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_authenticate_user_async(async_db: AsyncSession):
+    await async_db.run_sync(crud_create_user, "async_user", "async_pass")
+
+    fetched: User | None = await crud_get_user_by_username_async(async_db, "async_user")
+    assert fetched is not None
+
+    user: User | None = await crud_authenticate_user_async(async_db, "async_user", "async_pass")
+    assert user is not None
+    assert user.id == fetched.id
+
+    assert await crud_authenticate_user_async(async_db, "async_user", "wrong_pass") is None
+    assert await crud_authenticate_user_async(async_db, "missing_user", "async_pass") is None
+
+
+@pytest.mark.anyio
+async def test_link_lifecycle_async(async_db: AsyncSession):
+    user: User = await async_db.run_sync(crud_create_user, "link_owner", "secret")
+
+    link: Link = await crud_create_link_async(async_db, "asynclink", "https://async.example", user.id, 3600, True)
+    assert (await crud_get_link_by_short_id_async(async_db, "asynclink")).id == link.id
+
+    resolution: LinkResolution | None = await crud_resolve_link_async(async_db, "asynclink")
+    assert resolution.id == link.id
+    assert resolution.orig_url == "https://async.example"
+
+    links, total, _ = await crud_get_user_links_async(async_db, user.id)
+    assert total == 1
+    assert links[0].short_id == "asynclink"
+
+    deactivated: Link = await crud_deactivate_link_async(async_db, link)
+    assert deactivated.is_active is False
+    assert await crud_resolve_link_async(async_db, "asynclink") is None
+    assert await crud_get_link_unavailable_reason_async(async_db, "asynclink") == "inactive"
+
+
+@pytest.mark.anyio
+async def test_click_stats_async(async_db: AsyncSession):
+    user: User = await async_db.run_sync(crud_create_user, "stats_owner", "secret")
+    link: Link = await crud_create_link_async(async_db, "statslink", "https://stats.example", user.id, 3600, True)
+
+    for _ in range(3):
+        await crud_log_click_async(async_db, link.id)
+
+    stats: list[tuple[str, str, int, int, int]] = await crud_get_stats_for_user_links_async(async_db, user.id)
+    assert [tuple(row) for row in stats] == [("https://stats.example", "statslink", 3, 3, 3)]
+
+    by_short_id = await crud_get_stats_for_short_ids_async(async_db, ["statslink"], user.id)
+    assert tuple(by_short_id["statslink"]) == (user.id, "https://stats.example", "statslink", 3, 3, 3)
+
+
+@pytest.mark.anyio
+async def test_resolve_link_through_shared_cache(monkeypatch: pytest.MonkeyPatch, async_db: AsyncSession,
+                                                 fake_shared_cache: SharedCache):
+    user: User = await async_db.run_sync(crud_create_user, "shared_owner", "secret")
+    link: Link = await crud_create_link_async(async_db, "sharedlink", "https://shared.example", user.id, 3600, True)
+
+    resolved: LinkResolution = await crud_resolve_link_async(async_db, "sharedlink")
+    assert await fake_shared_cache.get_many("link", ["link:sharedlink"]) == [list(resolved)]
+
+    # A worker with a cold local cache is answered by the shared cache without a query.
+    link_cache.clear()
+
+    async def no_query(*args, **kwargs):
+        raise AssertionError("the database should not be queried")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(async_db, "run_sync", no_query)
+        assert await crud_resolve_link_async(async_db, "sharedlink") == resolved
+
+    def blocking_client():
+        raise AssertionError("invalidations must not use the blocking client on the event loop")
+
+    monkeypatch.setattr(fake_shared_cache, "_sync", blocking_client)
+    await crud_deactivate_link_async(async_db, link)
+    assert await fake_shared_cache.get_many("link", ["link:sharedlink"]) == [None]
+    assert await crud_resolve_link_async(async_db, "sharedlink") is None
+
+
+@pytest.mark.anyio
+async def test_resolve_link_from_snapshot(monkeypatch: pytest.MonkeyPatch, async_db: AsyncSession, db: Session,
+                                          tmp_path):
+    user: User = await async_db.run_sync(crud_create_user, "snapshot_owner", "secret")
+    link: Link = await crud_create_link_async(async_db, "snaplink", "https://snap.example", user.id, 3600, True)
+    entry: LinkMapEntry = LinkMapEntry(id=link.id, short_id="snaplink", orig_url="https://snap.example",
+                                       expire_ts=time() + 3600, redirect_status=301, cache_redirects=False)
+    path: str = str(tmp_path / "links.bin")
+    with open(path, "wb") as f:
+        f.writelines(iter_link_map([entry], time()))
+    snapshot: LinkSnapshot = LinkSnapshot(session_factory=lambda: db, path=path, interval=60.0, delta_interval=1.0,
+                                          overlap_seconds=60.0, max_age_seconds=3600.0)
+    snapshot.reload()
+    monkeypatch.setattr("app.crud.link.link_snapshot", snapshot)
+    link_cache.clear()
+
+    async def no_query(*args, **kwargs):
+        raise AssertionError("the database should not be queried")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(async_db, "run_sync", no_query)
+        assert await crud_resolve_link_async(async_db, "snaplink") == LinkResolution(
+            link.id, "https://snap.example", entry.expire_ts, 301, False
+        )
+
+    await crud_deactivate_link_async(async_db, link)
+    assert await crud_resolve_link_async(async_db, "snaplink") is None
+
+
+@pytest.mark.anyio
+async def test_link_created_by_another_worker_resolves_at_once(monkeypatch: pytest.MonkeyPatch,
+                                                               async_db: AsyncSession,
+                                                               redis_server: fakeredis.FakeServer):
+    user: User = await async_db.run_sync(crud_create_user, "two_workers", "secret")
+    filters: list[ShortIdFilter] = [
+        ShortIdFilter(session_factory=lambda: None, error_rate=0.001, min_capacity=100, refresh_interval=60.0,
+                      refresh_lookback_seconds=5.0)
+        for _ in range(2)
+    ]
+    for short_id_filter in filters:
+        await async_db.run_sync(short_id_filter.load)
+    worker_a, worker_b = make_shared_cache(redis_server), make_shared_cache(redis_server)
+    # Worker B applies announcements only once the test has switched the module state over to it.
+    switched: threading.Event = threading.Event()
+
+    def note_created_in_b(short_ids: str) -> None:
+        switched.wait(timeout=5)
+        _note_created(short_ids)
+
+    worker_b.on_invalidate("created", note_created_in_b, filters[1].mark_stale)
+    worker_b.start()
+    try:
+        for _ in range(100):
+            if worker_b.subscribed:
+                break
+            await asyncio.sleep(0.01)
+        # Subscribing marks the filter stale, its thread would refresh it next.
+        await async_db.run_sync(filters[1].refresh)
+
+        with monkeypatch.context() as patch:
+            patch.setattr("app.crud.link.short_id_filter", filters[0])
+            patch.setattr("app.crud.link.shared_cache", worker_a)
+            await crud_create_link_async(async_db, "fromworkera", "https://a.example", user.id, 3600, True)
+
+        monkeypatch.setattr("app.crud.link.short_id_filter", filters[1])
+        monkeypatch.setattr("app.crud.link.shared_cache", worker_b)
+        assert filters[1].might_exist("fromworkera") is False
+        switched.set()
+        for _ in range(100):
+            if filters[1].might_exist("fromworkera"):
+                break
+            await asyncio.sleep(0.01)
+
+        link_cache.clear()
+        assert await crud_resolve_link_async(async_db, "fromworkera") is not None
+        # Creates are announced, so a miss in B's filter is trusted without a query.
+        with monkeypatch.context() as patch:
+            patch.setattr(async_db, "run_sync", None)
+            assert await crud_resolve_link_async(async_db, "neverexisted") is None
+    finally:
+        worker_b.stop()
@@ -1,12 +1,18 @@
 from datetime import datetime, timezone, timedelta, tzinfo
+from time import time
 
 import pytest
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.crud.link import crud_get_link_by_short_id, crud_create_link, crud_get_user_links, crud_deactivate_link
-from app.exceptions import LinkCreateError, LinkUpdateError
+from app.core.config import settings
+from app.crud.link import crud_get_link_by_short_id, crud_create_link, crud_get_user_links, crud_deactivate_link, \
+    crud_resolve_link, link_cache, negative_link_cache, LinkResolution, crud_get_link_resolution, \
+    crud_get_link_unavailable_reason, crud_bulk_create_links, crud_create_generated_link, \
+    crud_bulk_create_generated_links
+from app.exceptions import LinkCreateError, LinkUpdateError, ShortIdGenerationError
 from app.models import Link, User
+from app.services.short_id_filter import short_id_filter
 from tests.fixtures.links import test_links
 
 
@@ -86,7 +92,7 @@ def test_create_link_raises_link_create_error_on_integrity_error(monkeypatch: py
 
 
 def test_get_user_links_default_filters(db: Session, test_user: User, test_links: list[Link]):
-    results, total = crud_get_user_links(db=db, user_id=test_user.id, is_valid=True, is_active=True)
+    results, total, _ = crud_get_user_links(db=db, user_id=test_user.id, is_valid=True, is_active=True)
 
     assert total == 3
     assert len(results) == 3
@@ -97,7 +103,7 @@ def test_get_user_links_default_filters(db: Session, test_user: User, test_links
 
 
 def test_get_user_links_expired(db: Session, test_user: User, test_links: list[Link]):
-    results, total = crud_get_user_links(db=db, user_id=test_user.id, is_valid=False, is_active=True)
+    results, total, _ = crud_get_user_links(db=db, user_id=test_user.id, is_valid=False, is_active=True)
 
     assert total == 2
     assert len(results) == 2
@@ -108,7 +114,7 @@ def test_get_user_links_expired(db: Session, test_user: User, test_links: list[L
 
 
 def test_get_user_links_inactive(db: Session, test_user: User, test_links: list[Link]):
-    results, total = crud_get_user_links(db=db, user_id=test_user.id, is_valid=True, is_active=False)
+    results, total, _ = crud_get_user_links(db=db, user_id=test_user.id, is_valid=True, is_active=False)
 
     assert total == 2
     assert len(results) == 2
@@ -119,7 +125,7 @@ def test_get_user_links_inactive(db: Session, test_user: User, test_links: list[
 
 
 def test_get_user_links_pagination(db: Session, test_user: User, test_links: list[Link]):
-    results, total = crud_get_user_links(db=db, user_id=test_user.id, is_valid=True, is_active=True, limit=2, offset=1)
+    results, total, _ = crud_get_user_links(db=db, user_id=test_user.id, is_valid=True, is_active=True, limit=2, offset=1)
 
     assert total == 3
     assert len(results) == 2
@@ -129,6 +135,39 @@ def test_get_user_links_pagination(db: Session, test_user: User, test_links: lis
         assert link.expire_at.replace(tzinfo=timezone.utc) >= datetime.now(timezone.utc)
 
 
+def test_get_user_links_keyset_pages_match_offset_pages(db: Session, test_user: User, test_links: list[Link]):
+    expected, _, _ = crud_get_user_links(db=db, user_id=test_user.id, is_valid=None, is_active=None, limit=100)
+
+    collected: list[Link] = []
+    after: tuple[datetime, int] | None = None
+    while True:
+        page, total, has_more = crud_get_user_links(db=db, user_id=test_user.id, is_valid=None, is_active=None,
+                                                    limit=3, after=after, with_total=False)
+        assert total is None
+        collected += page
+        if not has_more:
+            break
+        after = (page[-1].created_at, page[-1].id)
+
+    assert [link.id for link in collected] == [link.id for link in expected]
+    assert len(collected) == len(test_links)
+
+
+def test_get_user_links_keyset_breaks_created_at_ties_by_id(db: Session, test_user: User):
+    created_at: datetime = datetime.now(timezone.utc)
+    for i in range(3):
+        db.add(Link(short_id=f"tie{i}", orig_url="https://example.com", user_id=test_user.id, created_at=created_at,
+                    expire_at=created_at + timedelta(days=1), is_active=True))
+    db.commit()
+
+    first, _, has_more = crud_get_user_links(db=db, user_id=test_user.id, limit=2)
+    assert has_more is True
+    rest, _, has_more = crud_get_user_links(db=db, user_id=test_user.id, limit=2,
+                                            after=(created_at, first[-1].id))
+    assert has_more is False
+    assert sorted(link.short_id for link in first + rest) == ["tie0", "tie1", "tie2"]
+
+
 def test_create_link_and_deactivate_and_update(db: Session, test_user: User):
     link: Link = crud_create_link(
         db=db,
@@ -170,3 +209,226 @@ def test_deactivate_link_raises_on_integrity_error(monkeypatch: pytest.MonkeyPat
         crud_deactivate_link(db, link)
 
     assert "Error while deactivating a link" in str(exc_info.value)
+
+
+def test_resolve_link_returns_none_if_not_exists(db: Session):
+    assert crud_resolve_link(db, short_id="nonexistentlink") is None
+    assert link_cache.get("nonexistentlink") is None
+
+
+def test_resolve_link_caches_resolution(monkeypatch: pytest.MonkeyPatch, db: Session, test_links: list[Link]):
+    link: Link = test_links[0]
+    resolution: LinkResolution | None = crud_resolve_link(db, link.short_id)
+
+    assert resolution is not None
+    assert resolution.id == link.id
+    assert resolution.orig_url == link.orig_url
+    assert resolution.expire_ts == pytest.approx(link.expire_at.replace(tzinfo=timezone.utc).timestamp())
+
+    def fail_lookup(_db: Session, _short_id: str):
+        raise AssertionError("cached resolution must not hit the database")
+
+    monkeypatch.setattr("app.crud.link.crud_get_link_resolution", fail_lookup)
+    assert crud_resolve_link(db, link.short_id) == resolution
+
+
+def test_deactivate_link_invalidates_cached_resolution(db: Session, test_links: list[Link]):
+    link: Link = test_links[0]
+    assert crud_resolve_link(db, link.short_id) is not None
+
+    crud_deactivate_link(db, link)
+    assert link_cache.get(link.short_id) is None
+    assert crud_resolve_link(db, link.short_id) is None
+    assert crud_get_link_unavailable_reason(db, link.short_id) == "inactive"
+
+
+def test_create_link_invalidates_cached_resolution(db: Session, test_user: User):
+    stale: LinkResolution = LinkResolution(id=-1, orig_url="https://stale.com", expire_ts=time() + 60)
+    link_cache.set("recreated", stale)
+
+    link: Link = crud_create_link(db, "recreated", "https://fresh.com", test_user.id, 60, True)
+    resolution: LinkResolution | None = crud_resolve_link(db, "recreated")
+    assert resolution.id == link.id
+    assert resolution.orig_url == "https://fresh.com"
+
+
+def test_get_link_resolution_projects_columns_without_loading_entities(db: Session, test_links: list[Link]):
+    link: Link = test_links[0]
+    expected: tuple = (link.id, link.orig_url, link.expire_at.replace(tzinfo=timezone.utc).timestamp(), 302, False)
+    short_id: str = link.short_id
+    db.expunge_all()
+
+    resolution: LinkResolution | None = crud_get_link_resolution(db, short_id)
+
+    assert resolution == expected
+    assert isinstance(resolution, LinkResolution)
+    assert len(db.identity_map) == 0
+    assert crud_get_link_resolution(db, "missing") is None
+
+
+@pytest.mark.parametrize(
+    "short_id, reason",
+    [
+        ("expired0", "expired"),
+        ("inactive0", "inactive"),
+        ("missing", "not_found"),
+    ]
+)
+def test_resolve_link_only_returns_live_links(db: Session, test_links: list[Link], short_id: str, reason: str):
+    assert crud_get_link_resolution(db, short_id) is None
+    assert crud_resolve_link(db, short_id) is None
+    assert negative_link_cache.get(short_id) == reason
+    assert crud_get_link_unavailable_reason(db, short_id) == reason
+
+
+def test_resolve_link_drops_cached_resolution_once_expired(db: Session):
+    link_cache.set("lapsed", LinkResolution(id=1, orig_url="https://lapsed.com", expire_ts=time() - 1))
+
+    assert crud_resolve_link(db, "lapsed") is None
+    assert link_cache.get("lapsed") is None
+    assert crud_get_link_unavailable_reason(db, "lapsed") == "expired"
+
+
+def test_resolve_link_caches_missing_short_id(monkeypatch: pytest.MonkeyPatch, db: Session):
+    assert crud_resolve_link(db, "missing") is None
+    assert negative_link_cache.get("missing") == "not_found"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a cached miss must not hit the database")
+
+    monkeypatch.setattr("app.crud.link.crud_get_link_resolution", fail)
+    assert crud_resolve_link(db, "missing") is None
+
+
+def test_resolve_link_skips_database_for_ids_outside_the_filter(monkeypatch: pytest.MonkeyPatch, db: Session,
+                                                                test_links: list[Link]):
+    short_id_filter.load(db)
+    monkeypatch.setattr(short_id_filter, "refresh_interval", 60.0)
+    monkeypatch.setattr(settings, "SHORT_ID_FILTER_SINGLE_WORKER", True)
+    looked_up: list[str] = []
+    original = crud_get_link_resolution
+
+    def counting_lookup(db: Session, short_id: str) -> LinkResolution | None:
+        looked_up.append(short_id)
+        return original(db, short_id)
+
+    monkeypatch.setattr("app.crud.link.crud_get_link_resolution", counting_lookup)
+
+    assert crud_resolve_link(db, "doesnotexist") is None
+    assert crud_resolve_link(db, test_links[0].short_id) is not None
+    assert looked_up == [test_links[0].short_id]
+
+
+def test_resolve_link_goes_to_database_instead_of_refreshing_the_filter(monkeypatch: pytest.MonkeyPatch, db: Session,
+                                                                       test_links: list[Link]):
+    short_id_filter.load(db)
+    db.add(Link(short_id="elsewhere", orig_url="https://elsewhere.example", user_id=test_links[1].user_id,
+                created_at=test_links[1].created_at, expire_at=test_links[1].expire_at))
+    db.commit()
+    monkeypatch.setattr(short_id_filter, "refresh_interval", 0.0)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the filter is refreshed by its thread, not by a redirect")
+
+    monkeypatch.setattr(short_id_filter, "refresh", fail)
+    monkeypatch.setattr(short_id_filter, "load", fail)
+    assert short_id_filter.might_exist("elsewhere") is False
+    assert crud_resolve_link(db, "elsewhere") is not None
+
+
+def test_resolve_link_does_not_trust_filter_misses_with_several_workers(monkeypatch: pytest.MonkeyPatch,
+                                                                       db: Session, test_links: list[Link]):
+    short_id_filter.load(db)
+    monkeypatch.setattr(short_id_filter, "refresh_interval", 60.0)
+    # Created by another worker after this one loaded its filter.
+    db.add(Link(short_id="elsewhere", orig_url="https://elsewhere.example", user_id=test_links[0].user_id,
+                created_at=test_links[0].created_at, expire_at=test_links[0].expire_at))
+    db.commit()
+
+    assert short_id_filter.might_exist("elsewhere") is False
+    assert crud_resolve_link(db, "elsewhere") is not None
+
+
+def test_create_link_clears_negative_cache_and_updates_filter(db: Session, test_user: User):
+    short_id_filter.load(db)
+    assert crud_resolve_link(db, "latecomer") is None
+    negative_link_cache.set("latecomer", "not_found")
+
+    crud_create_link(db, "latecomer", "https://late.example", test_user.id, 60, True)
+
+    assert short_id_filter.might_exist("latecomer") is True
+    assert crud_resolve_link(db, "latecomer") is not None
+
+
+def test_bulk_create_links_returns_links_in_input_order(db: Session, test_user: User):
+    links: list[Link] = crud_bulk_create_links(
+        db,
+        test_user.id,
+        [("bulk1", "https://example.com/1", 60), ("bulk2", "https://example.com/2", 3600)]
+    )
+
+    assert [link.short_id for link in links] == ["bulk1", "bulk2"]
+    assert all(isinstance(link.id, int) for link in links)
+    assert links[1].expire_at - links[0].expire_at == timedelta(seconds=3540)
+    assert db.query(Link).filter(Link.short_id.in_(["bulk1", "bulk2"])).count() == 2
+
+
+def test_bulk_create_links_raises_on_duplicate_short_id(db: Session, test_user: User, test_links: list[Link]):
+    with pytest.raises(LinkCreateError):
+        crud_bulk_create_links(
+            db,
+            test_user.id,
+            [("fresh", "https://example.com/1", 60), (test_links[0].short_id, "https://example.com/2", 60)]
+        )
+
+    assert crud_get_link_by_short_id(db, "fresh") is None
+
+
+class FixedShortIds:
+    def __init__(self, *batches: list[str]) -> None:
+        self.batches: list[list[str]] = list(batches)
+
+    def generate(self, db: Session, count: int = 1) -> list[str]:
+        return self.batches.pop(0)
+
+
+def fail_for_short_ids(original, taken: set[str], short_ids_arg):
+    def wrapper(*args, **kwargs):
+        if taken & set(short_ids_arg(*args)):
+            raise LinkCreateError("duplicate short id")
+        return original(*args, **kwargs)
+
+    return wrapper
+
+
+def test_create_generated_link_retries_on_collision(monkeypatch: pytest.MonkeyPatch, db: Session, test_user: User):
+    monkeypatch.setattr("app.crud.link.short_id_generator", FixedShortIds(["taken"], ["unique1"]))
+    monkeypatch.setattr("app.crud.link.crud_create_link",
+                        fail_for_short_ids(crud_create_link, {"taken"}, lambda db, short_id, *rest: [short_id]))
+
+    link: Link = crud_create_generated_link(db, "https://example.com", test_user.id, 60, True)
+    assert link.short_id == "unique1"
+
+
+def test_create_generated_link_gives_up_after_max_attempts(monkeypatch: pytest.MonkeyPatch, db: Session,
+                                                           test_user: User):
+    monkeypatch.setattr("app.crud.link.settings.SHORT_ID_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr("app.crud.link.short_id_generator", FixedShortIds(["taken"], ["taken"]))
+    monkeypatch.setattr("app.crud.link.crud_create_link",
+                        fail_for_short_ids(crud_create_link, {"taken"}, lambda db, short_id, *rest: [short_id]))
+
+    with pytest.raises(ShortIdGenerationError):
+        crud_create_generated_link(db, "https://example.com", test_user.id, 60, True)
+
+
+def test_bulk_create_generated_links_retries_chunk_on_collision(monkeypatch: pytest.MonkeyPatch, db: Session,
+                                                                test_user: User):
+    monkeypatch.setattr("app.crud.link.short_id_generator", FixedShortIds(["new1", "taken"], ["new1", "new2"]))
+    monkeypatch.setattr("app.crud.link.crud_bulk_create_links", fail_for_short_ids(
+        crud_bulk_create_links, {"taken"}, lambda db, user_id, links, *rest: [link[0] for link in links]
+    ))
+
+    links: list[Link] = crud_bulk_create_generated_links(
+        db, test_user.id, [("https://example.com/1", 60), ("https://example.com/2", 60)]
+    )
+    assert [link.short_id for link in links] == ["new1", "new2"]
@@ -3,9 +3,11 @@ from datetime import datetime, timezone, timedelta
 import pytest
 from sqlalchemy.orm import Session
 
-from app.crud.stats import crud_log_click, crud_get_stats_for_user_links, crud_get_stats_for_single_link
+from app.crud.stats import crud_log_click, crud_bulk_log_clicks, crud_get_stats_for_user_links, \
+    crud_get_stats_for_short_ids, crud_add_click_counts, crud_prune_minute_rollups, \
+    hour_bucket, minute_bucket, LinkStats
 from app.exceptions import ClickLogError
-from app.models import Link, Click, User
+from app.models import Link, Click, User, ClickRollup, ClickMinuteRollup, ClickTotal
 from tests.fixtures.links import test_links
 
 
@@ -27,12 +29,33 @@ def test_crud_log_click_integrity_error(db: Session):
     assert db.query(Click).filter(Click.link_id == 9999).count() == 0
 
 
-def insert_clicks(db: Session, link: Link, times: list[datetime]) -> None:
-    for t in times:
-        click: Click = Click(link_id=link.id, clicked_at=t)
-        db.add(click)
+def test_crud_bulk_log_clicks_success(db: Session, test_links: list[Link]):
+    link1, link2 = test_links[0], test_links[1]
+    now: datetime = datetime.now(timezone.utc)
 
-    db.commit()
+    crud_bulk_log_clicks(db, [(link1.id, now), (link2.id, now), (link1.id, now - timedelta(minutes=1))])
+
+    assert db.query(Click).filter(Click.link_id == link1.id).count() == 2
+    assert db.query(Click).filter(Click.link_id == link2.id).count() == 1
+
+
+def test_crud_bulk_log_clicks_skips_missing_links(db: Session, test_links: list[Link]):
+    link: Link = test_links[0]
+    now: datetime = datetime.now(timezone.utc)
+
+    crud_bulk_log_clicks(db, [(link.id, now), (9999, now)])
+
+    assert db.query(Click).filter(Click.link_id == link.id).count() == 1
+    assert db.query(Click).filter(Click.link_id == 9999).count() == 0
+
+
+def test_crud_bulk_log_clicks_empty(db: Session):
+    crud_bulk_log_clicks(db, [])
+    assert db.query(Click).count() == 0
+
+
+def insert_clicks(db: Session, link: Link, times: list[datetime]) -> None:
+    crud_bulk_log_clicks(db, [(link.id, t) for t in times])
 
 
 def test_crud_get_stats_for_user_links_sorting(db: Session, test_user: User, test_links: list[Link]):
@@ -100,7 +123,11 @@ def test_crud_get_stats_for_user_links_empty(db: Session, test_user: User):
     assert stats_empty == []
 
 
-def test_crud_get_stats_for_single_link(db: Session, test_user: User, test_links: list[Link]):
+def link_stats(db: Session, link: Link) -> LinkStats | None:
+    return crud_get_stats_for_short_ids(db, [link.short_id], link.user_id).get(link.short_id)
+
+
+def test_crud_get_stats_for_one_link(db: Session, test_user: User, test_links: list[Link]):
     link: Link = test_links[0]
     now: datetime = datetime.now(timezone.utc)
 
@@ -112,8 +139,7 @@ def test_crud_get_stats_for_single_link(db: Session, test_user: User, test_links
     ]
     insert_clicks(db, link, times)
 
-    stats: tuple[str, str, int, int, int] = crud_get_stats_for_single_link(db=db, link=link)
-    orig_url, short_id, cnt_hour, cnt_day, cnt_all = stats
+    _, orig_url, short_id, cnt_hour, cnt_day, cnt_all = link_stats(db, link)
 
     assert orig_url == link.orig_url
     assert short_id == link.short_id
@@ -122,5 +148,108 @@ def test_crud_get_stats_for_single_link(db: Session, test_user: User, test_links
     assert cnt_all == 4
 
     fake_link: Link = Link(user_id=test_user.id, orig_url="x", short_id="nonexistent")
-    result_none = crud_get_stats_for_single_link(db, link=fake_link)
-    assert result_none is None
\ No newline at end of file
+    assert link_stats(db, fake_link) is None
+
+
+def test_crud_get_stats_for_short_ids(db: Session, test_user: User, test_links: list[Link]):
+    now: datetime = datetime.now(timezone.utc)
+    insert_clicks(db, test_links[0], [now - timedelta(minutes=5), now - timedelta(hours=3)])
+    insert_clicks(db, test_links[1], [now - timedelta(days=3)])
+
+    stats: dict[str, LinkStats] = crud_get_stats_for_short_ids(
+        db, [test_links[0].short_id, test_links[1].short_id, "nonexistent"], test_user.id
+    )
+
+    assert stats == {
+        test_links[0].short_id: LinkStats(test_user.id, test_links[0].orig_url, test_links[0].short_id, 1, 2, 2),
+        test_links[1].short_id: LinkStats(test_user.id, test_links[1].orig_url, test_links[1].short_id, 0, 0, 1),
+    }
+    assert crud_get_stats_for_short_ids(db, [], test_user.id) == {}
+
+
+def test_crud_log_click_updates_rollups(db: Session, test_links: list[Link]):
+    link: Link = test_links[0]
+    crud_log_click(db, link.id)
+    crud_log_click(db, link.id)
+
+    rollups: list[ClickRollup] = db.query(ClickRollup).filter(ClickRollup.link_id == link.id).all()
+    assert sum(rollup.clicks for rollup in rollups) == 2
+    assert db.query(ClickTotal).filter(ClickTotal.link_id == link.id).one().clicks == 2
+
+
+def test_crud_bulk_log_clicks_aggregates_rollups_by_hour(db: Session, test_links: list[Link]):
+    link: Link = test_links[0]
+    bucket: datetime = hour_bucket(datetime.now(timezone.utc)) - timedelta(hours=5)
+    times: list[datetime] = [
+        bucket + timedelta(minutes=1),
+        bucket + timedelta(minutes=59),
+        bucket + timedelta(hours=1, minutes=1),
+    ]
+    insert_clicks(db, link, times)
+    insert_clicks(db, link, [bucket + timedelta(minutes=30)])
+
+    rollups: dict[datetime, int] = {
+        hour_bucket(rollup.bucket_start): rollup.clicks
+        for rollup in db.query(ClickRollup).filter(ClickRollup.link_id == link.id).all()
+    }
+    assert rollups == {bucket: 3, bucket + timedelta(hours=1): 1}
+    assert db.query(ClickTotal).filter(ClickTotal.link_id == link.id).one().clicks == 4
+
+
+def test_crud_get_stats_window_edges_are_exact(db: Session, test_links: list[Link]):
+    link: Link = test_links[0]
+    now: datetime = datetime.now(timezone.utc)
+    times: list[datetime] = [
+        now - timedelta(minutes=59),
+        now - timedelta(minutes=61),
+        now - timedelta(days=1) + timedelta(minutes=1),
+        now - timedelta(days=1) - timedelta(minutes=1),
+    ]
+    insert_clicks(db, link, times)
+
+    _, _, _, cnt_hour, cnt_day, cnt_all = link_stats(db, link)
+    assert cnt_hour == 1
+    assert cnt_day == 3
+    assert cnt_all == 4
+
+
+def test_crud_get_stats_all_time_does_not_scan_raw_clicks(db: Session, test_links: list[Link]):
+    link: Link = test_links[0]
+    now: datetime = datetime.now(timezone.utc)
+    insert_clicks(db, link, [now - timedelta(days=30), now - timedelta(days=10), now - timedelta(minutes=5)])
+
+    db.query(Click).filter(Click.clicked_at < now - timedelta(days=2)).delete()
+    db.commit()
+
+    _, _, _, cnt_hour, cnt_day, cnt_all = link_stats(db, link)
+    assert (cnt_hour, cnt_day, cnt_all) == (1, 1, 3)
+
+
+def test_crud_add_click_counts(db: Session, test_user: User, test_links: list[Link]):
+    link: Link = test_links[0]
+    now: datetime = datetime.now(timezone.utc)
+    recent: datetime = minute_bucket(now - timedelta(minutes=30))
+    older: datetime = minute_bucket(now - timedelta(minutes=90))
+
+    written: int = crud_add_click_counts(db, {(link.id, recent): 3, (link.id, older): 2, (10_000, recent): 5})
+    assert written == 5
+    crud_add_click_counts(db, {(link.id, recent + timedelta(seconds=20)): 1})
+
+    minutes: dict[datetime, int] = {
+        minute_bucket(rollup.bucket_start): rollup.clicks
+        for rollup in db.query(ClickMinuteRollup).filter(ClickMinuteRollup.link_id == link.id)
+    }
+    assert minutes == {recent: 4, older: 2}
+    assert db.query(ClickTotal).filter(ClickTotal.link_id == link.id).one().clicks == 6
+    assert db.query(Click).count() == 0
+
+    stats: LinkStats = crud_get_stats_for_short_ids(db, [link.short_id], test_user.id)[link.short_id]
+    assert (stats.last_hour_clicks, stats.last_day_clicks, stats.all_clicks) == (4, 6, 6)
+
+
+def test_crud_prune_minute_rollups(db: Session, test_links: list[Link]):
+    now: datetime = minute_bucket(datetime.now(timezone.utc))
+    crud_add_click_counts(db, {(test_links[0].id, now - timedelta(days=3)): 1, (test_links[0].id, now): 1})
+
+    assert crud_prune_minute_rollups(db, now - timedelta(days=2)) == 1
+    assert db.query(ClickMinuteRollup).count() == 1
@@ -2,7 +2,7 @@ import pytest
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.crud.user import crud_get_user_by_username, crud_create_user, crud_authenticate_user
+from app.crud.user import crud_get_user_by_username, crud_create_user, crud_authenticate_user, credential_cache
 from app.exceptions import UserAlreadyExistsError, UserCreateError
 from app.models import User
 
@@ -95,3 +95,69 @@ def test_authenticate_user_with_real_hash(
 def test_authenticate_user_returns_none_if_user_not_found(db: Session):
     result = crud_authenticate_user(db, username="doesnotexist", plain_password="any")
     assert result is None
+
+
+@pytest.fixture()
+def counted_verify(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+
+    def fake_verify(plain_password: str, hashed_password: str) -> bool:
+        calls.append(plain_password)
+        return hashed_password == f"hash:{plain_password}"
+
+    monkeypatch.setattr("app.crud.user.verify_password", fake_verify)
+    return calls
+
+
+def make_user(db: Session, username: str, password: str) -> User:
+    user: User = User(username=username, password_hash=f"hash:{password}", is_active=True)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def test_authenticate_user_caches_successful_verification(db: Session, counted_verify: list[str]):
+    make_user(db, "erin", "secret")
+
+    assert crud_authenticate_user(db, "erin", "secret") is not None
+    assert crud_authenticate_user(db, "erin", "secret") is not None
+
+    assert counted_verify == ["secret"]
+    assert len(credential_cache) == 1
+
+
+def test_authenticate_user_does_not_cache_failed_verification(db: Session, counted_verify: list[str]):
+    make_user(db, "frank", "secret")
+
+    assert crud_authenticate_user(db, "frank", "wrong") is None
+    assert crud_authenticate_user(db, "frank", "wrong") is None
+
+    assert counted_verify == ["wrong", "wrong"]
+    assert len(credential_cache) == 0
+
+
+def test_authenticate_user_cache_invalidated_by_password_change(db: Session, counted_verify: list[str]):
+    user: User = make_user(db, "grace", "old")
+    assert crud_authenticate_user(db, "grace", "old") is not None
+
+    user.password_hash = "hash:new"
+    db.commit()
+
+    assert crud_authenticate_user(db, "grace", "old") is None
+    assert crud_authenticate_user(db, "grace", "new") is not None
+    assert counted_verify == ["old", "old", "new"]
+
+
+def test_authenticate_user_cache_invalidated_by_deactivation(db: Session, counted_verify: list[str]):
+    user: User = make_user(db, "heidi", "secret")
+    assert crud_authenticate_user(db, "heidi", "secret") is not None
+    assert len(credential_cache) == 1
+
+    user.is_active = False
+    db.commit()
+
+    result: User | None = crud_authenticate_user(db, "heidi", "secret")
+    assert result is not None and result.is_active is False
+    assert counted_verify == ["secret", "secret"]
+    assert len(credential_cache) == 0
@@ -0,0 +1,105 @@
+from typing import Generator
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine, select, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.link import crud_get_link_by_short_id, crud_get_user_links, crud_create_link
+from app.db.base import Base
+from app.db.routing import RoutingSession, replica_reads, note_write, recent_writers, share_write, load_shared_write
+from app.models import Link, User
+from tests.fixtures.shared_cache import make_shared_cache, redis_server
+
+
+def make_engine(path) -> Engine:
+    engine: Engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(id=1, username="owner", password_hash="hash"))
+        session.add(Link(id=1, short_id="shared", orig_url=f"https://{path.stem}.example", user_id=1))
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def engines(tmp_path) -> tuple[Engine, Engine]:
+    return make_engine(tmp_path / "primary.db"), make_engine(tmp_path / "replica.db")
+
+
+@pytest.fixture
+def routed_db(engines: tuple[Engine, Engine]) -> Generator[Session, None, None]:
+    primary, replica = engines
+    session: Session = RoutingSession(bind=primary, info={"replicas": [replica]})
+    yield session
+    session.close()
+
+
+def test_reads_go_to_the_replica_only_inside_replica_reads(routed_db: Session):
+    with replica_reads(routed_db) as on_replica:
+        assert on_replica is True
+        assert routed_db.scalar(select(Link.orig_url)) == "https://replica.example"
+        assert routed_db.scalar(select(Link.orig_url).with_for_update()) == "https://primary.example"
+
+    assert routed_db.scalar(select(Link.orig_url)) == "https://primary.example"
+
+
+def test_replica_reads_is_a_no_op_without_replicas(db: Session):
+    with replica_reads(db) as on_replica:
+        assert on_replica is False
+
+
+def test_link_lookup_falls_back_to_the_primary_on_a_replica_miss(routed_db: Session):
+    assert crud_get_link_by_short_id(routed_db, "shared").orig_url == "https://replica.example"
+
+    crud_create_link(routed_db, "fresh", "https://fresh.example", 1, 60, True)
+
+    assert crud_get_link_by_short_id(routed_db, "fresh").orig_url == "https://fresh.example"
+
+
+def test_users_read_from_the_primary_after_writing(routed_db: Session, engines: tuple[Engine, Engine]):
+    links, total, _ = crud_get_user_links(routed_db, 1, is_valid=None)
+    assert total == 1
+
+    crud_create_link(routed_db, "fresh", "https://fresh.example", 1, 60, True)
+    assert recent_writers.get(1) is True
+
+    links, total, _ = crud_get_user_links(routed_db, 1, is_valid=None)
+    assert total == 2
+    assert {link.short_id for link in links} == {"shared", "fresh"}
+    with replica_reads(routed_db, 1) as on_replica:
+        assert on_replica is False
+
+    note_write(2)
+    with replica_reads(routed_db, 2) as on_replica:
+        assert on_replica is False
+
+
+def test_user_links_fall_back_to_the_primary_when_the_replica_has_none(routed_db: Session,
+                                                                       engines: tuple[Engine, Engine]):
+    with Session(engines[0]) as session:
+        session.add(User(id=2, username="newcomer", password_hash="hash"))
+        session.add(Link(id=2, short_id="first", orig_url="https://first.example", user_id=2))
+        session.commit()
+
+    links, total, _ = crud_get_user_links(routed_db, 2, is_valid=None)
+
+    assert [link.short_id for link in links] == ["first"]
+    assert total == 1
+
+
+@pytest.mark.anyio
+async def test_write_marker_is_shared_between_workers(monkeypatch: pytest.MonkeyPatch,
+                                                      redis_server: fakeredis.FakeServer):
+    monkeypatch.setattr(settings, "POSTGRES_REPLICA_HOSTS", ["replica"])
+    monkeypatch.setattr("app.db.routing.shared_cache", make_shared_cache(redis_server))
+
+    await share_write(1)
+    # Another worker has not seen the write itself.
+    recent_writers.clear()
+    await load_shared_write(2)
+    assert recent_writers.get(2) is None
+
+    await load_shared_write(1)
+    assert recent_writers.get(1) is True
@@ -0,0 +1,123 @@
+import pytest
+from prometheus_client.core import Metric
+from sqlalchemy import create_engine, text, Engine
+from sqlalchemy.pool import QueuePool
+
+from app.api.deps import LazyAsyncSession
+from app.core.config import settings
+from app.core.metrics import PoolStatsCollector
+from app.db.session import pool_options, sync_connect_args, async_connect_args, install_idle_pre_ping
+
+
+def test_pool_options_follow_settings(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(settings, "DB_POOL_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", "idle")
+
+    options: dict = pool_options()
+
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_pre_ping"] is False
+
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", "always")
+    assert pool_options()["pool_pre_ping"] is True
+
+
+def test_connect_args_set_statement_timeout_and_pgbouncer_mode(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", None)
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", False)
+    assert sync_connect_args() == {}
+    assert async_connect_args() == {}
+
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 2000)
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    assert sync_connect_args() == {"options": "-c statement_timeout=2000"}
+
+    connect_args: dict = async_connect_args()
+    assert connect_args["server_settings"] == {"statement_timeout": "2000"}
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["prepared_statement_name_func"]() != connect_args["prepared_statement_name_func"]()
+
+
+def make_engine(tmp_path) -> Engine:
+    return create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1)
+
+
+def test_idle_pre_ping_replaces_connections_that_fail_the_ping(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    engine: Engine = make_engine(tmp_path)
+    install_idle_pre_ping(engine, 0)
+    pings: list[object] = []
+
+    def failing_ping(dbapi_connection) -> bool:
+        pings.append(dbapi_connection)
+        raise engine.dialect.dbapi.OperationalError("server closed the connection")
+
+    with engine.connect() as connection:
+        first = connection.connection.dbapi_connection
+
+    monkeypatch.setattr(engine.dialect, "do_ping", failing_ping)
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+        assert connection.connection.dbapi_connection is not first
+    assert pings == [first]
+
+
+def test_idle_pre_ping_skips_recently_used_connections(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    engine: Engine = make_engine(tmp_path)
+    install_idle_pre_ping(engine, 60)
+
+    def fail(dbapi_connection) -> bool:
+        raise AssertionError("a recently used connection must not be pinged")
+
+    monkeypatch.setattr(engine.dialect, "do_ping", fail)
+    for _ in range(2):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+
+def test_pool_stats_collector_reports_connections(tmp_path):
+    engine: Engine = make_engine(tmp_path)
+    collector: PoolStatsCollector = PoolStatsCollector(lambda: {"test": engine.pool})
+
+    with engine.connect():
+        metrics: dict[str, Metric] = {metric.name: metric for metric in collector.collect()}
+
+    assert [sample.value for sample in metrics["db_pool_size"].samples] == [1]
+    assert {sample.labels["state"]: sample.value for sample in metrics["db_pool_connections"].samples} == {
+        "checked_out": 1, "idle": 0
+    }
+    assert [sample.value for sample in metrics["db_pool_overflow"].samples] == [0]
+
+
+class FakeAsyncSession:
+    def __init__(self) -> None:
+        self.closed: bool = False
+
+    async def run_sync(self, fn, *args):
+        return fn(self, *args)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.anyio
+async def test_lazy_async_session_is_created_on_first_use():
+    created: list[FakeAsyncSession] = []
+
+    def factory() -> FakeAsyncSession:
+        created.append(FakeAsyncSession())
+        return created[-1]
+
+    unused: LazyAsyncSession = LazyAsyncSession(factory)
+    await unused.rollback()
+    await unused.close()
+    assert not unused.started
+    assert created == []
+
+    used: LazyAsyncSession = LazyAsyncSession(factory)
+    assert await used.run_sync(lambda session, value: value, 42) == 42
+    await used.close()
+    assert used.started
+    assert len(created) == 1 and created[0].closed
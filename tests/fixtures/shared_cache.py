@@ -0,0 +1,29 @@
+import fakeredis
+import pytest
+
+from app.crud.link import link_cache, _forget_link, _note_created
+from app.services.shared_cache import SharedCache
+from app.services.short_id_filter import short_id_filter
+
+
+def make_shared_cache(server: fakeredis.FakeServer) -> SharedCache:
+    return SharedCache(
+        client_factory=lambda: fakeredis.FakeAsyncRedis(server=server),
+        sync_client_factory=lambda: fakeredis.FakeRedis(server=server),
+        prefix="test:",
+        retry_seconds=60.0
+    )
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def fake_shared_cache(monkeypatch: pytest.MonkeyPatch, redis_server: fakeredis.FakeServer) -> SharedCache:
+    shared: SharedCache = make_shared_cache(redis_server)
+    shared.on_invalidate("link", _forget_link, link_cache.clear)
+    shared.on_invalidate("created", _note_created, short_id_filter.mark_stale)
+    monkeypatch.setattr("app.crud.link.shared_cache", shared)
+    return shared
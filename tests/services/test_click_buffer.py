@@ -0,0 +1,129 @@
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy.orm import Session
+
+from app.models import Click, Link
+from app.services.click_buffer import ClickBuffer
+from tests.fixtures.links import test_links
+
+
+def make_buffer(db: Session, max_size: int = 10, batch_size: int = 3, flush_interval: float = 0.05) -> ClickBuffer:
+    return ClickBuffer(
+        session_factory=lambda: db,
+        max_size=max_size,
+        batch_size=batch_size,
+        flush_interval=flush_interval
+    )
+
+
+def test_put_is_rejected_when_not_running(db: Session, test_links: list[Link]):
+    buffer: ClickBuffer = make_buffer(db)
+    assert buffer.put(test_links[0].id) is False
+
+
+def test_put_is_rejected_when_full(db: Session, test_links: list[Link]):
+    buffer: ClickBuffer = make_buffer(db, max_size=2)
+    buffer._thread = object()
+
+    assert buffer.put(test_links[0].id) is True
+    assert buffer.put(test_links[0].id) is True
+    assert buffer.put(test_links[0].id) is False
+
+
+def test_flush_writes_clicks_in_batches(monkeypatch: pytest.MonkeyPatch, db: Session, test_links: list[Link]):
+    buffer: ClickBuffer = make_buffer(db, batch_size=2)
+    buffer._thread = object()
+    batches: list[int] = []
+
+    def fake_bulk_log_clicks(_db: Session, clicks: list[tuple[int, datetime]]) -> None:
+        batches.append(len(clicks))
+
+    monkeypatch.setattr("app.services.click_buffer.crud_bulk_log_clicks", fake_bulk_log_clicks)
+
+    for _ in range(5):
+        assert buffer.put(test_links[0].id)
+
+    assert buffer.flush() == 5
+    assert batches == [2, 2, 1]
+    assert buffer.flush() == 0
+
+
+def test_background_flusher_writes_and_drains_on_stop(db: Session, test_links: list[Link]):
+    link_id: int = test_links[0].id
+    buffer: ClickBuffer = make_buffer(db)
+    buffer.start()
+    assert buffer.running
+
+    before: datetime = datetime.now(timezone.utc)
+    for _ in range(4):
+        assert buffer.put(link_id)
+    buffer.stop()
+
+    assert not buffer.running
+    clicks: list[Click] = db.query(Click).filter(Click.link_id == link_id).all()
+    assert len(clicks) == 4
+    for click in clicks:
+        assert click.clicked_at.replace(tzinfo=timezone.utc) >= before - timedelta(seconds=1)
+
+
+def test_write_errors_are_logged(monkeypatch: pytest.MonkeyPatch, caplog, db: Session, test_links: list[Link]):
+    buffer: ClickBuffer = make_buffer(db)
+    buffer._thread = object()
+
+    def failing_bulk_log_clicks(_db: Session, clicks: list[tuple[int, datetime]]) -> None:
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr("app.services.click_buffer.crud_bulk_log_clicks", failing_bulk_log_clicks)
+    caplog.set_level("ERROR", logger="app.services.click_buffer")
+
+    buffer.put(test_links[0].id)
+    buffer.flush()
+
+    matching = [rec for rec in caplog.records if "Error flushing 1 buffered clicks" in rec.getMessage()]
+    assert len(matching) == 1
+    assert "database is down" in matching[0].getMessage()
+
+
+def test_failed_writes_are_retried(monkeypatch: pytest.MonkeyPatch, db: Session, test_links: list[Link]):
+    buffer: ClickBuffer = make_buffer(db)
+    buffer._thread = object()
+    written: list[tuple[int, datetime]] = []
+    failures: list[int] = [1]
+
+    def flaky_bulk_log_clicks(_db: Session, clicks: list[tuple[int, datetime]]) -> None:
+        if failures:
+            failures.pop()
+            raise RuntimeError("database is down")
+        written.extend(clicks)
+
+    monkeypatch.setattr("app.services.click_buffer.crud_bulk_log_clicks", flaky_bulk_log_clicks)
+
+    buffer.put(test_links[0].id)
+    buffer.put(test_links[1].id)
+    assert buffer.flush() == 0
+    assert buffer.flush() == 2
+    assert [link_id for link_id, _ in written] == [test_links[0].id, test_links[1].id]
+
+
+def test_failed_clicks_that_no_longer_fit_are_dropped_and_counted(monkeypatch: pytest.MonkeyPatch, db: Session,
+                                                                  test_links: list[Link]):
+    buffer: ClickBuffer = make_buffer(db, max_size=4, batch_size=3)
+    buffer._thread = object()
+
+    def failing_bulk_log_clicks(_db: Session, clicks: list[tuple[int, datetime]]) -> None:
+        # Redirects keep buffering clicks while the write is failing.
+        for _ in range(3):
+            buffer.put(test_links[0].id)
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr("app.services.click_buffer.crud_bulk_log_clicks", failing_bulk_log_clicks)
+    dropped_before: float = REGISTRY.get_sample_value("click_buffer_dropped_total")
+
+    for _ in range(3):
+        buffer.put(test_links[0].id)
+    assert buffer.flush() == 0
+
+    assert buffer._queue.qsize() == 4
+    assert REGISTRY.get_sample_value("click_buffer_dropped_total") - dropped_before == 2
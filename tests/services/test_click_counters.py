@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import fakeredis
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Link, ClickTotal, Click
+from app.services.click_counters import ClickCounters, COUNTERS_HASH
+from tests.fixtures.links import test_links
+from tests.fixtures.shared_cache import make_shared_cache, redis_server
+
+
+def total_clicks(db: Session, link_id: int) -> int:
+    total: ClickTotal | None = db.query(ClickTotal).filter(ClickTotal.link_id == link_id).first()
+    return total.clicks if total is not None else 0
+
+
+@pytest.mark.anyio
+async def test_increment_is_rejected_when_not_running(db: Session, test_links: list[Link]):
+    counters: ClickCounters = ClickCounters(session_factory=lambda: db, flush_interval=60)
+    assert await counters.increment(test_links[0].id) is False
+
+
+@pytest.mark.anyio
+async def test_flush_writes_counts_to_rollups(db: Session, test_links: list[Link]):
+    counters: ClickCounters = ClickCounters(session_factory=lambda: db, flush_interval=60)
+    counters._thread = object()
+    first_id, second_id = test_links[0].id, test_links[1].id
+
+    for _ in range(3):
+        assert await counters.increment(first_id) is True
+    await counters.increment(second_id)
+
+    assert counters.flush() == 4
+    assert counters.flush() == 0
+    assert total_clicks(db, first_id) == 3
+    assert total_clicks(db, second_id) == 1
+    assert db.query(Click).count() == 0
+
+
+@pytest.mark.anyio
+async def test_failed_flush_keeps_counts(monkeypatch: pytest.MonkeyPatch, db: Session, test_links: list[Link]):
+    counters: ClickCounters = ClickCounters(session_factory=lambda: db, flush_interval=60)
+    counters._thread = object()
+    link_id: int = test_links[0].id
+    await counters.increment(link_id)
+
+    def failing_add(_db: Session, counts: dict[tuple[int, datetime], int]) -> int:
+        raise RuntimeError("database is down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("app.services.click_counters.crud_add_click_counts", failing_add)
+        assert counters.flush() == 0
+
+    assert counters.flush() == 1
+    assert total_clicks(db, link_id) == 1
+
+
+@pytest.mark.anyio
+async def test_counters_in_shared_cache(db: Session, test_links: list[Link], redis_server: fakeredis.FakeServer):
+    # Two workers count into the same hash, either one writes all of it back.
+    first: ClickCounters = ClickCounters(lambda: db, 60, shared=make_shared_cache(redis_server))
+    second: ClickCounters = ClickCounters(lambda: db, 60, shared=make_shared_cache(redis_server))
+    first._thread = second._thread = object()
+    link_id: int = test_links[0].id
+
+    await first.increment(link_id)
+    await second.increment(link_id)
+    assert fakeredis.FakeRedis(server=redis_server).exists(f"test:{COUNTERS_HASH}")
+
+    assert second.flush() == 2
+    assert first.flush() == 0
+    assert total_clicks(db, link_id) == 2
+
+
+
+@pytest.mark.anyio
+async def test_failed_flush_puts_shared_counts_back(monkeypatch: pytest.MonkeyPatch, db: Session, test_links: list[Link],
+                                                    redis_server: fakeredis.FakeServer):
+    # The taken counts go back to the shared hash, so a restarted worker still writes them.
+    counters: ClickCounters = ClickCounters(lambda: db, 60, shared=make_shared_cache(redis_server))
+    counters._thread = object()
+    link_id: int = test_links[0].id
+    await counters.increment(link_id)
+
+    def failing_add(_db: Session, counts: dict[tuple[int, datetime], int]) -> int:
+        raise RuntimeError("database is down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("app.services.click_counters.crud_add_click_counts", failing_add)
+        assert counters.flush() == 0
+    await counters.increment(link_id)
+
+    assert not counters._counts
+    restarted: ClickCounters = ClickCounters(lambda: db, 60, shared=make_shared_cache(redis_server))
+    assert restarted.flush() == 2
+    assert total_clicks(db, link_id) == 2
+
+def test_background_counters_flush_on_stop(db: Session, test_links: list[Link]):
+    counters: ClickCounters = ClickCounters(session_factory=lambda: db, flush_interval=60)
+    link_id: int = test_links[0].id
+    counters.start()
+    counters._counts[(link_id, 0)] += 2
+    counters.stop()
+
+    assert counters.running is False
+    assert total_clicks(db, link_id) == 2
@@ -0,0 +1,80 @@
+import threading
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.crud.partitions import crud_create_click_partitions, crud_drop_click_partitions, crud_get_click_partitions
+from app.services.click_partitions import ClickPartitionMaintainer, MIN_CLICK_RETENTION
+
+
+def make_maintainer(db: Session, retention_days: int | None = None,
+                    check_interval: float = 0.05) -> ClickPartitionMaintainer:
+    return ClickPartitionMaintainer(
+        session_factory=lambda: db,
+        interval="day",
+        ahead=2,
+        retention_days=retention_days,
+        check_interval=check_interval
+    )
+
+
+def test_partition_maintenance_is_a_no_op_without_partitioning(db: Session):
+    now: datetime = datetime.now(timezone.utc)
+
+    assert crud_get_click_partitions(db) == []
+    assert crud_create_click_partitions(db, now, "day", 2) == []
+    assert crud_drop_click_partitions(db, now) == []
+
+
+@pytest.mark.parametrize(
+    "retention_days, expected",
+    [
+        (None, None),
+        (30, timedelta(days=30)),
+        (0, MIN_CLICK_RETENTION),
+    ]
+)
+def test_maintain_creates_ahead_and_drops_past_retention(monkeypatch: pytest.MonkeyPatch, db: Session,
+                                                         retention_days: int | None, expected: timedelta | None):
+    calls: list[tuple] = []
+
+    def fake_create(_db: Session, now: datetime, interval: str, ahead: int) -> list[str]:
+        calls.append(("create", interval, ahead))
+        return ["clicks_p20261018_20261019"]
+
+    def fake_drop(_db: Session, before: datetime) -> list[str]:
+        calls.append(("drop", datetime.now(timezone.utc) - before))
+        return []
+
+    monkeypatch.setattr("app.services.click_partitions.crud_create_click_partitions", fake_create)
+    monkeypatch.setattr("app.services.click_partitions.crud_drop_click_partitions", fake_drop)
+
+    created, dropped = make_maintainer(db, retention_days).maintain()
+
+    assert created == ["clicks_p20261018_20261019"]
+    assert dropped == []
+    assert calls[0] == ("create", "day", 2)
+    if expected is None:
+        assert len(calls) == 1
+    else:
+        assert abs(calls[1][1] - expected) < timedelta(seconds=5)
+
+
+def test_background_maintainer_survives_errors_until_stopped(monkeypatch: pytest.MonkeyPatch, db: Session):
+    attempts: list[int] = []
+    retried: threading.Event = threading.Event()
+
+    def fake_create(*args, **kwargs) -> list[str]:
+        attempts.append(1)
+        if len(attempts) > 1:
+            retried.set()
+        raise RuntimeError("lock timeout")
+
+    monkeypatch.setattr("app.services.click_partitions.crud_create_click_partitions", fake_create)
+    maintainer: ClickPartitionMaintainer = make_maintainer(db)
+    maintainer.start()
+
+    assert retried.wait(timeout=2)
+    maintainer.stop()
+    assert not maintainer.running
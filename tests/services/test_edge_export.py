@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.exceptions import LinkExportError
+from app.models import Link, User
+from app.services.edge_export import EdgeExport
+from app.utils.link_map import LinkMap
+from tests.fixtures.links import test_links
+
+LIVE_SHORT_IDS: list[str] = ["active0", "active1", "active2"]
+
+
+def run_export(db: Session, fmt: str, since: datetime | None = None) -> tuple[EdgeExport, bytes]:
+    export: EdgeExport = EdgeExport(lambda: db, fmt, since)
+    return export, b"".join(export)
+
+
+def test_json_export_holds_live_links_sorted(db: Session, test_links: list[Link]):
+    export, data = run_export(db, "json")
+    manifest: dict[str, any] = json.loads(data)
+
+    assert [item["short_id"] for item in manifest["links"]] == LIVE_SHORT_IDS
+    assert all(item["op"] == "set" for item in manifest["links"])
+    assert manifest["links"][0]["orig_url"] == "https://example.com/0"
+    assert manifest["links"][0]["redirect_status"] == 302
+    assert manifest["since"] is None
+    assert datetime.fromisoformat(manifest["next_since"]) == export.next_since < export.now
+    assert export.exported == 3
+
+
+def test_csv_delta_sets_new_links_and_deletes_dead_ones(db: Session, test_links: list[Link]):
+    since: datetime = datetime.now(timezone.utc) - timedelta(minutes=10)
+    _, data = run_export(db, "csv", since)
+    rows: dict[str, dict[str, str]] = {row["short_id"]: row for row in csv.DictReader(io.StringIO(data.decode()))}
+
+    assert {short_id: row["op"] for short_id, row in rows.items()} == {
+        "active0": "set", "active1": "set", "active2": "set",
+        "expired0": "delete", "expired1": "delete",
+        "inactive0": "delete", "inactive1": "delete",
+    }
+
+
+def test_delta_is_empty_when_nothing_changed(db: Session, test_links: list[Link]):
+    _, data = run_export(db, "json", datetime.now(timezone.utc) + timedelta(minutes=1))
+    assert json.loads(data)["links"] == []
+
+
+def test_nginx_export_maps_targets_and_statuses(db: Session, test_user: User):
+    expire_at: datetime = datetime.now(timezone.utc) + timedelta(hours=1)
+    db.add_all([
+        Link(short_id="plain", orig_url='https://example.com/"q"', user_id=test_user.id, expire_at=expire_at),
+        Link(short_id="moved", orig_url="https://example.com/m", user_id=test_user.id, expire_at=expire_at,
+             redirect_status=301),
+        Link(short_id="dollar", orig_url="https://example.com/$x", user_id=test_user.id, expire_at=expire_at,
+             redirect_status=308),
+    ])
+    db.commit()
+
+    export, data = run_export(db, "nginx")
+    text: str = data.decode()
+    targets, statuses = text.split("map $uri $url_alias_status")
+
+    assert '"/plain" "https://example.com/\\"q\\"";' in targets
+    assert '"/moved" "https://example.com/m";' in targets
+    assert "dollar" not in text
+    assert '"/moved" 301;' in statuses
+    assert "plain" not in statuses
+    assert (export.exported, export.skipped) == (2, 1)
+
+
+def test_binary_export_is_a_link_map(db: Session, test_links: list[Link]):
+    export, data = run_export(db, "binary")
+    link_map: LinkMap = LinkMap(data)
+
+    assert [entry.short_id for entry in link_map] == LIVE_SHORT_IDS
+    assert link_map.get("active1").orig_url == "https://example.com/1"
+    assert link_map.get("expired0") is None
+    assert link_map.generated_at == export.now.timestamp()
+
+
+def test_delta_is_rejected_for_full_only_formats_and_old_since(db: Session):
+    with pytest.raises(LinkExportError):
+        EdgeExport(lambda: db, "nginx", datetime.now(timezone.utc))
+    with pytest.raises(LinkExportError):
+        EdgeExport(lambda: db, "json", datetime.now(timezone.utc) - timedelta(days=30), max_delta_age_seconds=3600)
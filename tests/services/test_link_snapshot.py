@@ -0,0 +1,84 @@
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Link
+from app.services.link_snapshot import LinkSnapshot
+from tests.fixtures.links import test_links
+
+
+def make_snapshot(db: Session, path: str, **overrides) -> LinkSnapshot:
+    options: dict = {"interval": 60.0, "delta_interval": 0.05, "overlap_seconds": 60.0, "max_age_seconds": 3600.0}
+    options.update(overrides)
+    return LinkSnapshot(session_factory=lambda: db, path=path, **options)
+
+
+def test_snapshot_serves_live_links_after_reload(db: Session, test_links: list[Link], tmp_path):
+    snapshot: LinkSnapshot = make_snapshot(db, str(tmp_path / "links.bin"))
+    assert snapshot.get("active0") is None
+
+    assert snapshot.write() is True
+    assert snapshot.reload() is True
+    assert snapshot.ready
+
+    entry = snapshot.get("active0")
+    assert entry is not None
+    assert entry.orig_url == "https://example.com/0"
+    assert snapshot.get("expired0") is None
+    assert snapshot.get("inactive0") is None
+    assert snapshot.get("missing") is None
+    assert snapshot.reload() is False
+
+
+def test_snapshot_is_written_once_per_interval(db: Session, test_links: list[Link], tmp_path):
+    path: str = str(tmp_path / "links.bin")
+    assert make_snapshot(db, path).write() is True
+    assert make_snapshot(db, path).write() is False
+    assert make_snapshot(db, path, interval=0).write() is True
+    assert sorted(os.listdir(tmp_path)) == ["links.bin", "links.bin.lock"]
+
+
+def test_snapshot_skips_links_deactivated_after_it(db: Session, test_links: list[Link], tmp_path):
+    snapshot: LinkSnapshot = make_snapshot(db, str(tmp_path / "links.bin"))
+    snapshot.write()
+    snapshot.reload()
+
+    link: Link = db.query(Link).filter(Link.short_id == "active1").one()
+    link.is_active = False
+    link.deactivated_at = datetime.now(timezone.utc)
+    db.commit()
+    assert snapshot.get("active1") is not None
+
+    snapshot.refresh_deactivated()
+    assert snapshot.get("active1") is None
+
+    snapshot.forget("active2")
+    assert snapshot.get("active2") is None
+    assert snapshot.get("active0") is not None
+
+
+def test_old_snapshot_is_not_loaded(monkeypatch: pytest.MonkeyPatch, db: Session, test_links: list[Link], tmp_path):
+    path: str = str(tmp_path / "links.bin")
+    make_snapshot(db, path).write()
+    monkeypatch.setattr("app.services.link_snapshot.time", lambda: time.time() + 7200)
+
+    snapshot: LinkSnapshot = make_snapshot(db, path)
+    assert snapshot.reload() is False
+    assert snapshot.ready is False
+
+
+def test_background_snapshot_writes_and_loads(db: Session, test_links: list[Link], tmp_path):
+    snapshot: LinkSnapshot = make_snapshot(db, str(tmp_path / "links.bin"))
+    snapshot.start()
+    try:
+        deadline: float = time.monotonic() + 5
+        while not snapshot.ready and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        snapshot.stop()
+
+    assert not snapshot.running
+    assert snapshot.get("active0") is not None
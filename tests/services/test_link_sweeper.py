@@ -0,0 +1,54 @@
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Link
+from app.services.link_sweeper import LinkSweeper
+from tests.fixtures.links import test_links
+
+
+def make_sweeper(db: Session, grace_seconds: int = 0, batch_size: int = 1, interval: float = 0.05) -> LinkSweeper:
+    return LinkSweeper(
+        session_factory=lambda: db,
+        grace_seconds=grace_seconds,
+        batch_size=batch_size,
+        click_batch_size=10,
+        interval=interval
+    )
+
+
+def test_sweep_archives_in_batches_until_done(monkeypatch: pytest.MonkeyPatch, db: Session, test_links: list[Link]):
+    batches: list[int] = []
+
+    def fake_archive(_db: Session, cutoff: datetime, batch_size: int, click_batch_size: int) -> int:
+        batches.append(batch_size)
+        return [2, 2, 1][len(batches) - 1]
+
+    monkeypatch.setattr("app.services.link_sweeper.crud_archive_dead_links", fake_archive)
+
+    assert make_sweeper(db, batch_size=2).sweep() == 5
+    assert batches == [2, 2, 2]
+
+
+def test_sweep_archives_dead_links(db: Session, test_links: list[Link]):
+    assert make_sweeper(db).sweep() == 2
+    assert make_sweeper(db).sweep() == 0
+
+
+def test_background_sweeper_runs_until_stopped(monkeypatch: pytest.MonkeyPatch, db: Session):
+    swept: threading.Event = threading.Event()
+
+    def fake_archive(_db: Session, cutoff: datetime, batch_size: int, click_batch_size: int) -> int:
+        swept.set()
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr("app.services.link_sweeper.crud_archive_dead_links", fake_archive)
+    sweeper: LinkSweeper = make_sweeper(db)
+    sweeper.start()
+    assert sweeper.running
+
+    assert swept.wait(timeout=2)
+    sweeper.stop()
+    assert not sweeper.running
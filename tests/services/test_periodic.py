@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from app.services.periodic import PeriodicWorker
+
+
+class FailingWorker(PeriodicWorker):
+    thread_name: str = "failing-worker"
+    error_message: str = "Error in failing worker"
+
+    def __init__(self, period: float = 0.01, wait_first: bool = False) -> None:
+        super().__init__()
+        self._period: float = period
+        self.wait_first = wait_first
+        self.ticks: int = 0
+        self.retried: threading.Event = threading.Event()
+
+    @property
+    def period(self) -> float:
+        return self._period
+
+    def tick(self) -> None:
+        self.ticks += 1
+        if self.ticks > 1:
+            self.retried.set()
+        raise RuntimeError("database is down")
+
+
+def test_worker_logs_tick_errors_under_its_module_and_keeps_running(caplog: pytest.LogCaptureFixture):
+    caplog.set_level("ERROR", logger=__name__)
+    worker: FailingWorker = FailingWorker()
+    worker.start()
+    assert worker.running
+    assert worker._thread.name == "failing-worker"
+
+    assert worker.retried.wait(timeout=2)
+    worker.stop()
+    assert not worker.running
+    assert any(rec.name == __name__ and "Error in failing worker: database is down" in rec.getMessage()
+               for rec in caplog.records)
+
+
+def test_worker_stopped_before_the_first_period_never_ticks_when_waiting_first():
+    worker: FailingWorker = FailingWorker(period=60, wait_first=True)
+    worker.start()
+    worker.stop()
+    assert worker.ticks == 0
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+import fakeredis
+import pytest
+from redis import ConnectionError as RedisConnectionError
+
+from app.services.shared_cache import SharedCache
+from app.services.stats_cache import StatsCache
+from tests.fixtures.shared_cache import make_shared_cache, redis_server
+
+
+@pytest.mark.anyio
+async def test_get_many_returns_values_in_key_order(redis_server: fakeredis.FakeServer):
+    shared: SharedCache = make_shared_cache(redis_server)
+
+    await shared.set("link", "a", [1, "https://a.example", 10.0], 60)
+    await shared.set("link", "c", {"x": 1}, 60)
+
+    assert await shared.get_many("link", ["a", "b", "c"]) == [[1, "https://a.example", 10.0], None, {"x": 1}]
+    assert await shared.get_many("link", []) == []
+
+
+@pytest.mark.anyio
+async def test_fields_expire_with_their_hash(redis_server: fakeredis.FakeServer):
+    shared: SharedCache = make_shared_cache(redis_server)
+
+    await shared.set_field("stats", "stats:1", "10:all", [["https://a.example", "a", 1, 2, 3]], 60)
+
+    assert await shared.get_field("stats", "stats:1", "10:all") == [["https://a.example", "a", 1, 2, 3]]
+    assert await shared.get_field("stats", "stats:1", "10:day") is None
+    assert 0 < fakeredis.FakeRedis(server=redis_server).pttl("test:stats:1") <= 60_000
+
+
+@pytest.mark.anyio
+async def test_errors_fall_back_and_back_off():
+    calls: list[int] = []
+
+    def broken_client():
+        calls.append(1)
+        raise RedisConnectionError("connection refused")
+
+    shared: SharedCache = SharedCache(
+        client_factory=broken_client,
+        sync_client_factory=broken_client,
+        prefix="test:",
+        retry_seconds=60.0
+    )
+
+    assert await shared.get_many("link", ["a"]) == [None]
+    assert shared.available is False
+    assert await shared.get_field("stats", "stats:1", "10:all") is None
+    await shared.invalidate("link", "a", ["link:a"])
+    assert shared.add_fields("clicks", "click-counters", {"1:0": 1}) is False
+    assert calls == [1]
+
+
+@pytest.mark.anyio
+async def test_disabled_without_clients():
+    shared: SharedCache = SharedCache(client_factory=None, sync_client_factory=None, prefix="test:", retry_seconds=1.0)
+
+    assert shared.enabled is False
+    await shared.invalidate("link", "a", ["link:a"])
+    shared.start()
+    assert shared.running is False
+
+
+@pytest.mark.anyio
+async def test_invalidation_reaches_other_workers(redis_server: fakeredis.FakeServer):
+    publisher: SharedCache = make_shared_cache(redis_server)
+    subscriber: SharedCache = make_shared_cache(redis_server)
+    received: list[str] = []
+    resets: list[int] = []
+    done: threading.Event = threading.Event()
+
+    def handler(value: str) -> None:
+        received.append(value)
+        done.set()
+
+    subscriber.on_invalidate("link", handler, lambda: resets.append(1))
+    fakeredis.FakeRedis(server=redis_server).set("test:link:abc", "1")
+    subscriber.start()
+    try:
+        # The subscription is made by the listener thread, wait until it is in place.
+        for _ in range(100):
+            if resets:
+                break
+            await asyncio.sleep(0.01)
+        await publisher.invalidate("link", "abc", ["link:abc"])
+        assert done.wait(timeout=5)
+    finally:
+        subscriber.stop()
+
+    assert received == ["abc"]
+    assert resets == [1]
+    assert fakeredis.FakeRedis(server=redis_server).get("test:link:abc") is None
+
+
+@pytest.mark.anyio
+async def test_stats_computed_by_one_worker_are_reused_by_another(redis_server: fakeredis.FakeServer):
+    ttls: dict[str, float] = {"hour": 5.0, "day": 30.0, "all": 60.0}
+    first: StatsCache[list] = StatsCache(10, ttls, 10.0, shared=make_shared_cache(redis_server))
+    second_shared: SharedCache = make_shared_cache(redis_server)
+    second: StatsCache[list] = StatsCache(10, ttls, 10.0, shared=second_shared)
+    calls: list[int] = []
+
+    async def compute() -> list:
+        calls.append(1)
+        await asyncio.sleep(0)
+        return [["https://a.example", "a", 1, 2, len(calls)]]
+
+    assert await first.get((1, 10, "all"), compute) == [["https://a.example", "a", 1, 2, 1]]
+    assert await second.get((1, 10, "all"), compute) == [["https://a.example", "a", 1, 2, 1]]
+    assert len(calls) == 1
+
+    first.invalidate_user(1)
+    await first.publish_invalidation(1)
+    second_shared.dispatch("stats:1")
+    await asyncio.sleep(0.001)
+
+    assert await second.get((1, 10, "all"), compute) == [["https://a.example", "a", 1, 2, 2]]
+    assert len(calls) == 2
@@ -0,0 +1,132 @@
+import time
+from datetime import datetime, timezone, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Link, User
+from app.services.short_id_filter import ShortIdFilter
+from tests.fixtures.links import test_links
+
+
+def make_filter(**overrides) -> ShortIdFilter:
+    options: dict = {"session_factory": lambda: None, "error_rate": 0.001, "min_capacity": 100, "refresh_interval": 60.0, "refresh_lookback_seconds": 5.0}
+    options.update(overrides)
+    return ShortIdFilter(**options)
+
+
+def add_link(db: Session, user: User, short_id: str) -> Link:
+    link: Link = Link(short_id=short_id, orig_url="https://example.com", user_id=user.id,
+                      created_at=datetime.now(timezone.utc), expire_at=datetime.now(timezone.utc) + timedelta(days=1))
+    db.add(link)
+    db.commit()
+    return link
+
+
+def test_filter_allows_everything_until_loaded():
+    short_id_filter: ShortIdFilter = make_filter()
+    assert short_id_filter.ready is False
+    assert short_id_filter.might_exist("anything") is True
+    assert short_id_filter.refresh_due() is False
+
+
+def test_filter_load_contains_existing_short_ids(db: Session, test_links: list[Link]):
+    short_id_filter: ShortIdFilter = make_filter()
+    short_id_filter.load(db)
+
+    assert short_id_filter.ready is True
+    assert all(short_id_filter.might_exist(link.short_id) for link in test_links)
+    assert short_id_filter.might_exist("doesnotexist") is False
+
+
+def test_filter_refresh_picks_up_links_created_elsewhere(db: Session, test_user: User, test_links: list[Link]):
+    short_id_filter: ShortIdFilter = make_filter(refresh_interval=0)
+    short_id_filter.load(db)
+
+    add_link(db, test_user, "elsewhere")
+    assert short_id_filter.might_exist("elsewhere") is False
+
+    assert short_id_filter.refresh_due() is True
+    short_id_filter.refresh(db)
+    assert short_id_filter.might_exist("elsewhere") is True
+
+
+def test_filter_refresh_is_throttled(monkeypatch: pytest.MonkeyPatch, db: Session, test_user: User):
+    now: list[float] = [1000.0]
+    monkeypatch.setattr("app.services.short_id_filter.monotonic", lambda: now[0])
+    short_id_filter: ShortIdFilter = make_filter(refresh_interval=1.0)
+    short_id_filter.load(db)
+
+    assert short_id_filter.refresh_due() is False
+    now[0] += 1.0
+    assert short_id_filter.refresh_due() is True
+
+
+def test_filter_is_rebuilt_when_it_outgrows_its_capacity(db: Session, test_user: User):
+    short_id_filter: ShortIdFilter = make_filter(min_capacity=2, refresh_interval=0)
+    short_id_filter.load(db)
+    for i in range(3):
+        add_link(db, test_user, f"grow{i}")
+        short_id_filter.add(f"grow{i}")
+
+    short_id_filter.refresh(db)
+
+    assert short_id_filter._bloom.capacity == 6
+    assert all(short_id_filter.might_exist(f"grow{i}") for i in range(3))
+
+
+def test_filter_counts_ids_added_locally_once(db: Session, test_user: User):
+    short_id_filter: ShortIdFilter = make_filter()
+    short_id_filter.load(db)
+    for i in range(5):
+        add_link(db, test_user, f"local{i}")
+        short_id_filter.add(f"local{i}")
+
+    short_id_filter.refresh(db)
+
+    assert short_id_filter._known == 5
+
+
+def test_filter_keeps_ids_added_while_it_is_loading(monkeypatch: pytest.MonkeyPatch, db: Session):
+    short_id_filter: ShortIdFilter = make_filter()
+    add_rows = ShortIdFilter._add_rows
+
+    def add_during_scan(*args) -> tuple[int, int]:
+        short_id_filter.add("midscan")
+        return add_rows(*args)
+
+    monkeypatch.setattr(short_id_filter, "_add_rows", add_during_scan)
+    short_id_filter.load(db)
+
+    assert short_id_filter.might_exist("midscan") is True
+
+
+def test_filter_thread_refreshes_in_the_background(db: Session, test_user: User):
+    short_id_filter: ShortIdFilter = make_filter(session_factory=lambda: db, refresh_interval=0.01)
+    short_id_filter.load(db)
+    add_link(db, test_user, "background")
+
+    short_id_filter.start()
+    try:
+        for _ in range(200):
+            if short_id_filter.might_exist("background"):
+                break
+            time.sleep(0.01)
+    finally:
+        short_id_filter.stop()
+
+    assert short_id_filter.might_exist("background") is True
+
+
+def test_filter_refresh_reads_only_recently_created_links(db: Session, test_user: User):
+    short_id_filter: ShortIdFilter = make_filter(refresh_lookback_seconds=5.0)
+    short_id_filter.load(db)
+    add_link(db, test_user, "fresh")
+    backdated: Link = add_link(db, test_user, "backdated")
+    backdated.created_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+
+    short_id_filter.refresh(db)
+
+    assert short_id_filter.might_exist("fresh") is True
+    assert short_id_filter.might_exist("backdated") is False
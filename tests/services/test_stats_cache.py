@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from app.services import stats_cache as stats_cache_module
+from app.services.stats_cache import StatsCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    fake_clock: Clock = Clock()
+    monkeypatch.setattr(stats_cache_module, "monotonic", fake_clock)
+    monkeypatch.setattr("app.utils.lru_cache.monotonic", fake_clock)
+    return fake_clock
+
+
+def make_cache() -> StatsCache[int]:
+    return StatsCache(max_size=10, ttls={"hour": 5.0, "day": 30.0, "all": 60.0}, stale_seconds=10.0)
+
+
+def counting_compute(calls: list[int]):
+    async def compute() -> int:
+        calls.append(len(calls))
+        await asyncio.sleep(0)
+        return len(calls)
+
+    return compute
+
+
+@pytest.mark.anyio
+async def test_fresh_entry_is_served_from_cache(clock: Clock):
+    cache: StatsCache[int] = make_cache()
+    calls: list[int] = []
+
+    assert await cache.get((1, 10, "hour"), counting_compute(calls)) == 1
+    clock.now += 4
+    assert await cache.get((1, 10, "hour"), counting_compute(calls)) == 1
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_ttl_depends_on_window(clock: Clock):
+    cache: StatsCache[int] = make_cache()
+    calls: list[int] = []
+
+    await cache.get((1, 10, "hour"), counting_compute(calls))
+    await cache.get((1, 10, "all"), counting_compute(calls))
+    clock.now += 20
+
+    assert await cache.get((1, 10, "all"), counting_compute(calls)) == 2
+    assert len(calls) == 2
+    assert await cache.get((1, 10, "hour"), counting_compute(calls)) == 3
+    assert len(calls) == 3
+
+
+@pytest.mark.anyio
+async def test_stale_entry_is_served_while_refreshing(clock: Clock):
+    cache: StatsCache[int] = make_cache()
+    calls: list[int] = []
+
+    await cache.get((1, 10, "hour"), counting_compute(calls))
+    clock.now += 8
+
+    assert await cache.get((1, 10, "hour"), counting_compute(calls)) == 1
+    await asyncio.sleep(0.01)
+    assert len(calls) == 2
+    assert await cache.get((1, 10, "hour"), counting_compute(calls)) == 2
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_share_one_computation(clock: Clock):
+    cache: StatsCache[int] = make_cache()
+    calls: list[int] = []
+
+    results: list[int] = await asyncio.gather(*(cache.get((1, 10, "day"), counting_compute(calls)) for _ in range(5)))
+
+    assert results == [1] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_invalidate_user_drops_only_their_entries(clock: Clock):
+    cache: StatsCache[int] = make_cache()
+    calls: list[int] = []
+
+    await cache.get((1, 10, "all"), counting_compute(calls))
+    await cache.get((2, 10, "all"), counting_compute(calls))
+    clock.now += 1
+    cache.invalidate_user(1)
+    clock.now += 1
+
+    assert await cache.get((1, 10, "all"), counting_compute(calls)) == 3
+    assert await cache.get((2, 10, "all"), counting_compute(calls)) == 2
+
+
+@pytest.mark.anyio
+async def test_invalidation_during_compute_wins(clock: Clock):
+    cache: StatsCache[int] = make_cache()
+    calls: list[int] = []
+
+    async def compute_with_write() -> int:
+        clock.now += 1
+        cache.invalidate_user(1)
+        return await counting_compute(calls)()
+
+    await cache.get((1, 10, "all"), compute_with_write)
+    clock.now += 1
+
+    assert await cache.get((1, 10, "all"), counting_compute(calls)) == 2
+
+
+@pytest.mark.anyio
+async def test_failed_computation_is_not_cached(clock: Clock):
+    cache: StatsCache[int] = make_cache()
+    calls: list[int] = []
+
+    async def failing_compute() -> int:
+        raise RuntimeError("database is down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get((1, 10, "all"), failing_compute)
+
+    assert await cache.get((1, 10, "all"), counting_compute(calls)) == 1
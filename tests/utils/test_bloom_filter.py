@@ -0,0 +1,25 @@
+from app.utils.bloom_filter import BloomFilter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom: BloomFilter = BloomFilter(capacity=1000, error_rate=0.01)
+    items: list[str] = [f"item{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+
+
+def test_bloom_filter_false_positive_rate_is_near_target():
+    bloom: BloomFilter = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"item{i}")
+
+    false_positives: int = sum(f"other{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_empty_bloom_filter_contains_nothing():
+    bloom: BloomFilter = BloomFilter(capacity=10, error_rate=0.01)
+    assert "anything" not in bloom
+    assert bloom.hash_count >= 1
@@ -0,0 +1,40 @@
+import pytest
+
+from app.utils.http_cache import redirect_etag, redirect_max_age, etag_matches
+
+
+def test_redirect_etag_changes_with_target():
+    etag: str = redirect_etag(1, "https://example.com", 301)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == redirect_etag(1, "https://example.com", 301)
+    assert etag != redirect_etag(1, "https://example.com/other", 301)
+    assert etag != redirect_etag(1, "https://example.com", 308)
+    assert etag != redirect_etag(2, "https://example.com", 301)
+
+
+@pytest.mark.parametrize(
+    "expire_ts, expected",
+    [
+        (1000.0 + 30.5, 30),
+        (1000.0 + 10_000, 3600),
+        (1000.0 - 5, 0),
+    ]
+)
+def test_redirect_max_age(expire_ts: float, expected: int):
+    assert redirect_max_age(expire_ts, 1000.0, 3600) == expected
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"other", "abc"', True),
+        ("*", True),
+        ('"other"', False),
+    ]
+)
+def test_etag_matches(if_none_match: str | None, expected: bool):
+    assert etag_matches(if_none_match, '"abc"') is expected
@@ -0,0 +1,46 @@
+import pytest
+
+from app.utils.link_map import LinkMap, LinkMapEntry, iter_link_map
+
+
+def make_entries(count: int) -> list[LinkMapEntry]:
+    return [
+        LinkMapEntry(id=i, short_id=f"id{i:04d}", orig_url=f"https://example.com/{i}?q=ü", expire_ts=1000.5 + i,
+                     redirect_status=301 if i % 2 else 302, cache_redirects=bool(i % 3))
+        for i in range(count)
+    ]
+
+
+def test_link_map_roundtrip_and_lookup():
+    entries: list[LinkMapEntry] = make_entries(101)
+    link_map: LinkMap = LinkMap(b"".join(iter_link_map(entries, generated_at=123.0)))
+
+    assert len(link_map) == 101
+    assert link_map.generated_at == 123.0
+    assert list(link_map) == entries
+    assert all(link_map.get(entry.short_id) == entry for entry in entries)
+    assert link_map.get("id0100x") is None
+    assert link_map.get("a") is None
+    assert link_map.get("z") is None
+
+
+def test_empty_link_map():
+    link_map: LinkMap = LinkMap(b"".join(iter_link_map([], generated_at=0.0)))
+    assert len(link_map) == 0
+    assert link_map.get("abc") is None
+
+
+def test_link_map_requires_sorted_unique_short_ids():
+    entries: list[LinkMapEntry] = make_entries(2)
+    with pytest.raises(ValueError):
+        b"".join(iter_link_map(reversed(entries), generated_at=0.0))
+    with pytest.raises(ValueError):
+        b"".join(iter_link_map([entries[0], entries[0]], generated_at=0.0))
+
+
+def test_link_map_rejects_invalid_data():
+    data: bytes = b"".join(iter_link_map(make_entries(3), generated_at=0.0))
+    with pytest.raises(ValueError):
+        LinkMap(b"not a link map at all, really not")
+    with pytest.raises(ValueError):
+        LinkMap(data[:-1])
@@ -0,0 +1,61 @@
+import pytest
+
+from app.utils.lru_cache import TTLCache
+
+
+def test_get_returns_none_for_missing_key():
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl_seconds=60)
+    assert cache.get("missing") is None
+
+
+def test_set_and_get():
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert len(cache) == 1
+
+
+def test_evicts_least_recently_used():
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl(monkeypatch: pytest.MonkeyPatch):
+    now: dict[str, float] = {"value": 100.0}
+    monkeypatch.setattr("app.utils.lru_cache.monotonic", lambda: now["value"])
+
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl_seconds=10)
+    cache.set("a", 1)
+    now["value"] = 109.0
+    assert cache.get("a") == 1
+    now["value"] = 110.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_delete_and_clear():
+    cache: TTLCache[str, int] = TTLCache(max_size=3, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    cache.delete("missing")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_zero_size_disables_cache():
+    cache: TTLCache[str, int] = TTLCache(max_size=0, ttl_seconds=60)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from app.exceptions import InvalidCursorError
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    created_at: datetime = datetime(2025, 5, 1, 12, 30, 15, 123456, tzinfo=timezone(timedelta(hours=3)))
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+def test_cursor_treats_naive_datetime_as_utc():
+    created_at, link_id = decode_cursor(encode_cursor(datetime(2025, 5, 1, 12, 0), 7))
+    assert created_at == datetime(2025, 5, 1, 12, 0, tzinfo=timezone.utc)
+    assert link_id == 7
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "WzEsMl0", "WyIyMDI1LTA1LTAxVDEyOjAwOjAwIiwxXQ"],
+                         ids=["empty", "not_base64", "wrong_types", "naive_datetime"])
+def test_decode_cursor_rejects_invalid_cursor(cursor: str):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
@@ -0,0 +1,48 @@
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from app.utils.partitions import period_start, next_period, partition_name, partition_bounds, default_partition_name
+
+
+def utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "moment, interval, expected",
+    [
+        (utc(2026, 10, 17, 23, 59), "day", utc(2026, 10, 17)),
+        (utc(2026, 10, 17, 23, 59), "month", utc(2026, 10, 1)),
+        (datetime(2026, 10, 17, 1, 30, tzinfo=timezone(timedelta(hours=3))), "day", utc(2026, 10, 16)),
+        (datetime(2026, 10, 17, 12), "month", utc(2026, 10, 1)),
+    ]
+)
+def test_period_start_aligns_to_utc(moment: datetime, interval: str, expected: datetime):
+    assert period_start(moment, interval) == expected
+
+
+@pytest.mark.parametrize(
+    "moment, interval, expected",
+    [
+        (utc(2026, 10, 31, 8), "day", utc(2026, 11, 1)),
+        (utc(2026, 12, 31), "day", utc(2027, 1, 1)),
+        (utc(2026, 10, 17), "month", utc(2026, 11, 1)),
+        (utc(2026, 12, 5), "month", utc(2027, 1, 1)),
+    ]
+)
+def test_next_period(moment: datetime, interval: str, expected: datetime):
+    assert next_period(moment, interval) == expected
+
+
+def test_partition_name_round_trips_its_bounds():
+    name: str = partition_name("clicks", utc(2026, 10, 1), utc(2026, 11, 1))
+
+    assert name == "clicks_p20261001_20261101"
+    assert partition_bounds("clicks", name) == (utc(2026, 10, 1), utc(2026, 11, 1))
+
+
+@pytest.mark.parametrize("name", ["clicks", "clicks_default", "clicks_archive", "links_p20261001_20261101"])
+def test_partition_bounds_ignores_other_tables(name: str):
+    assert partition_bounds("clicks", name) is None
+    assert default_partition_name("clicks") == "clicks_default"
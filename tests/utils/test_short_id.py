@@ -1,7 +1,7 @@
 import pytest
 
-from app.exceptions import ShortIdGenerationError
-from app.utils.short_id import generate_short_id
+from app.utils.short_id import RandomShortIdGenerator, SequenceShortIdGenerator, build_short_id_generator, \
+    encode_base62
 
 
 @pytest.mark.parametrize(
@@ -9,51 +9,57 @@ from app.utils.short_id import generate_short_id
     [4, 6, 8],
     ids=["length_4", "length_6", "length_8"]
 )
-def test_generate_short_id(monkeypatch: pytest.MonkeyPatch, length: int):
-    monkeypatch.setattr(
-        "app.utils.short_id.crud_get_link_by_short_id",
-        lambda db, s_id: None
-    )
-
-    short_id: str = generate_short_id(db=None, length=length)
-    assert isinstance(short_id, str)
-    assert len(short_id) == length
-    assert short_id.isalnum()
-
-
-def test_generate_short_id_handles_few_collisions(monkeypatch: pytest.MonkeyPatch):
-    attempts: dict[str, int] = {"attempts": 0}
-
-    class DummyLink:
-        pass
-
-    def fake_crud_get_link_by_short_id(db: None, s_id: str) -> DummyLink | None:
-        if attempts["attempts"] < 3:
-            attempts["attempts"] += 1
-            return DummyLink()
-        return None
-
-    monkeypatch.setattr(
-        "app.utils.short_id.crud_get_link_by_short_id",
-        fake_crud_get_link_by_short_id
-    )
-    short_id: str = generate_short_id(db=None)
-
-    assert isinstance(short_id, str)
-    assert len(short_id) == 8
-    assert short_id.isalnum()
-    assert attempts["attempts"] == 3
-
-
-def test_generate_short_id_raises_if_all_attempts_collide(monkeypatch: pytest.MonkeyPatch):
-    class DummyLink:
-        pass
-
-    monkeypatch.setattr(
-        "app.utils.short_id.crud_get_link_by_short_id",
-        lambda db, s_id: DummyLink()
-    )
-    with pytest.raises(ShortIdGenerationError) as exc_info:
-        generate_short_id(db=None)
-
-    assert "Failed to generate a unique short ID" in str(exc_info.value)
\ No newline at end of file
+def test_random_generator(length: int):
+    short_ids: list[str] = RandomShortIdGenerator(length).generate(db=None, count=50)
+
+    assert len(short_ids) == 50
+    assert len(set(short_ids)) == 50
+    assert all(len(short_id) == length and short_id.isalnum() for short_id in short_ids)
+
+
+def test_encode_base62():
+    assert encode_base62(0, 3) == "aaa"
+    assert encode_base62(61) == "9"
+    assert encode_base62(62) == "ba"
+
+
+def test_sequence_generator_reserves_blocks(monkeypatch: pytest.MonkeyPatch):
+    reserved: list[int] = []
+
+    def fake_reserve(db: None, size: int) -> list[int]:
+        block: list[int] = list(range(len(reserved) + 1, len(reserved) + size + 1))
+        reserved.extend(block)
+        return block
+
+    generator: SequenceShortIdGenerator = SequenceShortIdGenerator(length=8, block_size=10)
+    monkeypatch.setattr(generator, "_reserve", fake_reserve)
+
+    first: list[str] = generator.generate(db=None, count=3)
+    assert len(reserved) == 10
+    second: list[str] = generator.generate(db=None, count=25)
+    assert len(reserved) == 28
+
+    short_ids: list[str] = first + second
+    assert len(set(short_ids)) == 28
+    assert all(len(short_id) == 8 and short_id.isalnum() for short_id in short_ids)
+
+
+def test_sequence_generator_encoding_is_a_permutation():
+    generator: SequenceShortIdGenerator = SequenceShortIdGenerator(length=2, block_size=10)
+    short_ids: set[str] = {generator._encode(number) for number in range(62 ** 2)}
+
+    assert len(short_ids) == 62 ** 2
+    assert generator._encode(62 ** 2) == "baa"
+
+
+def test_sequence_generator_requires_postgres(db):
+    generator: SequenceShortIdGenerator = SequenceShortIdGenerator(length=8, block_size=10)
+    with pytest.raises(NotImplementedError):
+        generator.generate(db)
+
+
+def test_build_short_id_generator_rejects_unknown_strategy():
+    assert isinstance(build_short_id_generator("random"), RandomShortIdGenerator)
+    assert isinstance(build_short_id_generator("sequence"), SequenceShortIdGenerator)
+    with pytest.raises(ValueError):
+        build_short_id_generator("uuid")